@@ -24,11 +24,12 @@
 
 import sys
 import os
+import re
 import jack
 import copy
 import logging
 from time import sleep
-from threading  import Thread, Lock
+from threading  import Thread, Lock, Event
 from collections import OrderedDict
 
 # Zynthian specific modules
@@ -52,10 +53,21 @@ logger.setLevel(log_level)
 #-------------------------------------------------------------------------------
 
 refresh_time = 2
+event_refresh_time = 10
+debounce_time = 0.1
 jclient = None
 thread = None
 exit_flag = False
 
+# Event-driven mode: JACK graph callbacks flag what changed and wake the thread
+event_driven = False
+graph_event = Event()
+pending_lock = Lock()
+pending_midi = False
+pending_audio = False
+# Connection changes done by autoconnect itself => its callbacks are ignored
+own_changes = set()
+
 last_hw_str = None
 
 #------------------------------------------------------------------------------
@@ -78,6 +90,80 @@ def get_fixed_midi_port_name(port_name):
 
 	return port_name
 
+#------------------------------------------------------------------------------
+# Desired-graph delta: collect the wanted connection state for each port pair
+# and apply only the changes against the current JACK graph.
+#------------------------------------------------------------------------------
+
+class jack_graph_delta:
+
+	def __init__(self):
+		# (src, dst) => True (connected) / False (disconnected). Last request wins.
+		self.wanted = OrderedDict()
+
+
+	@staticmethod
+	def get_port_name(port):
+		if isinstance(port, str):
+			return port
+		else:
+			return port.name
+
+
+	def connect(self, src, dst):
+		self.wanted[(self.get_port_name(src), self.get_port_name(dst))] = True
+
+
+	def disconnect(self, src, dst):
+		self.wanted[(self.get_port_name(src), self.get_port_name(dst))] = False
+
+
+	def apply(self):
+		if not self.wanted:
+			return 0
+
+		# Read current graph once: existing ports and connections of every source port
+		try:
+			port_names = set(p.name for p in jclient.get_ports())
+		except Exception as e:
+			logger.error("ZynAutoConnect: Can't get JACK ports => {}".format(e))
+			return 0
+
+		current = {}
+		nchanges = 0
+		for (src, dst), conn in self.wanted.items():
+			if src not in port_names or dst not in port_names:
+				continue
+
+			if src not in current:
+				try:
+					current[src] = set(p.name for p in jclient.get_all_connections(src))
+				except:
+					current[src] = set()
+
+			if conn and dst not in current[src]:
+				try:
+					add_own_change(src, dst, True)
+					jclient.connect(src, dst)
+					current[src].add(dst)
+					nchanges += 1
+				except Exception as e:
+					logger.debug("ZynAutoConnect: Can't connect {} => {} ({})".format(src, dst, e))
+
+			elif not conn and dst in current[src]:
+				try:
+					add_own_change(src, dst, False)
+					jclient.disconnect(src, dst)
+					current[src].discard(dst)
+					nchanges += 1
+				except Exception as e:
+					logger.debug("ZynAutoConnect: Can't disconnect {} => {} ({})".format(src, dst, e))
+
+		self.wanted.clear()
+		if nchanges>0:
+			logger.info("ZynAutoConnect: {} connection changes".format(nchanges))
+		return nchanges
+
 #------------------------------------------------------------------------------
 
 def midi_autoconnect(force=False):
@@ -141,6 +227,9 @@ def midi_autoconnect(force=False):
 	else:
 		last_hw_str = hw_str
 
+	#Desired connection changes, applied as a minimal delta at the end
+	delta = jack_graph_delta()
+
 	#Get Engines list from UI
 	zyngine_list=zynthian_gui_config.zyngui.screens["engine"].zyngines
 
@@ -222,9 +311,9 @@ def midi_autoconnect(force=False):
 		#logger.debug("Connecting MIDI Input {} => {}".format(hw,zmr_in['main_in']))
 		try:
 			if get_port_alias_id(hw) in zynthian_gui_config.disabled_midi_in_ports:
-				jclient.disconnect(hw,zmr_in['main_in'])
+				delta.disconnect(hw,zmr_in['main_in'])
 			else:
-				jclient.connect(hw,zmr_in['main_in'])
+				delta.connect(hw,zmr_in['main_in'])
 		except Exception as e:
 			#logger.debug("Exception {}".format(e))
 			pass
@@ -234,39 +323,39 @@ def midi_autoconnect(force=False):
 	#Connect RTP-MIDI output to ZynMidiRouter:net_in
 	if zynthian_gui_config.midi_rtpmidi_enabled:
 		try:
-			jclient.connect("jackrtpmidid:rtpmidi_out", zmr_in['net_in'])
+			delta.connect("jackrtpmidid:rtpmidi_out", zmr_in['net_in'])
 		except:
 			pass
 
 	#Connect QMidiNet output to ZynMidiRouter:net_in
 	if zynthian_gui_config.midi_network_enabled:
 		try:
-			jclient.connect("QmidiNet:out_1",zmr_in['net_in'])
+			delta.connect("QmidiNet:out_1",zmr_in['net_in'])
 		except:
 			pass
 
 	#Connect ZynthStep output to ZynMidiRouter:step_in
 	try:
-		jclient.connect("zynthstep:output", zmr_in['step_in'])
+		delta.connect("zynthstep:output", zmr_in['step_in'])
 	except:
 		pass
 
 	#Connect zynsmf output to ZynMidiRouter:seq_in
 	try:
-		jclient.connect("zynsmf:midi_out", zmr_in['seq_in'])
+		delta.connect("zynsmf:midi_out", zmr_in['seq_in'])
 	except:
 		pass
 
 	#Connect ZynMidiRouter:main_out to zynsmf input
 	try:
-		jclient.connect(zmr_out['main_out'], "zynsmf:midi_in")
+		delta.connect(zmr_out['main_out'], "zynsmf:midi_in")
 	except:
 		pass
 
 	#Connect Engine's Controller-FeedBack to ZynMidiRouter:ctrl_in
 	try:
 		for efbp in engines_fb:
-			jclient.connect(efbp,zmr_in['ctrl_in'])
+			delta.connect(efbp,zmr_in['ctrl_in'])
 	except:
 		pass
 
@@ -288,17 +377,17 @@ def midi_autoconnect(force=False):
 						for dport in dports:
 							#logger.debug(" => Connecting {} => {}".format(sport_name, mi))
 							try:
-								jclient.connect(sports[0],dport)
+								delta.connect(sports[0],dport)
 							except:
 								pass
 							try:
-								jclient.disconnect(zmr_out['ch{}_out'.format(layer.midi_chan)], dport)
+								delta.disconnect(zmr_out['ch{}_out'.format(layer.midi_chan)], dport)
 							except:
 								pass
 					else:
 						for dport in dports:
 							try:
-								jclient.disconnect(sports[0], dport)
+								delta.disconnect(sports[0], dport)
 							except:
 								pass
 
@@ -327,16 +416,16 @@ def midi_autoconnect(force=False):
 		#logger.debug("MIDI ROOT ENGINE INFO: {} => {}".format(jn, info))
 		if None in info['chans']:
 			try:
-				jclient.connect(zmr_out['main_out'], info['port'])
+				delta.connect(zmr_out['main_out'], info['port'])
 			except:
 				pass
 		else:
 			for ch in range(0,16):
 				try:
 					if ch in info['chans']:
-						jclient.connect(zmr_out['ch{}_out'.format(ch)], info['port'])
+						delta.connect(zmr_out['ch{}_out'.format(ch)], info['port'])
 					else:
-						jclient.disconnect(zmr_out['ch{}_out'.format(ch)], info['port'])
+						delta.disconnect(zmr_out['ch{}_out'.format(ch)], info['port'])
 				except:
 					pass
 
@@ -351,57 +440,57 @@ def midi_autoconnect(force=False):
 		#Connect ZynMidiRouter:midi_out to enabled Hardware MIDI Output Ports
 		for paid,hwport in enabled_hw_ports.items():
 			try:
-				jclient.connect(zmr_out['midi_out'],hwport)
+				delta.connect(zmr_out['midi_out'],hwport)
 			except:
 				pass
 
 		#Connect ZynMidiRouter:midi_out to ZynMaster:midi_in
 		try:
-			jclient.connect(zmr_out['midi_out'],"ZynMaster:midi_in")
+			delta.connect(zmr_out['midi_out'],"ZynMaster:midi_in")
 		except:
 			pass
 
 		#Connect ZynMidiRouter:net_out to QMidiNet input
 		if zynthian_gui_config.midi_network_enabled:
 			try:
-				jclient.connect(zmr_out['net_out'],"QmidiNet:in_1")
+				delta.connect(zmr_out['net_out'],"QmidiNet:in_1")
 			except:
 				pass
 		#Connect ZynMidiRouter:net_out to RTP-MIDI input
 		if zynthian_gui_config.midi_rtpmidi_enabled:
 			try:
-				jclient.connect(zmr_out['net_out'],"jackrtpmidid:rtpmidi_in")
+				delta.connect(zmr_out['net_out'],"jackrtpmidid:rtpmidi_in")
 			except:
 				pass
 	else:
 		#Connect ZynMidiRouter:midi_out to enabled Hardware MIDI Output Ports
 		for paid,hwport in enabled_hw_ports.items():
 			try:
-				jclient.disconnect(zmr_out['midi_out'],hwport)
+				delta.disconnect(zmr_out['midi_out'],hwport)
 			except:
 				pass
 
 		#Disconnect ZynMidiRouter:midi_out from ZynMaster:midi_in
 		try:
-			jclient.disconnect(zmr_out['midi_out'],"ZynMaster:midi_in")
+			delta.disconnect(zmr_out['midi_out'],"ZynMaster:midi_in")
 		except:
 			pass
 		#Disconnect ZynMidiRouter:net_out from QMidiNet input
 		if zynthian_gui_config.midi_network_enabled:
 			try:
-				jclient.disconnect(zmr_out['net_out'],"QmidiNet:in_1")
+				delta.disconnect(zmr_out['net_out'],"QmidiNet:in_1")
 			except:
 				pass
 		#Disconnect ZynMidiRouter:net_out from RTP-MIDI input
 		if zynthian_gui_config.midi_rtpmidi_enabled:
 			try:
-				jclient.disconnect(zmr_out['net_out'],"jackrtpmidid:rtpmidi_in")
+				delta.disconnect(zmr_out['net_out'],"jackrtpmidid:rtpmidi_in")
 			except:
 				pass
 
 	#Connect ZynMidiRouter:step_out to ZynthStep input
 	try:
-		jclient.connect(zmr_out['step_out'], "zynthstep:input")
+		delta.connect(zmr_out['step_out'], "zynthstep:input")
 	except:
 		pass
 
@@ -409,12 +498,15 @@ def midi_autoconnect(force=False):
 	for hw in hw_in:
 		try:
 			if get_port_alias_id(hw) in zynthian_gui_config.enabled_midi_fb_ports:
-				jclient.connect(zmr_out['ctrl_out'],hw)
+				delta.connect(zmr_out['ctrl_out'],hw)
 			else:
-				jclient.disconnect(zmr_out['ctrl_out'],hw)
+				delta.disconnect(zmr_out['ctrl_out'],hw)
 		except:
 			pass
 
+	#Apply connection changes
+	delta.apply()
+
 	#Release Mutex Lock
 	release_lock()
 
@@ -430,6 +522,9 @@ def audio_autoconnect(force=False):
 
 	logger.info("ZynAutoConnect: Audio ...")
 
+	#Desired connection changes, applied as a minimal delta
+	delta = jack_graph_delta()
+
 	#Get Audio Input Ports (ports receiving audio => inputs => you write on it!!)
 	input_ports=get_audio_input_ports(True)
 
@@ -439,8 +534,8 @@ def audio_autoconnect(force=False):
 	#Disconnect Monitor from System Output
 	mon_in=jclient.get_ports("mod-monitor", is_output=True, is_audio=True)
 	try:
-		jclient.disconnect(mon_in[0],'system:playback_1')
-		jclient.disconnect(mon_in[1],'system:playback_2')
+		delta.disconnect(mon_in[0],'system:playback_1')
+		delta.disconnect(mon_in[1],'system:playback_2')
 	except:
 		pass
 
@@ -470,20 +565,20 @@ def audio_autoconnect(force=False):
 							if k%npb==j%npb:
 								#logger.debug("Connecting {} to {} ...".format(lop.name, pbp.name))
 								try:
-									jclient.connect(lop, pbp)
+									delta.connect(lop, pbp)
 								except:
 									pass
 							else:
 								#logger.debug("Disconnecting {} from {} ...".format(lop.name, pbp.name))
 								try:
-									jclient.disconnect(lop, pbp)
+									delta.disconnect(lop, pbp)
 								except:
 									pass
 					else:
 						for lop in ports:
 							#logger.debug("Disconnecting {} from {} ...".format(lop.name, pbp.name))
 							try:
-								jclient.disconnect(lop, pbp)
+								delta.disconnect(lop, pbp)
 							except:
 								pass
 
@@ -498,7 +593,7 @@ def audio_autoconnect(force=False):
 							psrc = ports[j%np]
 							pdest = input_ports[ao][j%nip]
 							#logger.debug("   ... {} => {}".format(psrc.name, pdest.name))
-							jclient.connect(psrc, pdest)
+							delta.connect(psrc, pdest)
 						except:
 							pass
 				else:
@@ -508,7 +603,7 @@ def audio_autoconnect(force=False):
 							psrc = ports[j%np]
 							pdest = input_ports[ao][j%nip]
 							#logger.debug("   ... {} => {}".format(psrc.name, pdest.name))
-							jclient.disconnect(psrc, pdest)
+							delta.disconnect(psrc, pdest)
 						except:
 							pass
 
@@ -517,10 +612,14 @@ def audio_autoconnect(force=False):
 			midi_ports=jclient.get_ports(layer.get_midi_jackname(), is_input=True, is_midi=True, is_physical=False)
 			if len(midi_ports)>0:
 				try:
-					jclient.connect("ZynMidiRouter:ch{}_out".format(layer.midi_chan), midi_ports[0])
+					delta.connect("ZynMidiRouter:ch{}_out".format(layer.midi_chan), midi_ports[0])
 				except:
 					pass
 
+	#Apply connection changes => System Out connections must be updated before mirroring them
+	delta.apply()
+	delta = jack_graph_delta()
+
 	headphones_out = jclient.get_ports("Headphones", is_input=True, is_audio=True)
 
 	if len(headphones_out)==2 or not zynthian_gui_config.show_cpu_status:
@@ -537,25 +636,25 @@ def audio_autoconnect(force=False):
 			for cp in headphones_conports_1:
 				if cp not in sysout_conports_1:
 					try:
-						jclient.disconnect(cp,headphones_out[0])
+						delta.disconnect(cp,headphones_out[0])
 					except:
 						pass
 			for cp in headphones_conports_2:
 				if cp not in sysout_conports_2:
 					try:
-						jclient.disconnect(cp,headphones_out[1])
+						delta.disconnect(cp,headphones_out[1])
 					except:
 						pass
 
 			#Connect ports to headphones (those currently connected to System Out)
 			for cp in sysout_conports_1:
 				try:
-					jclient.connect(cp,headphones_out[0])
+					delta.connect(cp,headphones_out[0])
 				except:
 					pass
 			for cp in sysout_conports_2:
 				try:
-					jclient.connect(cp,headphones_out[1])
+					delta.connect(cp,headphones_out[1])
 				except:
 					pass
 
@@ -570,25 +669,25 @@ def audio_autoconnect(force=False):
 			for cp in dpmeter_conports_1:
 				if cp not in sysout_conports_1:
 					try:
-						jclient.disconnect(cp,dpmeter_out[0])
+						delta.disconnect(cp,dpmeter_out[0])
 					except:
 						pass
 			for cp in dpmeter_conports_2:
 				if cp not in sysout_conports_2:
 					try:
-						jclient.disconnect(cp,dpmeter_out[1])
+						delta.disconnect(cp,dpmeter_out[1])
 					except:
 						pass
 
 			#Connect ports to dpmeter (those currently connected to System Out)
 			for cp in sysout_conports_1:
 				try:
-					jclient.connect(cp,dpmeter_out[0])
+					delta.connect(cp,dpmeter_out[0])
 				except:
 					pass
 			for cp in sysout_conports_2:
 				try:
-					jclient.connect(cp,dpmeter_out[1])
+					delta.connect(cp,dpmeter_out[1])
 				except:
 					pass
 
@@ -616,12 +715,12 @@ def audio_autoconnect(force=False):
 								if k%nsc==j%nsc:
 									#logger.debug("Connecting {} to {} ...".format(scp.name, layer.get_audio_jackname()))
 									try:
-										jclient.connect(scp, rlp_inp)
+										delta.connect(scp, rlp_inp)
 									except:
 										pass
 								else:
 									try:
-										jclient.disconnect(scp, rlp_inp)
+										delta.disconnect(scp, rlp_inp)
 									except:
 										pass
 								# Limit to 2 input ports 
@@ -631,7 +730,7 @@ def audio_autoconnect(force=False):
 						else:
 							for rlp_inp in rlp_in:
 								try:
-									jclient.disconnect(scp, rlp_inp)
+									delta.disconnect(scp, rlp_inp)
 								except:
 									pass
 
@@ -644,11 +743,14 @@ def audio_autoconnect(force=False):
 				j=0
 				for scp in capture_ports:
 					try:
-						jclient.connect(scp, aubio_in[j%nip])
+						delta.connect(scp, aubio_in[j%nip])
 					except:
 						pass
 					j += 1
 
+	#Apply connection changes
+	delta.apply()
+
 	#Release Mutex Lock
 	release_lock()
 
@@ -659,6 +761,7 @@ def audio_disconnect_sysout():
 		conports = jclient.get_all_connections(sop)
 		for cp in conports:
 			try:
+				add_own_change(cp.name, sop.name, False)
 				jclient.disconnect(cp, sop)
 			except:
 				pass
@@ -695,6 +798,40 @@ def get_audio_input_ports(exclude_system_playback=False):
 	return res
 
 
+# Check if a JACK client has registered its audio output ports (readiness probe)
+def is_jack_client_ready(client_name, min_ports=1):
+	try:
+		return len(jclient.get_ports(client_name, is_output=True, is_audio=True))>=min_ports
+	except:
+		return False
+
+
+# Disconnect all ports of a JACK client, so it's detached from the graph before it's gone
+def disconnect_client(client_name):
+	try:
+		acquire_lock()
+	except Exception as e:
+		logger.debug("Can't disconnect JACK client '{}' => {}".format(client_name, e))
+		return
+	try:
+		# JACK port names are matched as regular expressions
+		for port in jclient.get_ports("^{}:".format(re.escape(client_name))):
+			for cp in jclient.get_all_connections(port):
+				try:
+					if port.is_output:
+						add_own_change(port.name, cp.name, False)
+						jclient.disconnect(port, cp)
+					else:
+						add_own_change(cp.name, port.name, False)
+						jclient.disconnect(cp, port)
+				except:
+					pass
+	except Exception as e:
+		logger.debug("Can't disconnect JACK client '{}' => {}".format(client_name, e))
+	finally:
+		release_lock()
+
+
 def autoconnect(force=False):
 	midi_autoconnect(force)
 	audio_autoconnect(force)
@@ -702,11 +839,138 @@ def autoconnect(force=False):
 
 def autoconnect_thread():
 	while not exit_flag:
+		# Wait for a JACK graph change. Polling is only a fallback safety net.
+		if event_driven:
+			changed = graph_event.wait(event_refresh_time)
+		else:
+			changed = graph_event.wait(refresh_time)
+
+		if exit_flag:
+			break
+
 		try:
-			autoconnect()
+			if changed:
+				midi, audio = get_pending_changes()
+				midi_autoconnect(midi)
+				audio_autoconnect(audio)
+			else:
+				autoconnect()
 		except Exception as err:
 			logger.error("ZynAutoConnect ERROR: {}".format(err))
-		sleep(refresh_time)
+
+
+def get_pending_changes():
+	global pending_midi, pending_audio
+
+	# Debounce: wait until the burst of graph notifications settles down
+	while True:
+		graph_event.clear()
+		if not graph_event.wait(debounce_time) or exit_flag:
+			break
+
+	with pending_lock:
+		res = (pending_midi, pending_audio)
+		pending_midi = False
+		pending_audio = False
+	return res
+
+
+def request_autoconnect(midi=True, audio=True):
+	global pending_midi, pending_audio
+	with pending_lock:
+		pending_midi |= midi
+		pending_audio |= audio
+	graph_event.set()
+
+
+#------------------------------------------------------------------------------
+# JACK graph callbacks => Run in JACK notification thread, so they only flag
+# the changes. Calling the JACK server from here would deadlock!
+#------------------------------------------------------------------------------
+
+def get_port_kind(port):
+	try:
+		return (port.is_midi, port.is_audio)
+	except:
+		# Unregistered ports may be already unusable
+		return (True, True)
+
+
+# Clients managed by autoconnect, besides the engines
+own_clients = ("ZynMidiRouter", "aubio", "TouchOSC Bridge", "mod-monitor", "Headphones", "jackpeak")
+
+# Is the JACK client owned by zynthian (engines & helpers)? Changes from other
+# clients only trigger a non-forced pass, so routing is not rewritten (i.e. manual
+# audio routing is kept). Hardware MIDI changes are detected by the non-forced pass.
+def is_own_client(client_name):
+	if client_name in own_clients:
+		return True
+	try:
+		for zyngine in list(zynthian_gui_config.zyngui.screens.get("engine").zyngines.values()):
+			if zyngine.jackname==client_name:
+				return True
+	except:
+		pass
+	return False
+
+
+def is_own_port(port):
+	try:
+		return is_own_client(port.name.split(":")[0])
+	except:
+		return False
+
+
+def cb_jack_port_registration(port, register):
+	midi, audio = get_port_kind(port)
+	own = is_own_port(port)
+	request_autoconnect(midi and own, audio and own)
+
+
+def cb_jack_client_registration(name, register):
+	if name!="Zynthian_autoconnect":
+		own = is_own_client(name)
+		request_autoconnect(own, own)
+
+
+# Connections changed by others never force an audio pass, so manual audio routing is kept
+def cb_jack_port_connect(a, b, connect):
+	try:
+		if pop_own_change(a.name, b.name, connect) or pop_own_change(b.name, a.name, connect):
+			return
+	except:
+		pass
+	midi, audio = get_port_kind(a)
+	request_autoconnect(midi and (is_own_port(a) or is_own_port(b)), False)
+
+
+def add_own_change(src, dst, connect):
+	with pending_lock:
+		# Notifications could be lost for ports already gone. Don't let it grow forever.
+		if len(own_changes)>1000:
+			own_changes.clear()
+		own_changes.add((src, dst, connect))
+
+
+def pop_own_change(src, dst, connect):
+	with pending_lock:
+		try:
+			own_changes.remove((src, dst, connect))
+			return True
+		except KeyError:
+			return False
+
+
+def set_graph_callbacks():
+	global event_driven
+	try:
+		jclient.set_port_registration_callback(cb_jack_port_registration)
+		jclient.set_client_registration_callback(cb_jack_client_registration)
+		jclient.set_port_connect_callback(cb_jack_port_connect)
+		event_driven = True
+	except Exception as e:
+		event_driven = False
+		logger.warning("ZynAutoConnect: Can't set JACK graph callbacks. Using polling mode ({})".format(e))
 
 
 def acquire_lock():
@@ -729,10 +993,12 @@ def start(rt=2):
 	global refresh_time, exit_flag, jclient, thread, lock
 	refresh_time=rt
 	exit_flag=False
+	graph_event.clear()
 
 	try:
 		jclient=jack.Client("Zynthian_autoconnect")
 		jclient.set_xrun_callback(cb_jack_xrun)
+		set_graph_callbacks()
 		jclient.activate()
 	except Exception as e:
 		logger.error("ZynAutoConnect ERROR: Can't connect with Jack Audio Server ({})".format(e))
@@ -749,6 +1015,7 @@ def start(rt=2):
 def stop():
 	global exit_flag
 	exit_flag=True
+	graph_event.set()
 	acquire_lock()
 	audio_disconnect_sysout()
 	release_lock()
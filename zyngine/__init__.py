@@ -6,6 +6,21 @@ __all__ = [
 	"zynthian_layer",
 	"zynthian_lv2",
 	"zynthian_engine",
+	"get_engine_class"
+]
+
+import importlib
+
+#from zyngine.zynthian_midi import *
+from zyngine.zynthian_zcmidi import *
+from zyngine.zynthian_midi_filter import *
+from zyngine.zynthian_controller import *
+from zyngine.zynthian_layer import *
+from zyngine.zynthian_lv2 import *
+from zyngine.zynthian_engine import *
+
+# Engine modules are imported on demand, when the engine class is first requested
+engine_modules = [
 	"zynthian_engine_zynaddsubfx",
 	"zynthian_engine_linuxsampler",
 	"zynthian_engine_fluidsynth",
@@ -20,23 +35,20 @@ __all__ = [
 	#"zynthian_engine_csound",
 	#"zynthian_engine_transport"
 ]
-#from zyngine.zynthian_midi import *
-from zyngine.zynthian_zcmidi import *
-from zyngine.zynthian_midi_filter import *
-from zyngine.zynthian_controller import *
-from zyngine.zynthian_layer import *
-from zyngine.zynthian_lv2 import *
-from zyngine.zynthian_engine import *
-from zyngine.zynthian_engine_zynaddsubfx import *
-from zyngine.zynthian_engine_linuxsampler import *
-from zyngine.zynthian_engine_fluidsynth import *
-from zyngine.zynthian_engine_setbfree import *
-from zyngine.zynthian_engine_modui import *
-from zyngine.zynthian_engine_pianoteq import *
-from zyngine.zynthian_engine_puredata import *
-from zyngine.zynthian_engine_aeolus import *
-from zyngine.zynthian_engine_jalv import *
-from zyngine.zynthian_engine_sfizz import *
-from zyngine.zynthian_engine_mixer import *
-#from zyngine.zynthian_engine_csound import *
-#from zyngine.zynthian_engine_transport import *
+
+
+def get_engine_class(name):
+	if name not in engine_modules:
+		raise ImportError("Unknown engine '{}'".format(name))
+	module = importlib.import_module("zyngine." + name)
+	engine_class = getattr(module, name)
+	# Importing the submodule binds its name in the package => rebind to the class
+	globals()[name] = engine_class
+	return engine_class
+
+
+# "from zyngine import zynthian_engine_xxx" => Engine class, loaded on demand
+def __getattr__(name):
+	if name in engine_modules:
+		return get_engine_class(name)
+	raise AttributeError("module 'zyngine' has no attribute '{}'".format(name))
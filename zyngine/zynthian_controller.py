@@ -33,6 +33,28 @@ from zyncoder import *
 
 class zynthian_controller:
 
+	# Incremented on every MIDI-CC binding change (MIDI-learn, channel, CC),
+	# so MIDI-CC dispatch indexes and the CC-swap cache can be rebuilt lazily.
+	midi_bind_version = 0
+	midi_cc_swap_cache = {}
+
+	@classmethod
+	def midi_bind_changed(cls):
+		cls.midi_bind_version += 1
+		cls.midi_cc_swap_cache = {}
+
+
+	# Cached version of the MIDI router CC-swap map query
+	@classmethod
+	def get_midi_cc_swap(cls, chan, cc):
+		try:
+			return cls.midi_cc_swap_cache[(chan, cc)]
+		except KeyError:
+			swap_info = zyncoder.lib_zyncoder.get_midi_filter_cc_swap(chan, cc)
+			cls.midi_cc_swap_cache[(chan, cc)] = swap_info
+			return swap_info
+
+
 	def __init__(self, engine, symbol, name=None, options=None):
 		self.engine=engine
 		self.symbol=symbol
@@ -103,8 +125,10 @@ class zynthian_controller:
 			self.is_logarithmic=options['is_logarithmic']
 		if 'midi_chan' in options:
 			self.midi_chan=options['midi_chan']
+			self.midi_bind_changed()
 		if 'midi_cc' in options:
 			self.midi_cc=options['midi_cc']
+			self.midi_bind_changed()
 		if 'osc_port' in options:
 			self.osc_port=options['osc_port']
 		if 'osc_path' in options:
@@ -163,6 +187,7 @@ class zynthian_controller:
 
 	def setup_controller(self, chan, cc, val, maxval=127):
 		self.midi_chan = chan
+		self.midi_bind_changed()
 
 		# OSC Path / MIDI CC
 		if isinstance(cc,str):
@@ -206,6 +231,7 @@ class zynthian_controller:
 
 	def set_midi_chan(self, chan):
 		self.midi_chan = chan
+		self.midi_bind_changed()
 
 
 	def get_ctrl_array(self):
@@ -278,22 +304,11 @@ class zynthian_controller:
 				mval=self.get_ctrl_midi_val()
 
 			try:
-				# Send value using engine method...
-				self.engine.send_controller_value(self)
+				# Send value using engine method (coalesced if enabled)...
+				self.engine.queue_controller_value(self, force_sending)
 			except:
 				if force_sending:
-					try:
-						# Send value using OSC/MIDI ...
-						if self.osc_path:
-							liblo.send(self.engine.osc_target,self.osc_path, self.get_ctrl_osc_val())
-							logging.debug("Sending OSC controller '{}' value => {}".format(self.symbol, val))
-
-						elif self.midi_cc:
-							zyncoder.lib_zyncoder.ui_send_ccontrol_change(self.midi_chan, self.midi_cc, mval)
-							logging.debug("Sending MIDI controller '{}' value => {} ({})".format(self.symbol, val, mval))
-
-					except Exception as e:
-						logging.warning("Can't send controller '{}' value: {} => {}".format(self.symbol, val, e))
+					self.send_value_fallback()
 
 			# Send feedback to MIDI controllers
 			try:
@@ -308,6 +323,23 @@ class zynthian_controller:
 				logging.warning("Can't send controller feedback '{}' => Val={}".format(self.symbol,e))
 
 
+	# Send value using OSC/MIDI, when the engine can't send it
+	def send_value_fallback(self):
+		val = self.value
+		try:
+			if self.osc_path:
+				liblo.send(self.engine.osc_target,self.osc_path, self.get_ctrl_osc_val())
+				logging.debug("Sending OSC controller '{}' value => {}".format(self.symbol, val))
+
+			elif self.midi_cc:
+				mval=self.get_ctrl_midi_val()
+				zyncoder.lib_zyncoder.ui_send_ccontrol_change(self.midi_chan, self.midi_cc, mval)
+				logging.debug("Sending MIDI controller '{}' value => {} ({})".format(self.symbol, val, mval))
+
+		except Exception as e:
+			logging.warning("Can't send controller '{}' value: {} => {}".format(self.symbol, val, e))
+
+
 	def get_value2index(self, val=None):
 		if val is None:
 			val=self.value
@@ -496,6 +528,7 @@ class zynthian_controller:
 		
 		self.midi_learn_chan = chan
 		self.midi_learn_cc = cc
+		self.midi_bind_changed()
 
 		return True
 
@@ -505,6 +538,7 @@ class zynthian_controller:
 		
 		self.midi_learn_chan = None
 		self.midi_learn_cc = None
+		self.midi_bind_changed()
 
 		return True
 
@@ -549,6 +583,7 @@ class zynthian_controller:
 		try:
 			if zyncoder.lib_zyncoder.set_midi_filter_cc_swap(ctypes.c_ubyte(chan), ctypes.c_ubyte(cc), ctypes.c_ubyte(self.midi_chan), ctypes.c_ubyte(self.midi_cc)):
 				logging.info("Set MIDI filter CC map: (%s, %s) => (%s, %s)" % (chan, cc, self.midi_chan, self.midi_cc))
+				self.midi_bind_changed()
 				return self._set_midi_learn(chan, cc)
 			else:
 				logging.error("Can't set MIDI filter CC swap map: call returned 0")
@@ -561,6 +596,7 @@ class zynthian_controller:
 		try:
 			if zyncoder.lib_zyncoder.del_midi_filter_cc_swap(ctypes.c_ubyte(self.midi_learn_chan), ctypes.c_ubyte(self.midi_learn_cc)):
 				logging.info("Deleted MIDI filter CC map: {}, {}".format(self.midi_learn_chan, self.midi_learn_cc))
+				self.midi_bind_changed()
 				return self._unset_midi_learn()
 			else:
 				logging.error("Can't delete MIDI filter CC swap map: Call returned 0")
@@ -583,6 +619,14 @@ class zynthian_controller:
 
 
 	def refresh_gui(self):
+		#Refresh GUI controller from Tk main loop (merged by controller)
+		try:
+			self.engine.zyngui.post_ui_update(self.refresh_gui_widget, self)
+		except Exception as e:
+			logging.debug(e)
+
+
+	def refresh_gui_widget(self):
 		#Refresh GUI controller in screen when needed ...
 		try:
 			if (self.engine.zyngui.active_screen=='control' and not self.engine.zyngui.modal_screen) or self.engine.zyngui.modal_screen=='alsa_mixer':
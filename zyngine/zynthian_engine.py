@@ -30,7 +30,11 @@ import json
 import liblo
 import logging
 import pexpect
-from time import sleep
+import zynautoconnect
+from time import sleep, monotonic
+from queue import Queue
+from threading import Thread, Lock, Event, Condition
+from concurrent.futures import Future
 from os.path import isfile, isdir, join
 from string import Template
 from collections import OrderedDict
@@ -61,11 +65,21 @@ class zynthian_basic_engine:
 
 		self.proc = None
 		self.proc_timeout = 20
-		self.proc_start_sleep = None
+		self.proc_start_sleep = None # Maximum time waiting for the engine to be ready
+		self.proc_start_probe = None # Readiness probe => callable returning True when the engine is ready
 		self.command = command
 		self.command_env = os.environ.copy()
 		self.command_prompt = prompt
 
+		# Asynchronous command channel (pipelined commands), enabled by engine
+		self.cmd_channel_enabled = False
+		self.cmd_queue = None
+		self.cmd_pending = None
+		self.cmd_writer_thread = None
+		self.cmd_reader_thread = None
+		self.cmd_lock = Lock() # Protects cmd_queue life-cycle
+		self.cmd_sync_lock = Lock() # Pauses the writer while the reader resyncs
+
 
 	def __del__(self):
 		self.stop()
@@ -87,7 +101,10 @@ class zynthian_basic_engine:
 				output = self.proc_get_output()
 
 				if self.proc_start_sleep:
-					sleep(self.proc_start_sleep)
+					self.wait_ready(self.proc_start_sleep)
+
+				if self.cmd_channel_enabled and self.command_prompt:
+					self.start_cmd_channel()
 
 				return output
 
@@ -95,18 +112,81 @@ class zynthian_basic_engine:
 				logging.error("Can't start engine {} => {}".format(self.name, err))
 
 
+	# Wait until the readiness probe succeeds, up to timeout seconds.
+	# Without probe, it waits the full time.
+	def wait_ready(self, timeout):
+		if not self.proc_start_probe:
+			sleep(timeout)
+			return True
+
+		t0 = monotonic()
+		while True:
+			try:
+				if self.proc_start_probe():
+					logging.debug("Engine {} is ready after {:.2f} seconds".format(self.name, monotonic() - t0))
+					return True
+			except Exception as e:
+				logging.debug("Readiness probe failed for engine {} => {}".format(self.name, e))
+
+			if not self.proc or not self.proc.isalive():
+				logging.error("Engine {} finished while starting".format(self.name))
+				return False
+
+			if monotonic() - t0 >= timeout:
+				logging.warning("Engine {} is not ready after {} seconds".format(self.name, timeout))
+				return False
+
+			sleep(0.1)
+
+
 	def stop(self):
+		self.stop_cmd_channel()
 		if self.proc:
+			# Detach the process first, so it's not taken as crashed while stopping
+			proc = self.proc
+			self.proc=None
 			try:
 				logging.info("Stoping Engine " + self.name)
-				self.proc.terminate()
-				sleep(0.2)
-				self.proc.terminate(True)
-				self.proc=None
+				self.terminate_proc(proc)
 			except Exception as err:
 				logging.error("Can't stop engine {} => {}".format(self.name, err))
 
 
+	# Terminate process, escalating to SIGKILL if it's still alive after timeout,
+	# and reap it, so no zombie is left.
+	@staticmethod
+	def terminate_proc(proc, timeout=0.2):
+		proc.terminate()
+		t0 = monotonic()
+		while proc.isalive():
+			if monotonic() - t0 >= timeout:
+				proc.terminate(True)
+				break
+			sleep(0.01)
+		proc.close(True)
+
+
+	# Engine process has finished without being stopped
+	def is_crashed(self):
+		try:
+			return self.proc is not None and not self.proc.isalive()
+		except Exception:
+			return False
+
+
+	# Start again a crashed engine process, using the same command
+	def restart(self):
+		logging.warning("Restarting Engine {}".format(self.name))
+		self.stop_cmd_channel()
+		if self.proc:
+			try:
+				self.proc.close(True)
+			except Exception:
+				pass
+			self.proc=None
+		return self.start()
+
+
 	def proc_get_output(self):
 		if self.command_prompt:
 			self.proc.expect(self.command_prompt)
@@ -117,6 +197,15 @@ class zynthian_basic_engine:
 
 
 	def proc_cmd(self, cmd):
+		future = Future()
+		if self.queue_cmd(cmd, future):
+			# Wait for the response, after any pipelined command
+			try:
+				return future.result(2*self.proc_timeout)
+			except Exception as err:
+				logging.error("Can't exec engine command: {} => {}".format(cmd, err))
+				return ""
+
 		if self.proc:
 			try:
 				#logging.debug("proc command: "+cmd)
@@ -129,6 +218,207 @@ class zynthian_basic_engine:
 			return out
 
 
+	# Fire & forget command: don't wait for the prompt.
+	# Falls back to a blocking command if the command channel is not running.
+	def proc_cmd_async(self, cmd):
+		if not self.queue_cmd(cmd):
+			self.proc_cmd(cmd)
+
+
+	# Pipelined command returning a future for the command's output
+	def proc_cmd_future(self, cmd):
+		future = Future()
+		if not self.queue_cmd(cmd, future):
+			future.set_result(self.proc_cmd(cmd))
+		return future
+
+
+	# Queue command in the command channel. Returns False if it's not running.
+	def queue_cmd(self, cmd, future=None):
+		with self.cmd_lock:
+			if self.cmd_queue:
+				self.cmd_queue.put((cmd, future))
+				return True
+		return False
+
+
+	# ---------------------------------------------------------------------------
+	# Asynchronous Command Channel:
+	#  + writer thread sends queued commands without waiting for the prompt
+	#  + reader thread consumes the prompts in order and resolves the futures
+	# ---------------------------------------------------------------------------
+
+	def start_cmd_channel(self):
+		with self.cmd_lock:
+			if self.cmd_queue:
+				return
+
+			self.cmd_queue = Queue()
+			self.cmd_pending = Queue()
+
+			self.cmd_writer_thread = Thread(target=self.cmd_writer_task, args=(self.cmd_queue, self.cmd_pending))
+			self.cmd_writer_thread.daemon = True # thread dies with the program
+			self.cmd_writer_thread.start()
+
+			self.cmd_reader_thread = Thread(target=self.cmd_reader_task, args=(self.cmd_pending,))
+			self.cmd_reader_thread.daemon = True # thread dies with the program
+			self.cmd_reader_thread.start()
+
+
+	# Queued commands are completed before stopping. Meanwhile, new commands wait
+	# for the lock, so they don't fall back to direct mode while the reader is running.
+	def stop_cmd_channel(self):
+		with self.cmd_lock:
+			if not self.cmd_queue:
+				return
+			self.cmd_queue.put((None, None))
+			self.cmd_writer_thread.join(self.proc_timeout)
+			self.cmd_reader_thread.join(self.proc_timeout)
+			if self.cmd_reader_thread.is_alive():
+				logging.error("Command channel of engine {} is not responding".format(self.name))
+			self.cmd_queue = None
+
+
+	def cmd_writer_task(self, cmd_queue, cmd_pending):
+		while True:
+			cmd, future = cmd_queue.get()
+			if cmd is None:
+				cmd_pending.put((None, None))
+				break
+			with self.cmd_sync_lock:
+				try:
+					#logging.debug("proc command: "+cmd)
+					self.proc.sendline(cmd)
+					cmd_pending.put((cmd, future))
+				except Exception as err:
+					logging.error("Can't send engine command: {} => {}".format(cmd, err))
+					if future:
+						future.set_result("")
+
+
+	def cmd_reader_task(self, cmd_pending):
+		while True:
+			cmd, future = cmd_pending.get()
+			if cmd is None:
+				break
+			try:
+				self.proc.expect(self.command_prompt)
+				out = self.proc.before.decode()
+			except Exception as err:
+				logging.error("Can't exec engine command: {} => {}".format(cmd, err))
+				if future:
+					future.set_result("")
+				# Prompts are not in sync with the pending commands anymore
+				if not self.cmd_resync(cmd_pending):
+					break
+				continue
+			if future:
+				future.set_result(out)
+
+
+	# Consume the late prompt of a timed-out command, so next prompts are matched
+	# with their commands. If it doesn't come, fail the pending commands and discard
+	# the engine output until it's quiet. Returns False if the channel has been stopped.
+	def cmd_resync(self, cmd_pending, quiet_time=0.2):
+		try:
+			self.proc.expect(self.command_prompt)
+			return True
+		except Exception:
+			pass
+
+		running = True
+		with self.cmd_sync_lock:
+			while not cmd_pending.empty():
+				cmd, future = cmd_pending.get()
+				if cmd is None:
+					running = False
+				elif future:
+					future.set_result("")
+			try:
+				while True:
+					self.proc.read_nonblocking(65536, timeout=quiet_time)
+			except Exception:
+				pass
+			try:
+				self.proc.buffer = self.proc.string_type()
+			except Exception:
+				pass
+		logging.warning("Command channel of engine {} resynced".format(self.name))
+		return running
+
+
+#------------------------------------------------------------------------------
+# Engine Reaper: Stop engines in background, in parallel
+#------------------------------------------------------------------------------
+
+class zynthian_engine_reaper:
+
+	def __init__(self):
+		self.lock = Lock()
+		# Jack names & nicknames of engines being stopped => Event set when stopped
+		self.pending = {}
+
+
+	# Detach engine from JACK graph and stop it in a background thread
+	def reap(self, engine):
+		jackname = getattr(engine, 'jackname', None)
+		if jackname:
+			zynautoconnect.disconnect_client(jackname)
+		# Engines using fixed resources (jack name, OSC port, ...) can be waited by nickname
+		keys = [key for key in (jackname, getattr(engine, 'nickname', None)) if key]
+		if not keys:
+			keys = [engine]
+		done = Event()
+		with self.lock:
+			for key in keys:
+				self.pending[key] = done
+		thread = Thread(target=self.reap_task, args=(engine, keys, done), daemon=True)
+		thread.name = "reaper_{}".format(jackname or engine.name)
+		thread.start()
+
+
+	def reap_task(self, engine, keys, done):
+		t0 = monotonic()
+		try:
+			engine.stop()
+		except Exception as e:
+			logging.error("Can't stop engine {} => {}".format(engine.name, e))
+		finally:
+			with self.lock:
+				for key in keys:
+					if self.pending.get(key) is done:
+						del self.pending[key]
+			done.set()
+		logging.debug("Engine {} stopped in {:.2f} seconds".format(engine.name, monotonic() - t0))
+
+
+	def is_pending(self, jackname):
+		with self.lock:
+			return jackname in self.pending
+
+
+	# Wait until the engine using jackname (or nickname) is stopped. Returns False on timeout.
+	def wait(self, jackname, timeout=5):
+		with self.lock:
+			done = self.pending.get(jackname)
+		if done:
+			return done.wait(timeout)
+		return True
+
+
+	# Wait until all pending engines are stopped. Returns False on timeout.
+	def wait_all(self, timeout=5):
+		t0 = monotonic()
+		with self.lock:
+			dones = set(self.pending.values())
+		for done in dones:
+			if not done.wait(max(0, timeout - (monotonic() - t0))):
+				return False
+		return True
+
+
+engine_reaper = zynthian_engine_reaper()
+
 #------------------------------------------------------------------------------
 # Synth Engine Base Class
 #------------------------------------------------------------------------------
@@ -156,6 +446,14 @@ class zynthian_engine(zynthian_basic_engine):
 	# Config variables
 	# ---------------------------------------------------------------------------
 
+	# Jack names assigned to engines that are starting concurrently
+	jackname_lock = Lock()
+	jacknames_starting = set()
+	# Jack names used by spare engine processes (i.e. jalv pool)
+	jacknames_spare = set()
+	# Max time waiting for a jack name used by an engine being stopped (seconds)
+	jackname_free_timeout = 5
+
 	# ---------------------------------------------------------------------------
 	# Initialization
 	# ---------------------------------------------------------------------------
@@ -170,6 +468,8 @@ class zynthian_engine(zynthian_basic_engine):
 		self.jackname = ""
 
 		self.loading = 0
+		# Notified when loading finishes
+		self.loading_cond = Condition()
 		self.layers = []
 
 		self.options = {
@@ -194,6 +494,15 @@ class zynthian_engine(zynthian_basic_engine):
 		self.learned_cc = [[None for c in range(128)] for chan in range(16)]
 		self.learned_zctrls = {}
 
+		# Controller-send coalescing => minimal interval between sends (seconds). None disables it.
+		self.ctrl_send_interval = None
+		self.ctrl_send_idle_timeout = 5
+		self.ctrl_send_pending = OrderedDict()
+		self.ctrl_send_lock = Lock()
+		self.ctrl_send_flush_lock = Lock()
+		self.ctrl_send_event = Event()
+		self.ctrl_send_thread = None
+
 
 	def __del__(self):
 		self.stop()
@@ -201,7 +510,9 @@ class zynthian_engine(zynthian_basic_engine):
 
 	def reset(self):
 		#Reset Vars
-		self.loading=0
+		with self.loading_cond:
+			self.loading=0
+			self.loading_cond.notify_all()
 		self.loading_snapshot=False
 		#TODO: OSC, IPC, ...
 
@@ -216,18 +527,41 @@ class zynthian_engine(zynthian_basic_engine):
 			return True
 
 
-	def get_next_jackname(self, jname, sanitize=False):
-		try:
-			# Jack, when listing ports, accepts regular expressions as the jack name.
-			# So, for avoiding problems, jack names shouldn't contain regex characters.
-			if sanitize:
-				jname = re.sub("[\_]{2,}","_",re.sub("[\s\'\*\(\)\[\]]","_",jname))
-			jname_count = self.zyngui.screens['layer'].get_jackname_count(jname)
-		except Exception as e:
-			jname_count = 0
-			logging.error(e)
+	# Readiness probe: engine's JACK client has registered its audio output ports
+	def probe_jack_ports(self):
+		return zynautoconnect.is_jack_client_ready(self.jackname)
+
 
-		return "{}-{:02d}".format(jname, jname_count)
+	def get_next_jackname(self, jname, sanitize=False):
+		with self.jackname_lock:
+			try:
+				# Jack, when listing ports, accepts regular expressions as the jack name.
+				# So, for avoiding problems, jack names shouldn't contain regex characters.
+				if sanitize:
+					jname = re.sub("[\_]{2,}","_",re.sub("[\s\'\*\(\)\[\]]","_",jname))
+				jname_count = self.zyngui.screens['layer'].get_jackname_count(jname)
+				jnames_used = set(layer.jackname for layer in self.zyngui.screens['layer'].layers)
+			except Exception as e:
+				jname_count = 0
+				jnames_used = set()
+				logging.error(e)
+
+		# Skip names taken by engines starting concurrently (no layer yet) or spare engines.
+		# If the name is still used by an engine being stopped, wait for it to be freed.
+		while True:
+			with self.jackname_lock:
+				jackname = "{}-{:02d}".format(jname, jname_count)
+				while jackname in self.jacknames_starting or jackname in self.jacknames_spare or jackname in jnames_used:
+					jname_count += 1
+					jackname = "{}-{:02d}".format(jname, jname_count)
+				if not engine_reaper.is_pending(jackname):
+					self.jacknames_starting.add(jackname)
+					return jackname
+
+			logging.debug("Waiting for jack name '{}' to be freed ...".format(jackname))
+			if not engine_reaper.wait(jackname, self.jackname_free_timeout):
+				logging.warning("Jack name '{}' not freed after {} seconds".format(jackname, self.jackname_free_timeout))
+				jnames_used.add(jackname)
 
 
 	# ---------------------------------------------------------------------------
@@ -235,22 +569,34 @@ class zynthian_engine(zynthian_basic_engine):
 	# ---------------------------------------------------------------------------
 
 	def start_loading(self):
-		self.loading=self.loading+1
-		if self.loading<1: self.loading=1
+		with self.loading_cond:
+			self.loading=self.loading+1
+			if self.loading<1: self.loading=1
 		if self.zyngui:
 			self.zyngui.start_loading()
 
 	def stop_loading(self):
-		self.loading=self.loading-1
-		if self.loading<0: self.loading=0
+		with self.loading_cond:
+			self.loading=self.loading-1
+			if self.loading<=0:
+				self.loading=0
+				self.loading_cond.notify_all()
 		if self.zyngui:
 			self.zyngui.stop_loading()
 
 	def reset_loading(self):
-		self.loading=0
+		with self.loading_cond:
+			self.loading=0
+			self.loading_cond.notify_all()
 		if self.zyngui:
 			self.zyngui.stop_loading()
 
+	# Wait until loading finishes, up to timeout seconds (None => no timeout).
+	# Returns False on timeout.
+	def wait_stop_loading(self, timeout=None):
+		with self.loading_cond:
+			return self.loading_cond.wait_for(lambda: self.loading<=0, timeout)
+
 	# ---------------------------------------------------------------------------
 	# Refresh Management
 	# ---------------------------------------------------------------------------
@@ -385,6 +731,12 @@ class zynthian_engine(zynthian_basic_engine):
 			self.del_layer(layer)
 
 
+	# Redo per-layer setup on a restarted engine process, before replaying layers state.
+	# Engines keeping state from the previous process must override it.
+	def restore_layers_setup(self):
+		pass
+
+
 	# ---------------------------------------------------------------------------
 	# MIDI Channel Management
 	# ---------------------------------------------------------------------------
@@ -585,6 +937,58 @@ class zynthian_engine(zynthian_basic_engine):
 		raise Exception("NOT IMPLEMENTED!")
 
 
+	# Send controller value, coalescing fast changes if enabled:
+	# only the latest pending value of each controller is sent, at a bounded rate.
+	# If a coalesced send fails, force_sending values are sent using the controller's
+	# OSC/MIDI fallback, as it's done for direct sending.
+	def queue_controller_value(self, zctrl, force_sending=False):
+		if not self.ctrl_send_interval:
+			self.send_controller_value(zctrl)
+			return
+
+		with self.ctrl_send_lock:
+			self.ctrl_send_pending[zctrl] = self.ctrl_send_pending.get(zctrl, False) or force_sending
+			if not self.ctrl_send_thread:
+				self.ctrl_send_thread = Thread(target=self.ctrl_sender_task, args=())
+				self.ctrl_send_thread.daemon = True # thread dies with the program
+				self.ctrl_send_thread.start()
+
+		self.ctrl_send_event.set()
+
+
+	# Send pending controller values now
+	def flush_controller_values(self):
+		with self.ctrl_send_flush_lock:
+			with self.ctrl_send_lock:
+				zctrls = list(self.ctrl_send_pending.items())
+				self.ctrl_send_pending.clear()
+
+			# Value is read when sending => latest value wins
+			for zctrl, force_sending in zctrls:
+				try:
+					self.send_controller_value(zctrl)
+				except Exception as e:
+					if force_sending:
+						zctrl.send_value_fallback()
+					else:
+						logging.error("Can't send controller '{}' value => {}".format(zctrl.symbol, e))
+
+
+	def ctrl_sender_task(self):
+		while True:
+			if not self.ctrl_send_event.wait(self.ctrl_send_idle_timeout):
+				# Finish the thread after some idle time. It's restarted when needed.
+				with self.ctrl_send_lock:
+					if not self.ctrl_send_pending:
+						self.ctrl_send_thread = None
+						return
+				continue
+
+			self.ctrl_send_event.clear()
+			self.flush_controller_values()
+			sleep(self.ctrl_send_interval)
+
+
 	#----------------------------------------------------------------------------
 	# MIDI learning
 	#----------------------------------------------------------------------------
@@ -635,7 +1039,8 @@ class zynthian_engine(zynthian_basic_engine):
 	def reset_midi_learn(self):
 		logging.info("Reset MIDI-learn ...")
 		self.learned_zctrls = {}
-		self.learned_cc = [[None for chan in range(16)] for cc in range(128)]
+		self.learned_cc = [[None for c in range(128)] for chan in range(16)]
+		zynthian_controller.midi_bind_changed()
 
 
 	def cb_midi_learn(self, zctrl, chan, cc):
@@ -653,6 +1058,14 @@ class zynthian_engine(zynthian_basic_engine):
 			pass
 
 
+	# Returns True if the engine's MIDI-learn could handle the (chan, ccnum) CC
+	def is_midi_cc_learned(self, chan, ccnum):
+		try:
+			return self.learned_cc[chan][ccnum] is not None
+		except:
+			return False
+
+
 	def midi_zctrl_change(self, zctrl, val):
 		try:
 			if val!=zctrl.get_value():
@@ -182,6 +182,7 @@ class zynthian_engine_aeolus(zynthian_engine):
 
 		if self.config_remote_display():
 			self.proc_start_sleep = 3
+			self.proc_start_probe = self.probe_jack_ports
 			self.command_prompt = None
 			self.command = "aeolus"
 		else:
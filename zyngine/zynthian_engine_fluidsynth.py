@@ -95,6 +95,7 @@ class zynthian_engine_fluidsynth(zynthian_engine):
 
 		self.command = "fluidsynth -a jack -m jack -g 1 -j {}".format(self.fs_options)
 		self.command_prompt = "\n> "
+		self.cmd_channel_enabled = True
 
 		self.start()
 		self.reset()
@@ -112,11 +113,14 @@ class zynthian_engine_fluidsynth(zynthian_engine):
 	# ---------------------------------------------------------------------------
 
 	def stop(self):
+		self.stop_cmd_channel()
 		try:
 			self.proc.sendline("quit")
 			self.proc.expect("\ncheers!")
 		except:
-			super().stop()
+			pass
+		# Terminate & reap the process, if it's still there
+		super().stop()
 
 	# ---------------------------------------------------------------------------
 	# Layer Management
@@ -135,6 +139,12 @@ class zynthian_engine_fluidsynth(zynthian_engine):
 			self.set_all_midi_routes()
 		self.unload_unused_soundfonts()
 
+
+	# Restarted process has no soundfont loaded nor MIDI routes
+	def restore_layers_setup(self):
+		self.soundfont_index={}
+		self.set_all_midi_routes()
+
 	# ---------------------------------------------------------------------------
 	# MIDI Channel Management
 	# ---------------------------------------------------------------------------
@@ -224,7 +234,7 @@ class zynthian_engine_fluidsynth(zynthian_engine):
 		midi_bank=preset[1][0]+preset[1][1]*128
 		midi_prg=preset[1][2]
 		logging.debug("Set Preset => Layer: {}, SoundFont: {}, Bank: {}, Program: {}".format(layer.part_i, sfi, midi_bank, midi_prg))
-		self.proc_cmd("select {} {} {} {}".format(layer.part_i, sfi, midi_bank, midi_prg))
+		self.proc_cmd_async("select {} {} {} {}".format(layer.part_i, sfi, midi_bank, midi_prg))
 		layer.send_ctrl_midi_cc()
 		return True
 
@@ -343,7 +353,7 @@ class zynthian_engine_fluidsynth(zynthian_engine):
 		#Then, remove the remaining ;-)
 		for sf,sfi in sf_unload.items():
 			logging.info("Unload SoundFont => {}".format(sfi))
-			self.proc_cmd("unload {}".format(sfi))
+			self.proc_cmd_async("unload {}".format(sfi))
 			del self.soundfont_index[sf]
 
 
@@ -377,18 +387,18 @@ class zynthian_engine_fluidsynth(zynthian_engine):
 		if layer.part_i is not None:
 			midich = layer.get_midi_chan()
 			router_chan_cmd = "router_chan {0} {0} 0 {1}".format(midich, layer.part_i)
-			self.proc_cmd("router_begin note")
-			self.proc_cmd(router_chan_cmd)
-			self.proc_cmd("router_end")
-			self.proc_cmd("router_begin cc")
-			self.proc_cmd(router_chan_cmd)
-			self.proc_cmd("router_end")
-			self.proc_cmd("router_begin pbend")
-			self.proc_cmd(router_chan_cmd)
-			self.proc_cmd("router_end")
-			self.proc_cmd("router_begin prog")
-			self.proc_cmd(router_chan_cmd)
-			self.proc_cmd("router_end")
+			self.proc_cmd_async("router_begin note")
+			self.proc_cmd_async(router_chan_cmd)
+			self.proc_cmd_async("router_end")
+			self.proc_cmd_async("router_begin cc")
+			self.proc_cmd_async(router_chan_cmd)
+			self.proc_cmd_async("router_end")
+			self.proc_cmd_async("router_begin pbend")
+			self.proc_cmd_async(router_chan_cmd)
+			self.proc_cmd_async("router_end")
+			self.proc_cmd_async("router_begin prog")
+			self.proc_cmd_async(router_chan_cmd)
+			self.proc_cmd_async("router_end")
 
 
 	def set_all_midi_routes(self):
@@ -398,7 +408,7 @@ class zynthian_engine_fluidsynth(zynthian_engine):
 
 
 	def clear_midi_routes(self):
-		self.proc_cmd("router_clear")
+		self.proc_cmd_async("router_clear")
 
 
 	# ---------------------------------------------------------------------------
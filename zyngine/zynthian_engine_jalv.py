@@ -27,7 +27,9 @@ import re
 import json
 import shutil
 import logging
+import pexpect
 from os.path import isfile
+from threading import Thread, Lock, Event
 from collections import OrderedDict
 from subprocess import check_output, STDOUT
 
@@ -43,6 +45,199 @@ def get_jalv_plugins():
 	zynthian_engine_jalv.plugins_dict = zynthian_lv2.get_plugins()
 	return zynthian_engine_jalv.plugins_dict
 
+#------------------------------------------------------------------------------
+# Jalv Spare Instance Pool
+#------------------------------------------------------------------------------
+# Keeps pre-spawned jalv processes for the most recently used plugins, so new
+# LV2 layers can claim a warm instance instead of cold-starting jalv.
+# Jalv can't load a plugin on demand, so spares are plugin-specific.
+#
+# ZYNTHIAN_JALV_POOL_SIZE => Max number of spare instances (0 => disabled)
+# ZYNTHIAN_JALV_POOL_PLUGINS => Comma-separated plugin names to warm at start
+# ZYNTHIAN_JALV_POOL_MIN_FREE_MEM => Recycle spares when available memory (MB) is lower
+# ZYNTHIAN_JALV_POOL_CHECK_INTERVAL => Seconds between available memory checks
+#------------------------------------------------------------------------------
+
+class zynthian_jalv_pool:
+
+	def __init__(self):
+		self.size = int(os.environ.get('ZYNTHIAN_JALV_POOL_SIZE', 0))
+		self.min_free_mem = int(os.environ.get('ZYNTHIAN_JALV_POOL_MIN_FREE_MEM', 200))
+		self.check_interval = float(os.environ.get('ZYNTHIAN_JALV_POOL_CHECK_INTERVAL', 5))
+		self.spares = OrderedDict() # plugin_name => spare instance info
+		self.wanted = OrderedDict() # Most recently used plugin names, last is newest
+		for plugin_name in os.environ.get('ZYNTHIAN_JALV_POOL_PLUGINS', "").split(","):
+			if plugin_name.strip():
+				self.wanted[plugin_name.strip()] = True
+		self.engine = None
+		self.lock = Lock()
+		self.event = Event()
+		self.thread = None
+		self.exit_flag = False
+
+
+	def is_enabled(self):
+		return self.size>0
+
+
+	# Take the spare instance for the plugin, if any
+	def claim(self, plugin_name):
+		if not self.is_enabled():
+			return None
+		with self.lock:
+			spare = self.spares.pop(plugin_name, None)
+		if spare:
+			with zynthian_engine.jackname_lock:
+				zynthian_engine.jacknames_spare.discard(spare['jackname'])
+			if spare['proc'].isalive():
+				logging.info("Claimed spare jalv instance '{}'".format(spare['jackname']))
+				return spare
+			logging.warning("Spare jalv instance '{}' is dead!".format(spare['jackname']))
+		return None
+
+
+	# Plugin has been used => Keep a spare instance for it
+	def touch(self, engine):
+		if not self.is_enabled():
+			return
+		with self.lock:
+			self.engine = engine
+			self.wanted.pop(engine.plugin_name, None)
+			self.wanted[engine.plugin_name] = True
+			while len(self.wanted)>self.size:
+				self.wanted.popitem(last=False)
+		self.refill()
+
+
+	def refill(self):
+		self.event.set()
+		if not self.thread or not self.thread.is_alive():
+			self.thread = Thread(target=self.pool_thread_task, args=())
+			self.thread.daemon = True # thread dies with the program
+			self.thread.start()
+
+
+	def pool_thread_task(self):
+		while not self.exit_flag:
+			# Wake up periodically for checking memory pressure
+			self.event.wait(self.check_interval)
+			self.event.clear()
+			if self.exit_flag:
+				break
+			try:
+				self.recycle_spares()
+				while not self.exit_flag and self.spawn_next_spare():
+					pass
+			except Exception as e:
+				logging.error("Jalv pool failed => {}".format(e))
+
+
+	# Stop spares not wanted anymore, and the oldest ones under memory pressure
+	def recycle_spares(self):
+		with self.lock:
+			unwanted = [name for name in self.spares if name not in self.wanted]
+		for name in unwanted:
+			self.stop_spare(name)
+		while self.spares and self.get_free_mem()<self.min_free_mem:
+			self.stop_spare(next(iter(self.spares)))
+
+
+	# Spawn a spare for the newest wanted plugin without one. Returns False if nothing to do.
+	def spawn_next_spare(self):
+		with self.lock:
+			names = [name for name in reversed(self.wanted) if name not in self.spares]
+			engine = self.engine
+		if not names or not engine:
+			return False
+		if self.get_free_mem()<self.min_free_mem:
+			logging.info("Not enough memory for spare jalv instances")
+			return False
+
+		plugin_name = names[0]
+		try:
+			plugin_url = engine.plugins_dict[plugin_name]['URL']
+		except KeyError:
+			with self.lock:
+				self.wanted.pop(plugin_name, None)
+			return True
+
+		jackname = engine.get_next_jackname(plugin_name, True)
+		with zynthian_engine.jackname_lock:
+			zynthian_engine.jacknames_starting.discard(jackname)
+			zynthian_engine.jacknames_spare.add(jackname)
+
+		command = "jalv -n {} {}".format(jackname, plugin_url)
+		env = os.environ.copy()
+		env['DISPLAY'] = "X"
+		try:
+			logging.info("Starting spare jalv instance '{}'".format(jackname))
+			proc = pexpect.spawn(command, timeout=engine.proc_timeout, env=env)
+			proc.delaybeforesend = 0
+			proc.expect(engine.command_prompt)
+			spare = {
+				'jackname': jackname,
+				'command': command,
+				'proc': proc,
+				'output': proc.before.decode()
+			}
+		except Exception as e:
+			logging.error("Can't start spare jalv instance '{}' => {}".format(jackname, e))
+			with zynthian_engine.jackname_lock:
+				zynthian_engine.jacknames_spare.discard(jackname)
+			with self.lock:
+				self.wanted.pop(plugin_name, None)
+			return True
+
+		with self.lock:
+			if not self.exit_flag:
+				self.spares[plugin_name] = spare
+				return True
+		# Pool stopped while spawning => Don't leak the instance
+		try:
+			proc.terminate(True)
+		except Exception:
+			pass
+		with zynthian_engine.jackname_lock:
+			zynthian_engine.jacknames_spare.discard(jackname)
+		return False
+
+
+	def stop_spare(self, plugin_name):
+		with self.lock:
+			spare = self.spares.pop(plugin_name, None)
+		if spare:
+			logging.info("Stopping spare jalv instance '{}'".format(spare['jackname']))
+			try:
+				spare['proc'].terminate(True)
+			except Exception as e:
+				logging.error("Can't stop spare jalv instance '{}' => {}".format(spare['jackname'], e))
+			with zynthian_engine.jackname_lock:
+				zynthian_engine.jacknames_spare.discard(spare['jackname'])
+
+
+	def stop(self):
+		self.exit_flag = True
+		self.event.set()
+		if self.thread:
+			self.thread.join(10)
+		for plugin_name in list(self.spares):
+			self.stop_spare(plugin_name)
+
+
+	@staticmethod
+	def get_free_mem():
+		try:
+			with open("/proc/meminfo") as f:
+				for line in f:
+					if line.startswith("MemAvailable:"):
+						return int(line.split()[1])//1024
+		except Exception as e:
+			logging.error("Can't get available memory => {}".format(e))
+		return 0
+
+
+jalv_pool = zynthian_jalv_pool()
+
 #------------------------------------------------------------------------------
 # Jalv Engine Class
 #------------------------------------------------------------------------------
@@ -170,6 +365,7 @@ class zynthian_engine_jalv(zynthian_engine):
 		self.name = "Jalv/" + plugin_name
 		self.nickname = "JV/" + plugin_name
 		self.plugin_name = plugin_name
+		get_jalv_plugins()
 		self.plugin_url = self.plugins_dict[plugin_name]['URL']
 
 		self.ui = False
@@ -190,13 +386,24 @@ class zynthian_engine_jalv(zynthian_engine):
 				else: #  elif self.ui=="X11UI":
 					jalv_bin = "jalv.gtk"
 				self.command = ("{} --jack-name {} {}".format(jalv_bin, self.get_jalv_jackname(), self.plugin_url))
+				spare = None
 			else:
-				self.command = ("jalv -n {} {}".format(self.get_jalv_jackname(), self.plugin_url))
+				spare = jalv_pool.claim(plugin_name)
+				if spare:
+					self.command = spare['command']
+				else:
+					self.command = ("jalv -n {} {}".format(self.get_jalv_jackname(), self.plugin_url))
 				self.command_env['DISPLAY'] = "X"
 
 			self.command_prompt = "\n> "
+			self.cmd_channel_enabled = True
+			self.ctrl_send_interval = 0.02
 
-			output = self.start()
+			if spare:
+				output = self.start_spare(spare)
+			else:
+				output = self.start()
+			jalv_pool.touch(self)
 
 			# Get Plugin & Jack names from Jalv starting text ...
 			self.jackname = None
@@ -236,6 +443,16 @@ class zynthian_engine_jalv(zynthian_engine):
 		return self.get_next_jackname(self.plugin_name, True)
 
 
+	# Adopt a warm jalv instance from the pool, instead of starting a new one
+	def start_spare(self, spare):
+		logging.info("Starting Engine {} from spare instance".format(self.name))
+		self.proc = spare['proc']
+		self.proc.timeout = self.proc_timeout
+		if self.cmd_channel_enabled and self.command_prompt:
+			self.start_cmd_channel()
+		return spare['output']
+
+
 	# ---------------------------------------------------------------------------
 	# Layer Management
 	# ---------------------------------------------------------------------------
@@ -284,6 +501,8 @@ class zynthian_engine_jalv(zynthian_engine):
 	def set_preset(self, layer, preset, preload=False):
 		if not preset[0]:
 			return
+		# Pending controller values mustn't override the preset
+		self.flush_controller_values()
 		output=self.proc_cmd("preset {}".format(preset[0]))
 
 		#Parse new controller values
@@ -492,7 +711,7 @@ class zynthian_engine_jalv(zynthian_engine):
 
 
 	def send_controller_value(self, zctrl):
-		self.proc_cmd("set %d %.6f" % (zctrl.graph_path, zctrl.value))
+		self.proc_cmd_async("set %d %.6f" % (zctrl.graph_path, zctrl.value))
 
 
 	# ---------------------------------------------------------------------------
@@ -232,6 +232,22 @@ class zynthian_engine_linuxsampler(zynthian_engine):
 		self.ls_unset_channel(layer)
 
 
+	# Restarted process has no devices nor sampler channels => reconnect & recreate them
+	def restore_layers_setup(self):
+		try:
+			self.sock.close()
+		except:
+			pass
+		self.lscp_connect()
+		self.ls_chans={}
+		self.ls_init()
+		for layer in self.layers:
+			layer.ls_chan_info=None
+			self.ls_set_channel(layer)
+			self.set_midi_chan(layer)
+			layer.refresh_flag=True
+
+
 	# ---------------------------------------------------------------------------
 	# MIDI Channel Management
 	# ---------------------------------------------------------------------------
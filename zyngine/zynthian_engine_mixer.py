@@ -25,6 +25,7 @@
 import os
 import re
 import copy
+import math
 import shlex
 import logging
 import threading
@@ -35,6 +36,189 @@ from collections import OrderedDict
 from . import zynthian_engine
 from . import zynthian_controller
 
+try:
+	import alsaaudio
+except:
+	alsaaudio = None
+
+#------------------------------------------------------------------------------
+# Native ALSA Mixer (pyalsaaudio). Control handles are kept open.
+#------------------------------------------------------------------------------
+
+class zynthian_alsa_mixer:
+
+	# Volume mapping is the same than "amixer -M" (alsa-utils volume_mapping.c)
+	max_linear_db_scale = 24
+	db_gain_mute = -9999999
+
+	def __init__(self, device_name):
+		self.device = "hw:{}".format(device_name.strip())
+		self.mixers = {}
+		self.pcmtypes = {}
+		self.ranges = {}
+
+
+	def get_mixer(self, name):
+		try:
+			return self.mixers[name]
+		except KeyError:
+			mixer = alsaaudio.Mixer(control=name, device=self.device)
+			self.mixers[name] = mixer
+			return mixer
+
+
+	# Read control metadata & current values
+	def get_controls(self):
+		self.mixers = {}
+		self.pcmtypes = {}
+		self.ranges = {}
+
+		ctrls = []
+		for name in alsaaudio.mixers(device=self.device):
+			if name in self.mixers:
+				continue
+			mixer = self.get_mixer(name)
+
+			ctrl = {
+				'name': name,
+				'type': None,
+				'items': None,
+				'ticks': None,
+				'item0': None,
+				'values': []
+			}
+
+			enum = mixer.getenum()
+			vcaps = mixer.volumecap()
+			scaps = mixer.switchcap()
+			if enum:
+				ctrl['type'] = "Selector"
+				ctrl['item0'] = enum[0]
+				ctrl['items'] = list(enum[1])
+				ctrl['ticks'] = list(range(len(ctrl['items'])))
+
+			elif vcaps:
+				if all(("Capture" in cap) for cap in vcaps):
+					ctrl['type'] = "Capture"
+					pcmtype = alsaaudio.PCM_CAPTURE
+				else:
+					ctrl['type'] = "Playback"
+					pcmtype = alsaaudio.PCM_PLAYBACK
+				self.pcmtypes[name] = pcmtype
+
+				values = self.get_volumes(mixer, name, pcmtype)
+				if any(cap.startswith("Joined") for cap in vcaps):
+					values = values[:1]
+				ctrl['values'] = values
+
+				if self.ranges[name][0]==(0, 1):
+					ctrl['type'] = "VToggle"
+					ctrl['items'] = ["off", "on"]
+					ctrl['ticks'] = [0, 100]
+					ctrl['item0'] = 'on' if values and values[0]>0 else 'off'
+
+			elif scaps:
+				ctrl['type'] = "Toggle"
+				ctrl['items'] = ["off", "on"]
+				ctrl['ticks'] = [0, 1]
+				if all(("Capture" in cap) for cap in scaps):
+					self.pcmtypes[name] = alsaaudio.PCM_CAPTURE
+					ctrl['item0'] = 'on' if mixer.getrec()[0] else 'off'
+				else:
+					self.pcmtypes[name] = alsaaudio.PCM_PLAYBACK
+					ctrl['item0'] = 'off' if mixer.getmute()[0] else 'on'
+
+			ctrls.append(ctrl)
+
+		return ctrls
+
+
+	# Get raw & dB ranges. dB range is None if not available.
+	def get_ranges(self, mixer, name, pcmtype):
+		try:
+			return self.ranges[name]
+		except KeyError:
+			raw_range = tuple(mixer.getrange(pcmtype=pcmtype, units=alsaaudio.VOLUME_UNITS_RAW))
+			try:
+				db_range = tuple(mixer.getrange(pcmtype=pcmtype, units=alsaaudio.VOLUME_UNITS_DB))
+				if db_range[0]>=db_range[1]:
+					db_range = None
+			except:
+				db_range = None
+			self.ranges[name] = (raw_range, db_range)
+			return self.ranges[name]
+
+
+	# Get channel volumes as mapped percentage (0-100)
+	def get_volumes(self, mixer, name, pcmtype):
+		raw_range, db_range = self.get_ranges(mixer, name, pcmtype)
+		values = []
+		if db_range:
+			for v in mixer.getvolume(pcmtype=pcmtype, units=alsaaudio.VOLUME_UNITS_DB):
+				values.append(int(round(100 * self.db_to_normalized(v, *db_range))))
+		elif raw_range[1]>raw_range[0]:
+			for v in mixer.getvolume(pcmtype=pcmtype, units=alsaaudio.VOLUME_UNITS_RAW):
+				values.append(int(round(100 * (v - raw_range[0]) / (raw_range[1] - raw_range[0]))))
+		return values
+
+
+	# Set channel volumes from mapped percentage (0-100)
+	def set_volumes(self, name, values, unmute=True):
+		mixer = self.get_mixer(name)
+		pcmtype = self.pcmtypes.get(name, alsaaudio.PCM_PLAYBACK)
+		raw_range, db_range = self.get_ranges(mixer, name, pcmtype)
+
+		for i, v in enumerate(values):
+			if db_range:
+				v = self.normalized_to_db(v / 100, *db_range)
+				units = alsaaudio.VOLUME_UNITS_DB
+			else:
+				v = int(round(v * (raw_range[1] - raw_range[0]) / 100)) + raw_range[0]
+				units = alsaaudio.VOLUME_UNITS_RAW
+			# A single value is applied to all channels
+			if len(values)>1:
+				mixer.setvolume(v, pcmtype=pcmtype, channel=i, units=units)
+			else:
+				mixer.setvolume(v, pcmtype=pcmtype, units=units)
+
+		if unmute:
+			try:
+				if pcmtype==alsaaudio.PCM_CAPTURE:
+					mixer.setrec(1)
+				else:
+					mixer.setmute(0)
+			except:
+				pass
+
+
+	def set_switch(self, name, on):
+		mixer = self.get_mixer(name)
+		if self.pcmtypes.get(name)==alsaaudio.PCM_CAPTURE:
+			mixer.setrec(1 if on else 0)
+		else:
+			mixer.setmute(0 if on else 1)
+
+
+	def db_to_normalized(self, value, db_min, db_max):
+		if db_max - db_min <= self.max_linear_db_scale * 100:
+			return (value - db_min) / (db_max - db_min)
+		normalized = 10 ** ((value - db_max) / 6000.0)
+		if db_min!=self.db_gain_mute:
+			min_norm = 10 ** ((db_min - db_max) / 6000.0)
+			normalized = (normalized - min_norm) / (1 - min_norm)
+		return max(0.0, normalized)
+
+
+	def normalized_to_db(self, normalized, db_min, db_max):
+		if db_max - db_min <= self.max_linear_db_scale * 100:
+			return int(round(normalized * (db_max - db_min))) + db_min
+		if db_min!=self.db_gain_mute:
+			min_norm = 10 ** ((db_min - db_max) / 6000.0)
+			normalized = normalized * (1 - min_norm) + min_norm
+		if normalized<=0:
+			return db_min
+		return int(round(6000.0 * math.log10(normalized))) + db_max
+
 #------------------------------------------------------------------------------
 # Mixer Engine Class
 #------------------------------------------------------------------------------
@@ -85,6 +269,9 @@ class zynthian_engine_mixer(zynthian_engine):
 		self.zctrls = None
 		self.sender_poll_enabled = False
 
+		# Native ALSA mixers, by device name. None => use amixer
+		self.alsa_mixers = {}
+
 		self.get_soundcard_config()
 
 
@@ -196,24 +383,109 @@ class zynthian_engine_mixer(zynthian_engine):
 		return sorted_zctrls
 
 
+	def get_alsa_mixer(self, device_name):
+		if not alsaaudio or not device_name:
+			return None
+		try:
+			return self.alsa_mixers[device_name]
+		except KeyError:
+			self.alsa_mixers[device_name] = zynthian_alsa_mixer(device_name)
+			return self.alsa_mixers[device_name]
+
+
 	def get_mixer_zctrls(self, device_name, ctrl_list):
 		zctrls = OrderedDict()
 
+		ctrls = None
+		alsa_mixer = self.get_alsa_mixer(device_name)
+		if alsa_mixer:
+			try:
+				ctrls = alsa_mixer.get_controls()
+			except Exception as e:
+				logging.warning("Can't use native ALSA mixer for device '{}'. Using amixer => {}".format(device_name, e))
+				self.alsa_mixers[device_name] = None
+
 		try:
-			ctrls = check_output("amixer -M -c {}".format(device_name), shell=True).decode("utf-8").split("Simple mixer control ")
+			if ctrls is None:
+				ctrls = self.get_amixer_ctrls(device_name)
+
 			for ctrl in ctrls:
-				lines = ctrl.splitlines()
+				ctrl_name = ctrl['name']
+				ctrl_symbol = ctrl_name.replace(' ', '_')
+				ctrl_type = ctrl['type']
+				ctrl_items = ctrl['items']
+				ctrl_ticks = ctrl['ticks']
+				ctrl_item0 = ctrl['item0']
+				ctrl_values = ctrl['values']
+				ctrl_maxval = 100
+				ctrl_minval = 0
+
+				if ctrl_symbol and ctrl_type:
+					if ctrl_type in ("Selector", "Toggle", "VToggle") and len(ctrl_items)>1 and (not ctrl_list or ctrl_name in ctrl_list):
+						#logging.debug("ADDING ZCTRL SELECTOR: {} => {}".format(ctrl_symbol, ctrl_item0))
+						zctrl = zynthian_controller(self, ctrl_symbol, ctrl_name, {
+							'graph_path': [ctrl_name, ctrl_type],
+							'labels': ctrl_items,
+							'ticks': ctrl_ticks,
+							'value': ctrl_item0,
+							'value_min': ctrl_ticks[0],
+							'value_max': ctrl_ticks[-1],
+							'is_toggle': (ctrl_type=='Toggle'),
+							'is_integer': True
+						})
+						zctrl.last_value_sent = None
+						zctrls[ctrl_symbol] = zctrl
+
+					elif ctrl_type in ("Playback" ,"Capture"):
+						nchans = len(ctrl_values)
+						for i in range(nchans):
+							if nchans>2:
+								graph_path = [ctrl_name, ctrl_type, i, nchans]
+								zctrl_symbol = ctrl_symbol + "_" + str(i)
+								zctrl_name = ctrl_name + " " + str(i+1)
+							elif nchans==2:
+								graph_path = [ctrl_name, ctrl_type, i, 2]
+								zctrl_symbol = ctrl_symbol + "_" + str(i)
+								zctrl_name = ctrl_name + " " + self.chan_names[i]
+							else:
+								graph_path = [ctrl_name, ctrl_type]
+								zctrl_symbol = ctrl_symbol
+								zctrl_name = ctrl_name
+							if not ctrl_list or zctrl_name in ctrl_list:
+								logging.debug("ADDING ZCTRL LEVEL: {} => {}".format(zctrl_symbol, ctrl_values[i]))
+								zctrl = zynthian_controller(self, zctrl_symbol, zctrl_name, {
+									'graph_path': graph_path,
+									'value': ctrl_values[i],
+									'value_min': ctrl_minval,
+									'value_max': ctrl_maxval,
+									'is_toggle': False,
+									'is_integer': True
+								})
+								zctrl.last_value_sent = None
+								zctrls[zctrl_symbol] = zctrl
+
+		except Exception as err:
+			logging.error(err)
+
+		return zctrls
+
+
+	# Parse "amixer -M" output => list of controls
+	def get_amixer_ctrls(self, device_name):
+		ctrls = []
+		try:
+			amixer_ctrls = check_output("amixer -M -c {}".format(device_name), shell=True).decode("utf-8").split("Simple mixer control ")
+			for amixer_ctrl in amixer_ctrls:
+				lines = amixer_ctrl.splitlines()
 				if len(lines)==0:
 					continue
 
 				m = re.match("'(.*?)'.*", lines[0], re.M | re.I)
 				if m:
 					ctrl_name = m.group(1).strip()
-					ctrl_symbol = ctrl_name.replace(' ', '_')
 				else:
-					ctrl_name = None
-					ctrl_symbol = None
-	
+					continue
+
 				ctrl_type = None
 				ctrl_caps = None
 				ctrl_chans = []
@@ -221,12 +493,10 @@ class zynthian_engine_mixer(zynthian_engine):
 				ctrl_item0 = None
 				ctrl_ticks = None
 				ctrl_limits = None
-				ctrl_maxval = 100
-				ctrl_minval = 0
 				ctrl_value = 50
 				ctrl_values = []
 
-				#logging.debug("MIXER CONTROL => {}\n{}".format(ctrl_name, ctrl))
+				#logging.debug("MIXER CONTROL => {}\n{}".format(ctrl_name, amixer_ctrl))
 				for line in lines[1:]:
 					try:
 						key, value = line.strip().split(": ",1)
@@ -284,53 +554,19 @@ class zynthian_engine_mixer(zynthian_engine):
 								if ctrl_type=="VToggle":
 									ctrl_item0 = 'on' if (ctrl_value>0) else 'off'
 
-				if ctrl_symbol and ctrl_type:
-					if ctrl_type in ("Selector", "Toggle", "VToggle") and len(ctrl_items)>1 and (not ctrl_list or ctrl_name in ctrl_list):
-						#logging.debug("ADDING ZCTRL SELECTOR: {} => {}".format(ctrl_symbol, ctrl_item0))
-						zctrl = zynthian_controller(self, ctrl_symbol, ctrl_name, {
-							'graph_path': [ctrl_name, ctrl_type],
-							'labels': ctrl_items,
-							'ticks': ctrl_ticks,
-							'value': ctrl_item0,
-							'value_min': ctrl_ticks[0],
-							'value_max': ctrl_ticks[-1],
-							'is_toggle': (ctrl_type=='Toggle'),
-							'is_integer': True
-						})
-						zctrl.last_value_sent = None
-						zctrls[ctrl_symbol] = zctrl
-
-					elif ctrl_type in ("Playback" ,"Capture"):
-						for i, chan in enumerate(ctrl_chans):
-							if len(ctrl_chans)>2:
-								graph_path = [ctrl_name, ctrl_type, i, len(ctrl_chans)]
-								zctrl_symbol = ctrl_symbol + "_" + str(i)
-								zctrl_name = ctrl_name + " " + str(i+1)
-							elif len(ctrl_chans)==2:
-								graph_path = [ctrl_name, ctrl_type, i, 2]
-								zctrl_symbol = ctrl_symbol + "_" + str(i)
-								zctrl_name = ctrl_name + " " + self.chan_names[i]
-							else:
-								graph_path = [ctrl_name, ctrl_type]
-								zctrl_symbol = ctrl_symbol
-								zctrl_name = ctrl_name
-							if not ctrl_list or zctrl_name in ctrl_list:
-								logging.debug("ADDING ZCTRL LEVEL: {} => {}".format(zctrl_symbol, ctrl_values[i]))
-								zctrl = zynthian_controller(self, zctrl_symbol, zctrl_name, {
-									'graph_path': graph_path,
-									'value': ctrl_values[i],
-									'value_min': ctrl_minval,
-									'value_max': ctrl_maxval,
-									'is_toggle': False,
-									'is_integer': True
-								})
-								zctrl.last_value_sent = None
-								zctrls[zctrl_symbol] = zctrl
+				ctrls.append({
+					'name': ctrl_name,
+					'type': ctrl_type,
+					'items': ctrl_items,
+					'ticks': ctrl_ticks,
+					'item0': ctrl_item0,
+					'values': ctrl_values
+				})
 
 		except Exception as err:
 			logging.error(err)
 
-		return zctrls
+		return ctrls
 
 
 	def send_controller_value(self, zctrl):
@@ -339,30 +575,51 @@ class zynthian_engine_mixer(zynthian_engine):
 
 	def _send_controller_value(self, zctrl):
 		try:
-			if zctrl.labels:
-				if zctrl.graph_path[1]=="VToggle":
-					amixer_command = "amixer -M -c {} set '{}' '{}%'".format(self.device_name, zctrl.graph_path[0], zctrl.value)
-				else:
-					amixer_command = "amixer -M -c {} set '{}' '{}'".format(self.device_name, zctrl.graph_path[0], zctrl.get_value2label())
+			if zctrl.symbol=="Headphone" and self.allow_headphones() and self.zyngui and self.zyngui.get_zynthian_config("rbpi_headphones"):
+				devname = self.rbpi_device_name
 			else:
-				if zctrl.symbol=="Headphone" and self.allow_headphones() and self.zyngui and self.zyngui.get_zynthian_config("rbpi_headphones"):
-					devname = self.rbpi_device_name
-				else:
-					devname = self.device_name
+				devname = self.device_name
 
-				values=[]
+			if zctrl.labels:
+				devname = self.device_name
+				values = None
+			else:
+				values = []
 				if len(zctrl.graph_path)>2:
 					nchans = zctrl.graph_path[3]
 					symbol_prefix = zctrl.symbol[:-1]
 					for i in range(0, nchans):
 						symbol_i = symbol_prefix + str(i)
 						if symbol_i in self.zctrls:
-							values.append("{}%".format(self.zctrls[symbol_i].value))
+							values.append(self.zctrls[symbol_i].value)
 						else:
-							values.append("0%")
+							values.append(0)
 				else:
-					values.append("{}%".format(zctrl.value))
+					values.append(zctrl.value)
 
+			# Try native ALSA mixer first
+			alsa_mixer = self.get_alsa_mixer(devname)
+			if alsa_mixer:
+				try:
+					if values is not None:
+						alsa_mixer.set_volumes(zctrl.graph_path[0], values)
+						return
+					elif zctrl.graph_path[1]=="VToggle":
+						alsa_mixer.set_volumes(zctrl.graph_path[0], [zctrl.value], False)
+						return
+					elif zctrl.graph_path[1]=="Toggle":
+						alsa_mixer.set_switch(zctrl.graph_path[0], zctrl.get_value2label()=="on")
+						return
+				except Exception as e:
+					logging.warning("Native ALSA mixer can't set '{}'. Using amixer => {}".format(zctrl.symbol, e))
+
+			if values is None:
+				if zctrl.graph_path[1]=="VToggle":
+					amixer_command = "amixer -M -c {} set '{}' '{}%'".format(devname, zctrl.graph_path[0], zctrl.value)
+				else:
+					amixer_command = "amixer -M -c {} set '{}' '{}'".format(devname, zctrl.graph_path[0], zctrl.get_value2label())
+			else:
+				values = ["{}%".format(v) for v in values]
 				amixer_command = "amixer -M -c {} set '{}' '{}' {} unmute".format(devname, zctrl.graph_path[0], zctrl.graph_path[1], ','.join(values))
 
 			logging.debug(amixer_command)
@@ -415,6 +672,16 @@ class zynthian_engine_mixer(zynthian_engine):
 			except:
 				pass
 
+
+	def is_midi_cc_learned(self, chan, ccnum):
+		if self.zyngui.is_single_active_channel():
+			for ch in range(0,16):
+				if self.learned_cc[ch][ccnum] is not None:
+					return True
+			return False
+		else:
+			return super().is_midi_cc_learned(chan, ccnum)
+
 	# ---------------------------------------------------------------------------
 	# Layer "Path" String
 	# ---------------------------------------------------------------------------
@@ -30,7 +30,7 @@ import requests
 import websocket
 from time import sleep
 from subprocess import check_output
-from threading  import Thread
+from threading  import Thread, Event
 from collections import OrderedDict
 from . import zynthian_engine
 from . import zynthian_controller
@@ -78,8 +78,8 @@ class zynthian_engine_modui(zynthian_engine):
 
 		self.websocket = None
 		self.ws_thread = None
-		self.ws_preset_loaded = False
-		self.ws_bundle_loaded = False
+		self.ws_preset_loaded = Event()
+		self.ws_bundle_loaded = Event()
 		self.hw_ports = {}
 		self.midi_dev_info = None
 
@@ -97,7 +97,7 @@ class zynthian_engine_modui(zynthian_engine):
 
 
 	def start(self):
-		self.ws_bundle_loaded = False
+		self.ws_bundle_loaded.clear()
 		if not self.is_service_active("mod-ui"):
 			logging.info("STARTING MOD-HOST & MOD-UI services...")
 			check_output(("systemctl start mod-ui"),shell=True)
@@ -109,7 +109,7 @@ class zynthian_engine_modui(zynthian_engine):
 			logging.info("STOPPING MOD-HOST & MOD-UI services...")
 			#check_output(("systemctl stop mod-host && systemctl stop browsepy && systemctl stop mod-ui"),shell=True)
 			check_output(("systemctl stop browsepy && systemctl stop mod-ui"),shell=True)
-		self.ws_bundle_loaded = False
+		self.ws_bundle_loaded.clear()
 
 
 	def is_service_active(self, service="mod-ui"):
@@ -151,16 +151,13 @@ class zynthian_engine_modui(zynthian_engine):
 
 	def load_bundle(self, path):
 		self.graph_reset()
-		self.ws_bundle_loaded = False
+		self.ws_bundle_loaded.clear()
 		res = self.api_post_request("/pedalboard/load_bundle/",data={'bundlepath':path})
 		if not res or not res['ok']:
 			logging.error("Loading Bundle "+path)
 		else:
 			return res['name']
-		i=0
-		while not self.ws_bundle_loaded and i<101: 
-			sleep(0.1)
-			i=i+2
+		self.ws_bundle_loaded.wait(5)
 
 	#----------------------------------------------------------------------------
 	# Preset Managament
@@ -215,21 +212,15 @@ class zynthian_engine_modui(zynthian_engine):
 
 
 	def load_effect_preset(self, plugin, preset):
-		self.ws_preset_loaded = False
+		self.ws_preset_loaded.clear()
 		res = self.api_get_request("/effect/preset/load/"+plugin, data={'uri':preset})
-		i=0
-		while not self.ws_preset_loaded and i<100: 
-			sleep(0.1)
-			i=i+1
+		self.ws_preset_loaded.wait(10)
 
 
 	def load_pedalboard_preset(self, preset):
-		self.ws_preset_loaded = False
+		self.ws_preset_loaded.clear()
 		res = self.api_get_request("/%s/load" % self.pedal_preset_noun, data={'id':preset})
-		i=0
-		while not self.ws_preset_loaded and i<100: 
-			sleep(0.1)
-			i=i+1
+		self.ws_preset_loaded.wait(10)
 
 
 	def cmp_presets(self, preset1, preset2):
@@ -309,15 +300,8 @@ class zynthian_engine_modui(zynthian_engine):
 			self.ws_thread=Thread(target=self.task_websocket, args=())
 			self.ws_thread.daemon = True # thread dies with the program
 			self.ws_thread.start()
-			
-			j=0
-			while j<100:
-				if self.ws_bundle_loaded:
-					break
-				j += 1
-				sleep(0.1)
-				
-			if j<100:
+
+			if self.ws_bundle_loaded.wait(10):
 				return True
 			else:
 				self.stop_websocket()
@@ -392,7 +376,7 @@ class zynthian_engine_modui(zynthian_engine):
 					logging.info("LOADING END")
 					self.graph_autoconnect_midi_input()
 					self.stop_loading()
-					self.ws_bundle_loaded = True
+					self.ws_bundle_loaded.set()
 
 				elif command == "bundlepath":
 					logging.info("BUNDLEPATH %s" % args[1])
@@ -714,7 +698,7 @@ class zynthian_engine_modui(zynthian_engine):
 		except Exception as e:
 			logging.error("Preset Not Found: {}/{} => {}".format(pgraph, uri, e))
 
-		self.ws_preset_loaded = True
+		self.ws_preset_loaded.set()
 
 
 	def pedal_preset_cb(self, preset):
@@ -728,7 +712,7 @@ class zynthian_engine_modui(zynthian_engine):
 		except Exception as e:
 			logging.error("Preset Not Found: {}".format(preset))
 
-		self.ws_preset_loaded = True
+		self.ws_preset_loaded.set()
 
 	#----------------------------------------------------------------------------
 	# MIDI learning
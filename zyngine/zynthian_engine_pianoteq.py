@@ -376,6 +376,7 @@ class zynthian_engine_pianoteq(zynthian_engine):
 
 		if self.config_remote_display():
 			self.proc_start_sleep = 5
+			self.proc_start_probe = self.probe_jack_ports
 			self.command_prompt = None
 			if PIANOTEQ_VERSION[0]==6 and PIANOTEQ_VERSION[1]==0:
 				self.base_command = PIANOTEQ_BINARY
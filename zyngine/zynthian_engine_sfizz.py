@@ -98,11 +98,14 @@ class zynthian_engine_sfizz(zynthian_engine):
 	# ---------------------------------------------------------------------------
 
 	def stop(self):
+		self.stop_cmd_channel()
 		try:
 			self.proc.sendline("quit")
 			self.proc.expect("Closing...")
 		except:
-			super().stop()
+			pass
+		# Terminate & reap the process, if it's still there
+		super().stop()
 
 	# ---------------------------------------------------------------------------
 	# Bank Management
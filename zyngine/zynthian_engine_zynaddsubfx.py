@@ -225,10 +225,7 @@ class zynthian_engine_zynaddsubfx(zynthian_engine):
 			liblo.send(self.osc_target, "/load_xlz",preset[0])
 			logging.debug("OSC => /load_xlz %s" % preset[0])
 		liblo.send(self.osc_target, "/volume")
-		i=0
-		while self.loading and i<100: 
-			sleep(0.1)
-			i=i+1
+		self.wait_stop_loading(10)
 		layer.send_ctrl_midi_cc()
 		return True
 
@@ -31,6 +31,7 @@ from collections import OrderedDict
 
 # Zynthian specific modules
 from zyncoder import *
+from zyngine.zynthian_controller import zynthian_controller
 
 
 class zynthian_layer:
@@ -84,6 +85,11 @@ class zynthian_layer:
 		self.listen_midi_cc = True
 		self.refresh_flag = False
 
+		# (chan, cc) => [zctrl, ...] MIDI-CC dispatch indexes
+		self.midi_learn_index = None
+		self.midi_cc_index = None
+		self.midi_index_key = None
+
 		self.reset_zs3()
 
 		self.engine.add_layer(self)
@@ -115,6 +121,8 @@ class zynthian_layer:
 		self.engine.del_layer(self)
 		# Clear refresh flag
 		self.refresh_flag=False
+		# Layer list changed => Invalidate MIDI-CC dispatch indexes
+		zynthian_controller.midi_bind_changed()
 
 
 	# ---------------------------------------------------------------------------
@@ -388,6 +396,7 @@ class zynthian_layer:
 
 	def init_controllers(self):
 		self.controllers_dict=self.engine.get_controllers_dict(self)
+		zynthian_controller.midi_bind_changed()
 
 
 	# Create controller screens from zynthian controller keys
@@ -454,7 +463,49 @@ class zynthian_layer:
 	# MIDI processing
 	#----------------------------------------------------------------------------
 
-	def midi_control_change(self, chan, ccnum, ccval):
+	# Build (chan, cc) => [zctrl, ...] indexes for MIDI-learned and MIDI-CC mapped controllers
+	def build_midi_cc_index(self, single_active_channel):
+		self.midi_learn_index = {}
+		self.midi_cc_index = {}
+		for zctrl in self.controllers_dict.values():
+			if zctrl.midi_learn_cc and zctrl.midi_learn_cc>0:
+				if single_active_channel:
+					key = (self.midi_chan, zctrl.midi_learn_cc)
+				else:
+					key = (zctrl.midi_learn_chan, zctrl.midi_learn_cc)
+				self.midi_learn_index.setdefault(key, []).append(zctrl)
+			elif zctrl.midi_cc is not None:
+				if single_active_channel:
+					key = (self.midi_chan, zctrl.midi_cc)
+				else:
+					key = (zctrl.midi_chan, zctrl.midi_cc)
+				self.midi_cc_index.setdefault(key, []).append(zctrl)
+
+
+	def refresh_midi_cc_index(self):
+		single_active_channel = self.zyngui.is_single_active_channel()
+		index_key = (zynthian_controller.midi_bind_version, single_active_channel)
+		if index_key!=self.midi_index_key:
+			self.build_midi_cc_index(single_active_channel)
+			self.midi_index_key = index_key
+
+
+	# Returns True if some controller in the layer could handle the CC
+	def is_midi_cc_bound(self, chan, ccnum, swap_info=None):
+		if self.engine.is_midi_cc_learned(chan, ccnum):
+			return True
+
+		if self.listen_midi_cc:
+			if swap_info is None:
+				swap_info = zynthian_controller.get_midi_cc_swap(chan, ccnum)
+			self.refresh_midi_cc_index()
+			if (chan, ccnum) in self.midi_learn_index or (swap_info >> 8, swap_info & 0xFF) in self.midi_cc_index:
+				return True
+
+		return False
+
+
+	def midi_control_change(self, chan, ccnum, ccval, swap_info=None):
 		if self.engine:
 			#logging.debug("Receving MIDI CH{}#CC{}={}".format(chan, ccnum, ccval))
 
@@ -465,34 +516,19 @@ class zynthian_layer:
 				pass
 
 			# MIDI-CC zctrls (also router MIDI-learn, aka CC-swaps)
-			#TODO => Optimize!! Use the MIDI learning mechanism for caching this ...
 			if self.listen_midi_cc:
-				swap_info = zyncoder.lib_zyncoder.get_midi_filter_cc_swap(chan, ccnum)
+				if swap_info is None:
+					swap_info = zynthian_controller.get_midi_cc_swap(chan, ccnum)
 				midi_chan = swap_info >> 8
 				midi_cc = swap_info & 0xFF
 
-				if self.zyngui.is_single_active_channel():
-					for k, zctrl in self.controllers_dict.items():
-						try:
-							if zctrl.midi_learn_cc and zctrl.midi_learn_cc>0:
-								if self.midi_chan==chan and zctrl.midi_learn_cc==ccnum:
-									self.engine.midi_zctrl_change(zctrl, ccval)
-							else:
-								if self.midi_chan==midi_chan and zctrl.midi_cc==midi_cc:
-									self.engine.midi_zctrl_change(zctrl, ccval)
-						except:
-							pass
-				else:
-					for k, zctrl in self.controllers_dict.items():
-						try:
-							if zctrl.midi_learn_cc and zctrl.midi_learn_cc>0:
-								if zctrl.midi_learn_chan==chan and zctrl.midi_learn_cc==ccnum:
-									self.engine.midi_zctrl_change(zctrl, ccval)
-							else:
-								if zctrl.midi_chan==midi_chan and zctrl.midi_cc==midi_cc:
-									self.engine.midi_zctrl_change(zctrl, ccval)
-						except:
-							pass
+				self.refresh_midi_cc_index()
+
+				for zctrl in self.midi_learn_index.get((chan, ccnum), ()):
+					self.engine.midi_zctrl_change(zctrl, ccval)
+
+				for zctrl in self.midi_cc_index.get((midi_chan, midi_cc), ()):
+					self.engine.midi_zctrl_change(zctrl, ccval)
 
 
 	def midi_bank_msb(self, i):
@@ -598,10 +634,11 @@ class zynthian_layer:
 				logging.warning("Invalid Controller on layer {}: {}".format(self.get_basepath(), e))
 
 
-	def wait_stop_loading(self):
-		while self.engine.loading>0:
+	def wait_stop_loading(self, timeout=None):
+		if self.engine.loading>0:
 			logging.debug("WAITING FOR STOP LOADING ...")
-			sleep(0.1)
+			return self.engine.wait_stop_loading(timeout)
+		return True
 
 
 	# ---------------------------------------------------------------------------
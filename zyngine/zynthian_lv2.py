@@ -34,19 +34,35 @@ import re
 import urllib.parse
 
 from enum import Enum
+from threading import RLock
 from collections import OrderedDict
 
 #------------------------------------------------------------------------------
 
+world = None
+world_lock = RLock()
+
+# Create the lilv world, if needed, and (re)scan the LV2 bundles
 def init_lilv():
 	global world
 
-	world.load_all()
+	with world_lock:
+		if world is None:
+			world = lilv.World()
+		world.load_all()
+
+		world.ns.ev = lilv.Namespace(world, "http://lv2plug.in/ns/ext/event#")
+		world.ns.presets = lilv.Namespace(world, "http://lv2plug.in/ns/ext/presets#")
+		world.ns.portprops = lilv.Namespace(world, "http://lv2plug.in/ns/ext/port-props#")
+		world.ns.portgroups = lilv.Namespace(world, "http://lv2plug.in/ns/ext/port-groups#")
 
-	world.ns.ev = lilv.Namespace(world, "http://lv2plug.in/ns/ext/event#")
-	world.ns.presets = lilv.Namespace(world, "http://lv2plug.in/ns/ext/presets#")
-	world.ns.portprops = lilv.Namespace(world, "http://lv2plug.in/ns/ext/port-props#")
-	world.ns.portgroups = lilv.Namespace(world, "http://lv2plug.in/ns/ext/port-groups#")
+
+# Get the lilv world. LV2 bundles are scanned on first call only.
+def get_world():
+	with world_lock:
+		if world is None:
+			init_lilv()
+		return world
 
 
 #------------------------------------------------------------------------------
@@ -134,7 +150,7 @@ def	is_plugin_ui(plugin):
 
 
 def generate_plugins_config_file(refresh=True):
-	global world, plugins, plugins_mtime
+	global plugins, plugins_mtime
 	genplugins = OrderedDict()
 
 	start = int(round(time.time() * 1000))
@@ -142,7 +158,7 @@ def generate_plugins_config_file(refresh=True):
 		if refresh:
 			init_lilv()
 
-		for plugin in world.get_all_plugins():
+		for plugin in get_world().get_all_plugins():
 			name = str(plugin.get_name())
 			genplugins[name] = {
 				'URL': str(plugin.get_uri()),
@@ -214,7 +230,7 @@ def convert_from_all_plugins():
 
 
 def get_plugin_type(plugin):
-	global world
+	world = get_world()
 	lv2_plugin_classes = {
 		"MIDI_SYNTH" : ("Instrument"),
 
@@ -278,28 +294,24 @@ def get_plugin_type(plugin):
 #------------------------------------------------------------------------------
 
 def generate_all_presets_cache(refresh=True):
-	global world
-
 	if refresh:
 		init_lilv()
 
-	plugins = world.get_all_plugins()
+	plugins = get_world().get_all_plugins()
 	for plugin in plugins:
 		_generate_plugin_presets_cache(plugin)
 
 
 def generate_plugin_presets_cache(plugin_url, refresh=True):
-	global world
-
 	if refresh:
 		init_lilv()
 
-	plugins = world.get_all_plugins()
+	plugins = get_world().get_all_plugins()
 	return _generate_plugin_presets_cache(plugins[plugin_url])
 
 
 def _generate_plugin_presets_cache(plugin):
-	global world
+	world = get_world()
 
 	plugin_name = str(plugin.get_name())
 	plugin_url = str(plugin.get_uri())
@@ -416,7 +428,7 @@ def sanitize_fname(s):
 
 
 def get_plugin_ports(plugin_url):
-	global world
+	world = get_world()
 
 	plugins = world.get_all_plugins()
 	plugin = plugins[plugin_url]
@@ -509,8 +521,6 @@ def get_node_value(node):
 
 #------------------------------------------------------------------------------
 
-world = lilv.World()
-init_lilv()
 load_plugins()
 
 if __name__ == '__main__':
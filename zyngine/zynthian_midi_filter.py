@@ -49,6 +49,7 @@
 import os
 import sys
 import logging
+from collections import OrderedDict
 
 sys.path.append(os.environ.get('ZYNTHIAN_UI_DIR'))
 
@@ -208,14 +209,19 @@ class MidiFilterRule:
 			self.set_rules()
 
 
-	def set_rules(self, set_rules=True):
-		n_rules=0
+	# Compile rule => generator of ((ev_type, ch, ev_num), action). Action is None for CLEAN.
+	def compile_rules(self):
 		if self.rule_type in ("IGNORE", "CLEAN"):
 			if self.args[0].ev_type:
 				ev_types = [MidiFilterArgs.EVENT_TYPE_CODES[self.args[0].ev_type]]
 			else:
 				ev_types = MidiFilterArgs.EVENT_TYPE_CODES.values()
 
+			if self.rule_type=="IGNORE":
+				action = ("IGNORE",)
+			else:
+				action = None
+
 			for ch in self.args[0].ch_list:
 				for ev_type in ev_types:
 					if self.args[0].ev_list is None:
@@ -227,13 +233,7 @@ class MidiFilterRule:
 						ev_list = self.args[0].ev_list
 
 					for ev_num in ev_list:
-						n_rules += 1
-						logging.debug("%s CH#%s %s#%s" % (self.rule_type,ch,ev_type,ev_num))
-						if set_rules:
-							if self.rule_type=="IGNORE":
-								zyncoder.lib_zyncoder.set_midi_filter_event_ignore(ev_type, ch, ev_num)
-							elif self.rule_type=="CLEAN":
-								zyncoder.lib_zyncoder.del_midi_filter_event_map(ev_type, ch, ev_num)
+						yield ((ev_type, ch, ev_num), action)
 
 		elif self.rule_type=="MAP":
 			if self.args[0].ev_type and self.args[1].ev_type:
@@ -261,44 +261,76 @@ class MidiFilterRule:
 						ev2_list = self.args[1].ev_list
 
 					for ev1_num,ev2_num in zip(ev1_list,ev2_list):
-						n_rules += 1
-						logging.debug("MAP CH#%s %s#%s => CH#%s %s#%s" % (ch1,ev1_type,ev1_num,ch2,ev2_type,ev2_num))
-						if set_rules:
-							zyncoder.lib_zyncoder.set_midi_filter_event_map(ev1_type, ch1, ev1_num, ev2_type, ch2, ev2_num)
+						yield ((ev1_type, ch1, ev1_num), ("MAP", ev2_type, ch2, ev2_num))
+
 
+	def set_rules(self, set_rules=True):
+		table = OrderedDict(self.compile_rules())
+		n_rules = len(table)
+		logging.debug("{} => {} rules".format(self.rule_type, n_rules))
+		if set_rules:
+			MidiFilterTable.apply(table)
 		return n_rules
 
 
 	def del_rules(self, del_rules=True):
-		n_rules=0
-		if self.args[0].ev_type:
-			ev_types = [MidiFilterArgs.EVENT_TYPE_CODES[self.args[0].ev_type]]
-		else:
-			ev_types = MidiFilterArgs.EVENT_TYPE_CODES.values()
+		table = OrderedDict((key, None) for key, action in self.compile_rules())
+		n_rules = len(table)
+		logging.debug("CLEAN => {} rules".format(n_rules))
+		if del_rules:
+			MidiFilterTable.apply(table)
+		return n_rules
 
-		for ch in self.args[0].ch_list:
-			for ev_type in ev_types:
-				if self.args[0].ev_list is None:
-					if ev_type not in (MidiFilterArgs.SINGLE_ARG_TYPES):
-						ev_list = range(0,128)
-					else:
-						ev_list=[0]
+
+#------------------------------------------------------------------------------
+# Rule table currently applied to the MIDI router
+#------------------------------------------------------------------------------
+
+class MidiFilterTable:
+
+	# (ev_type, ch, ev_num) => action
+	applied = {}
+
+	# Return only the changes that differ from the applied table
+	@classmethod
+	def diff(cls, table):
+		return OrderedDict((key, action) for key, action in table.items() if cls.applied.get(key)!=action)
+
+
+	# Apply a compiled table, pushing only the changed entries
+	@classmethod
+	def apply(cls, table):
+		changes = cls.diff(table)
+		if changes:
+			lib = zyncoder.lib_zyncoder
+			set_ignore = lib.set_midi_filter_event_ignore
+			set_map = lib.set_midi_filter_event_map
+			del_map = lib.del_midi_filter_event_map
+			for key, action in changes.items():
+				if action is None:
+					del_map(*key)
+					del cls.applied[key]
+				elif action[0]=="IGNORE":
+					set_ignore(*key)
+					cls.applied[key] = action
 				else:
-					ev_list = self.args[0].ev_list
+					set_map(*key, *action[1:])
+					cls.applied[key] = action
+		logging.debug("Applied {} MIDI filter changes".format(len(changes)))
+		return len(changes)
 
-				for ev_num in ev_list:
-					n_rules += 1
-					logging.debug("CLEAN CH#%s %s#%s" % (ch,ev_type,ev_num))
-					if del_rules:
-						zyncoder.lib_zyncoder.del_midi_filter_event_map(ev_type, ch, ev_num)
 
-		return n_rules
+	@classmethod
+	def reset(cls):
+		zyncoder.lib_zyncoder.reset_midi_filter_event_map()
+		cls.applied = {}
 
 
 class MidiFilterScript:
 
 	def __init__(self, script=None, set_rules=True):
 		self.rules={}
+		self.table=OrderedDict()
 		if script:
 			self.parse_script(script, set_rules)
 
@@ -316,19 +348,36 @@ class MidiFilterScript:
 				if rule[0:2]=='//':
 					continue
 				if len(rule)>8:
-					self.rules[rule]=MidiFilterRule(rule, set_rules)
+					self.rules[rule]=MidiFilterRule(rule, False)
 				else:
 					raise MidiFilterException("Script Rule is too short to be valid")
 
+		# Compile the full table. Later rules override the previous ones.
+		self.table=OrderedDict()
+		for rule in self.rules.values():
+			self.table.update(rule.compile_rules())
+
+		if set_rules:
+			self.apply()
+
+
+	#Apply the script table, removing the rules set by a replaced script
+	def apply(self, old_script=None):
+		changes = OrderedDict()
+		if old_script:
+			for key in old_script.table:
+				changes[key] = None
+		changes.update(self.table)
+		return MidiFilterTable.apply(changes)
+
 
 	#Selectively remove only the rules set by the script
 	def clean(self):
-		for rule in self.rules:
-			self.rules[rule].del_rules()
+		return MidiFilterTable.apply(OrderedDict((key, None) for key in self.table))
 
 
 	def clean_all(self):
-		zyncoder.lib_zyncoder.reset_midi_filter_event_map()
+		MidiFilterTable.reset()
 
 
 #------------------------------------------------------------------------------
@@ -395,6 +444,25 @@ class TestMidiFilterRule(unittest.TestCase):
 			MidiFilterRule("MAP CH#2,3:8 CC#7,8 => CH#4:11 CC#2,5", False)
 
 
+class TestMidiFilterScript(unittest.TestCase):
+
+	def test_compile_script(self):
+		mfs=MidiFilterScript(["IGNORE CH#3", "MAP CH#3 CC#5 => CH#4 CC#7", "CLEAN CH#3 CC#6"], False)
+		self.assertTrue(len(mfs.table)==128*7)
+		self.assertTrue(mfs.table[(0xB,3,5)]==("MAP",0xB,4,7))
+		self.assertTrue(mfs.table[(0xB,3,6)] is None)
+		self.assertTrue(mfs.table[(0x9,3,60)]==("IGNORE",))
+
+
+	def test_diff_table(self):
+		mfs=MidiFilterScript("IGNORE CH#3 CC#1:3", False)
+		MidiFilterTable.applied=dict(mfs.table)
+		self.assertTrue(len(MidiFilterTable.diff(mfs.table))==0)
+		mfs2=MidiFilterScript("IGNORE CH#3 CC#2:4", False)
+		self.assertTrue(len(MidiFilterTable.diff(mfs2.table))==1)
+		MidiFilterTable.applied={}
+
+
 if __name__ == '__main__':
 	# Set root logging level
 	logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
@@ -286,59 +286,58 @@ class zynthian_gui_arranger():
 				libseq.setChannel(bank, sequence, track, track)
 				empty_tracks[track] = True
 
+		# Read all events in a single pass, bucketed per MIDI channel
+		libsmf.setPosition(smf, 0)
+		channel_events = [[] for i in range(16)]
+		for time, track, status, value1, value2 in zynsmf.get_midi_events(smf):
+			channel_events[status & 0x0F].append((time, status, value1, value2))
+
 		# Do import
 		for channel in range(16):
 			# Iterate through each MIDI channel
-			libsmf.setPosition(smf, 0)
+			if not channel_events[channel]:
+				continue
+			empty_tracks[channel] = False
 			pattern = None
 			note_on = 0x90 | channel
 			note_off = 0x80 | channel
-			note_on_info = [[None,None,None,None] for i in range(127)] # Array of [pattern,time,velocity,step] indicating time that note on event received for matching note off and deriving duration
+			note_on_info = [[None,None,None,None] for i in range(128)] # Array of [pattern,time,velocity,step] indicating time that note on event received for matching note off and deriving duration
 			pattern_position = self.selected_cell[0] * ticks_per_beat # Position of current pattern within track in ticks
 
-			while libsmf.getEvent(smf, True):
-				type = libsmf.getEventType()
-				time = libsmf.getEventTime()
-				status = libsmf.getEventStatus()
-				if type == 0x01:
-					# MIDI event
-					if channel != libsmf.getEventChannel():
-						continue
-					note = libsmf.getEventValue1()
-					velocity = libsmf.getEventValue2()
-					if status == note_on and velocity:
-						# Found note-on event
-						if time >= pattern_position + ticks_in_pattern or pattern == None:
-							while time >= pattern_position + ticks_in_pattern:
-								pattern_position += ticks_in_pattern
-							pattern = libseq.createPattern()
-							libseq.selectPattern(pattern)
-							libseq.setBeatsInPattern(beats_in_pattern)
-							libseq.setStepsPerBeat(steps_per_beat)
-							position = int(pattern_position / ticks_per_clock)
-							libseq.addPattern(bank, sequence, channel, position, pattern, True)
-						step = int((time - pattern_position) / ticks_per_step)
-						note_on_info[note] = [pattern,time,velocity,step]
-						libseq.addNote(step, note, velocity, 1) # Add short event, may overwrite later when note-off detected
-					elif status == note_off or status == note_on and velocity == 0:
-						# Found note-off event
-						if note_on_info[note][0] == None:
-							continue # Do not have corresponding note-on for this note-off event
-						current_pattern = pattern
-						old_pattern = note_on_info[note][0]
-						trigger_time = note_on_info[note][1]
-						velocity = note_on_info[note][2]
-						step = note_on_info[note][3]
+			for time, status, note, velocity in channel_events[channel]:
+				if status == note_on and velocity:
+					# Found note-on event
+					if time >= pattern_position + ticks_in_pattern or pattern == None:
+						while time >= pattern_position + ticks_in_pattern:
+							pattern_position += ticks_in_pattern
+						pattern = libseq.createPattern()
+						libseq.selectPattern(pattern)
+						libseq.setBeatsInPattern(beats_in_pattern)
+						libseq.setStepsPerBeat(steps_per_beat)
+						position = int(pattern_position / ticks_per_clock)
+						libseq.addPattern(bank, sequence, channel, position, pattern, True)
+					step = int((time - pattern_position) / ticks_per_step)
+					note_on_info[note] = [pattern,time,velocity,step]
+					libseq.addNote(step, note, velocity, 1) # Add short event, may overwrite later when note-off detected
+				elif status == note_off or status == note_on and velocity == 0:
+					# Found note-off event
+					if note_on_info[note][0] == None:
+						continue # Do not have corresponding note-on for this note-off event
+					old_pattern = note_on_info[note][0]
+					trigger_time = note_on_info[note][1]
+					velocity = note_on_info[note][2]
+					step = note_on_info[note][3]
+					if old_pattern != pattern:
 						libseq.selectPattern(old_pattern)
-						duration = int((time - trigger_time) / ticks_per_step)
-						if duration < 1:
-							duration = 1
-						libseq.addNote(step, note, velocity, duration)
-						note_on_info[note] = [None,None,None,None]
-						pattern = current_pattern
+					duration = int((time - trigger_time) / ticks_per_step)
+					if duration < 1:
+						duration = 1
+					libseq.addNote(step, note, velocity, duration)
+					note_on_info[note] = [None,None,None,None]
+					if old_pattern != pattern:
 						libseq.selectPattern(pattern)
-					if(empty_tracks[channel]):
-						empty_tracks[channel] = False
+
+		libsmf.removeSmf(smf)
 
 		# Remove empty tracks
 		for track in range(15, -1, -1):
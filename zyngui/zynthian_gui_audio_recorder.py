@@ -55,7 +55,11 @@ class zynthian_gui_audio_recorder(zynthian_gui_selector):
 		self.rec_proc = None
 		self.play_proc = None
 
-		self.audio_out = ["system"]
+		# Restored from snapshot before the screen was created
+		try:
+			self.audio_out = zynthian_gui_config.zyngui.screens['layer'].audio_recorder_out
+		except:
+			self.audio_out = ["system"]
 
 		super().__init__('Audio Recorder', True)
 
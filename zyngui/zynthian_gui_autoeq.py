@@ -116,25 +116,30 @@ class zynthian_gui_autoeq():
 			sleep(0.04)
 
 
+	# Read monitor values in the worker thread and post the drawing to the Tk main loop
 	def refresh_bars(self):
 		self.mon_layer = self.zyngui.screens['layer'].get_layer_by_jackname('1/3')
-		x0 = 0
+		mon_values = []
 		if self.mon_layer:
-			i = 0
 			for k, v in self.mon_layer.engine.get_lv2_monitors_dict().items():
-				mon_y = int((100 + v) * self.height / 100)
-				#logging.error("MON {}: {} => {}".format(i,k,mon_y))
-				self.canvas.coords(self.mon_bars[i], x0, self.height, x0 + self.bar_width, self.height - mon_y)
-				x0 += self.bar_width
-				i += 1
-				if i>=self.n_bands:
+				mon_values.append(int((100 + v) * self.height / 100))
+				if len(mon_values)>=self.n_bands:
 					break
-		else:
-			for i in range(self.n_bands):
-				self.canvas.coords(self.mon_bars[i], x0, self.height, x0 + self.bar_width, self.height)
-				x0 += self.bar_width
 
 		self.eq_layer = self.zyngui.screens['layer'].get_layer_by_jackname('ZamGEQ31-01')
+		self.zyngui.post_ui_update(lambda: self.draw_bars(mon_values), self.canvas)
+
+
+	def draw_bars(self, mon_values):
+		x0 = 0
+		for i in range(self.n_bands):
+			try:
+				mon_y = mon_values[i]
+			except IndexError:
+				mon_y = 0
+			self.canvas.coords(self.mon_bars[i], x0, self.height, x0 + self.bar_width, self.height - mon_y)
+			x0 += self.bar_width
+
 		x0 = 0
 		if self.eq_layer:
 			#TODO: To implement!!
@@ -65,6 +65,7 @@ class zynthian_gui_base:
 		self.status_recplay = None
 		self.status_midi = None
 		self.status_midi_clock = None
+		self.status_drawn = {}
 
 		#Status Area Parameters
 		self.status_h = zynthian_gui_config.topbar_height
@@ -237,18 +238,33 @@ class zynthian_gui_base:
 			return False
 
 
+	# Only touch canvas items whose drawn state has actually changed
+	def refresh_status_item(self, item, coords=None, **config):
+		drawn = self.status_drawn.setdefault(item, {})
+		if coords is not None and drawn.get('coords') != coords:
+			self.status_canvas.coords(item, coords)
+			drawn['coords'] = coords
+		changed = {}
+		for k, v in config.items():
+			if drawn.get(k) != v:
+				changed[k] = v
+		if changed:
+			self.status_canvas.itemconfig(item, **changed)
+			drawn.update(changed)
+
+
 	def refresh_status(self, status={}):
 		if self.shown:
 			if zynthian_gui_config.show_cpu_status:
 				# Display CPU-load bar
 				l = int(status['cpu_load']*self.status_l/100)
-				cr = int(status['cpu_load']*255/100)
+				# Quantize color to bar length, so it only changes when the bar does
+				cr = int(l*255/self.status_l)
 				cg = 255-cr
 				color = "#%02x%02x%02x" % (cr,cg,0)
 				try:
 					if self.status_cpubar:
-						self.status_canvas.coords(self.status_cpubar,(0, 0, l, self.status_rh))
-						self.status_canvas.itemconfig(self.status_cpubar, fill=color)
+						self.refresh_status_item(self.status_cpubar, coords=(0, 0, l, self.status_rh), fill=color)
 					else:
 						self.status_cpubar=self.status_canvas.create_rectangle((0, 0, l, self.status_rh), fill=color, width=0)
 				except Exception as e:
@@ -270,77 +286,71 @@ class zynthian_gui_base:
 				try:
 					# Channel A (left)
 					if self.status_peak_lA:
-						self.status_canvas.coords(self.status_peak_lA,(0, 0, llA, self.status_rh/2))
-						self.status_canvas.itemconfig(self.status_peak_lA, state='normal')
+						self.refresh_status_item(self.status_peak_lA, coords=(0, 0, llA, self.status_rh/2), state='normal')
 					else:
 						self.status_peak_lA=self.status_canvas.create_rectangle((0, 0, 0, 0), fill="#00C000", width=0, state='hidden')
 
 					if self.status_peak_mA:
 						if lmA >= self.dpm_scale_lm:
-							self.status_canvas.coords(self.status_peak_mA,(self.dpm_scale_lm, 0, lmA, self.status_rh/2))
-							self.status_canvas.itemconfig(self.status_peak_mA, state="normal")
+							self.refresh_status_item(self.status_peak_mA, coords=(self.dpm_scale_lm, 0, lmA, self.status_rh/2), state="normal")
 						else:
-							self.status_canvas.itemconfig(self.status_peak_mA, state="hidden")
+							self.refresh_status_item(self.status_peak_mA, state="hidden")
 					else:
 						self.status_peak_mA=self.status_canvas.create_rectangle((0, 0, 0, 0), fill="#C0C000", width=0, state='hidden')
 
 					if self.status_peak_hA:
 						if lhA >= self.dpm_scale_lh:
-							self.status_canvas.coords(self.status_peak_hA,(self.dpm_scale_lh, 0, lhA, self.status_rh/2))
-							self.status_canvas.itemconfig(self.status_peak_hA, state="normal")
+							self.refresh_status_item(self.status_peak_hA, coords=(self.dpm_scale_lh, 0, lhA, self.status_rh/2), state="normal")
 						else:
-							self.status_canvas.itemconfig(self.status_peak_hA, state="hidden")
+							self.refresh_status_item(self.status_peak_hA, state="hidden")
 					else:
 						self.status_peak_hA=self.status_canvas.create_rectangle((0, 0, 0, 0), fill="#C00000", width=0, state='hidden')
 
 					if self.status_hold_A:
-						self.status_canvas.coords(self.status_hold_A,(lholdA, 0, lholdA, self.status_rh/2))
+						self.refresh_status_item(self.status_hold_A, coords=(lholdA, 0, lholdA, self.status_rh/2))
 						if lholdA >= self.dpm_scale_lh:
-							self.status_canvas.itemconfig(self.status_hold_A, state="normal", fill="#FF0000")
+							self.refresh_status_item(self.status_hold_A, state="normal", fill="#FF0000")
 						elif lholdA >= self.dpm_scale_lm:
-							self.status_canvas.itemconfig(self.status_hold_A, state="normal", fill="#FFFF00")
+							self.refresh_status_item(self.status_hold_A, state="normal", fill="#FFFF00")
 						elif lholdA > 0:
-							self.status_canvas.itemconfig(self.status_hold_A, state="normal", fill="#00FF00")
+							self.refresh_status_item(self.status_hold_A, state="normal", fill="#00FF00")
 						else:
-							self.status_canvas.itemconfig(self.status_hold_A, state="hidden")
+							self.refresh_status_item(self.status_hold_A, state="hidden")
 					else:
 						self.status_hold_A=self.status_canvas.create_rectangle((0, 0, 0, 0), width=0, state='hidden')
 
 					# Channel B (right)
 					if self.status_peak_lB:
-						self.status_canvas.coords(self.status_peak_lB,(0, self.status_rh/2 + 1, llB, self.status_rh + 1))
-						self.status_canvas.itemconfig(self.status_peak_lB, state='normal')
+						self.refresh_status_item(self.status_peak_lB, coords=(0, self.status_rh/2 + 1, llB, self.status_rh + 1), state='normal')
 					else:
 						self.status_peak_lB=self.status_canvas.create_rectangle((0, 0, 0, 0), fill="#00C000", width=0, state='hidden')
 
 					if self.status_peak_mB:
 						if lmB >= self.dpm_scale_lm:
-							self.status_canvas.coords(self.status_peak_mB,(self.dpm_scale_lm, self.status_rh/2 + 1, lmB, self.status_rh + 1))
-							self.status_canvas.itemconfig(self.status_peak_mB, state="normal")
+							self.refresh_status_item(self.status_peak_mB, coords=(self.dpm_scale_lm, self.status_rh/2 + 1, lmB, self.status_rh + 1), state="normal")
 						else:
-							self.status_canvas.itemconfig(self.status_peak_mB, state="hidden")
+							self.refresh_status_item(self.status_peak_mB, state="hidden")
 					else:
 						self.status_peak_mB=self.status_canvas.create_rectangle((0, 0, 0, 0), fill="#C0C000", width=0, state='hidden')
 
 					if self.status_peak_hB:
 						if lhB >= self.dpm_scale_lh:
-							self.status_canvas.coords(self.status_peak_hB,(self.dpm_scale_lh, self.status_rh/2 + 1, lhB, self.status_rh + 1))
-							self.status_canvas.itemconfig(self.status_peak_hB, state="normal")
+							self.refresh_status_item(self.status_peak_hB, coords=(self.dpm_scale_lh, self.status_rh/2 + 1, lhB, self.status_rh + 1), state="normal")
 						else:
-							self.status_canvas.itemconfig(self.status_peak_hB, state="hidden")
+							self.refresh_status_item(self.status_peak_hB, state="hidden")
 					else:
 						self.status_peak_hB=self.status_canvas.create_rectangle((0, 0, 0, 0), fill="#C00000", width=0, state='hidden')
 
 					if self.status_hold_B:
-						self.status_canvas.coords(self.status_hold_B,(lholdB, self.status_rh/2 + 1, lholdB, self.status_rh + 1))
+						self.refresh_status_item(self.status_hold_B, coords=(lholdB, self.status_rh/2 + 1, lholdB, self.status_rh + 1))
 						if lholdB >= self.dpm_scale_lh:
-							self.status_canvas.itemconfig(self.status_hold_B, state="normal", fill="#FF0000")
+							self.refresh_status_item(self.status_hold_B, state="normal", fill="#FF0000")
 						elif lholdB >= self.dpm_scale_lm:
-							self.status_canvas.itemconfig(self.status_hold_B, state="normal", fill="#FFFF00")
+							self.refresh_status_item(self.status_hold_B, state="normal", fill="#FFFF00")
 						elif lholdB > 0:
-							self.status_canvas.itemconfig(self.status_hold_B, state="normal", fill="#00FF00")
+							self.refresh_status_item(self.status_hold_B, state="normal", fill="#00FF00")
 						else:
-							self.status_canvas.itemconfig(self.status_hold_B, state="hidden")
+							self.refresh_status_item(self.status_hold_B, state="hidden")
 					else:
 						self.status_hold_B=self.status_canvas.create_rectangle((0, 0, 0, 0), width=0, state='hidden')
 
@@ -372,7 +382,7 @@ class zynthian_gui_base:
 					font=("FontAwesome", self.status_fs, "bold"),
 					text=flags)
 			else:
-				self.status_canvas.itemconfig(self.status_error, text=flags, fill=color)
+				self.refresh_status_item(self.status_error, text=flags, fill=color)
 
 			# Display Rec/Play flags
 			flags = ""
@@ -408,7 +418,7 @@ class zynthian_gui_base:
 					font=("FontAwesome", self.status_fs, "bold"),
 					text=flags)
 			else:
-				self.status_canvas.itemconfig(self.status_recplay, text=flags, fill=color)
+				self.refresh_status_item(self.status_recplay, text=flags, fill=color)
 
 			# Display MIDI flag
 			if 'midi' in status and status['midi']:
@@ -427,7 +437,7 @@ class zynthian_gui_base:
 					text="m",
 					state=mstate)
 			else:
-				self.status_canvas.itemconfig(self.status_midi, state=mstate)
+				self.refresh_status_item(self.status_midi, state=mstate)
 
 			# Display MIDI clock flag
 			if 'midi_clock' in status and status['midi_clock']:
@@ -444,7 +454,7 @@ class zynthian_gui_base:
 					fill=zynthian_gui_config.color_status_midi,
 					state=mcstate)
 			else:
-				self.status_canvas.itemconfig(self.status_midi_clock, state=mcstate)
+				self.refresh_status_item(self.status_midi_clock, state=mcstate)
 
 
 	def refresh_loading(self):
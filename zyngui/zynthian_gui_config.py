@@ -328,6 +328,27 @@ restore_last_state=int(os.environ.get('ZYNTHIAN_UI_RESTORE_LAST_STATE',False))
 snapshot_mixer_settings=int(os.environ.get('ZYNTHIAN_UI_SNAPSHOT_MIXER_SETTINGS',False))
 show_cpu_status=int(os.environ.get('ZYNTHIAN_UI_SHOW_CPU_STATUS',False))
 
+# Adaptive polling of encoders, switches, MIDI-UI & OSC (seconds)
+# MIDI-UI queue has no wake-up, so the polling interval is the worst-case latency of
+# program changes & UI-handled CCs: 40ms when active, 80ms after idle timeout.
+# OSC messages wake up the polling immediately.
+ui_poll_interval=float(os.environ.get('ZYNTHIAN_UI_POLL_INTERVAL',0.04))
+ui_poll_idle_interval=float(os.environ.get('ZYNTHIAN_UI_POLL_IDLE_INTERVAL',0.08))
+ui_poll_idle_timeout=float(os.environ.get('ZYNTHIAN_UI_POLL_IDLE_TIMEOUT',3))
+
+# Frame interval for draining the UI-update queue (seconds)
+ui_update_interval=float(os.environ.get('ZYNTHIAN_UI_UPDATE_INTERVAL',0.04))
+
+# Health sampler (throttling, temperature & load). Root can point to a fake sysfs tree.
+health_sysfs_root=os.environ.get('ZYNTHIAN_HEALTH_SYSFS_ROOT',"/")
+health_sample_interval=float(os.environ.get('ZYNTHIAN_HEALTH_SAMPLE_INTERVAL',1.0))
+
+# Create rarely used screens in background after initial snapshot is loaded
+ui_prewarm_screens=int(os.environ.get('ZYNTHIAN_UI_PREWARM_SCREENS',1))
+
+# Engine supervisor: check for crashed engine processes each N seconds (0 => disabled)
+engine_supervisor_interval=float(os.environ.get('ZYNTHIAN_ENGINE_SUPERVISOR_INTERVAL',1.0))
+
 #------------------------------------------------------------------------------
 # Audio Options
 #------------------------------------------------------------------------------
@@ -29,13 +29,13 @@ import sys
 import logging
 import subprocess
 from time import sleep
+from threading import Thread
 from collections import OrderedDict
 
 # Zynthian specific modules
 import zynautoconnect
 from zyngine import *
-from zyngine.zynthian_engine_pianoteq import *
-from zyngine.zynthian_engine_jalv import *
+from zyngine.zynthian_engine import engine_reaper
 from zyngui import zynthian_gui_config
 from zyngui.zynthian_gui_selector import zynthian_gui_selector
 
@@ -52,40 +52,47 @@ class zynthian_gui_engine(zynthian_gui_selector):
 
 	single_layer_engines = ["BF", "MD", "PT", "PD", "AE", "CS"]
 	check_channels_engines = ["AE"]
+	pianoteq_sw_dir = os.environ.get('ZYNTHIAN_SW_DIR',"/zynthian/zynthian-sw") + "/pianoteq6"
 
+	# Engine classes are referenced by name => Engine modules are imported on demand
 	@classmethod
 	def init_engine_info(cls):
 
 		cls.engine_info=OrderedDict([
-			["MX", ("Mixer", "ALSA Mixer", "MIXER", None, zynthian_engine_mixer, True)],
-			["ZY", ("ZynAddSubFX", "ZynAddSubFX - Synthesizer", "MIDI Synth", None, zynthian_engine_zynaddsubfx, True)],
-			["FS", ("FluidSynth", "FluidSynth - SF2 Player", "MIDI Synth", None, zynthian_engine_fluidsynth, True)],
-			["SF", ("Sfizz", "Sfizz - SFZ Player", "MIDI Synth", None, zynthian_engine_sfizz, True)],
-			["LS", ("LinuxSampler", "LinuxSampler - SFZ/GIG Player", "MIDI Synth", None, zynthian_engine_linuxsampler, True)],
-			["BF", ("setBfree", "setBfree - Hammond Emulator", "MIDI Synth", None, zynthian_engine_setbfree, True)],
-			["AE", ("Aeolus", "Aeolus - Pipe Organ Emulator", "MIDI Synth", None, zynthian_engine_aeolus, True)],
-			['PD', ("PureData", "PureData - Visual Programming", "Special", None, zynthian_engine_puredata, True)],
-			#['CS', ("CSound", "CSound Audio Language", "Special", None, zynthian_engine_csound, False)],
-			['MD', ("MOD-UI", "MOD-UI - Plugin Host", "Special", None, zynthian_engine_modui, True)]
+			["MX", ("Mixer", "ALSA Mixer", "MIXER", None, "zynthian_engine_mixer", True)],
+			["ZY", ("ZynAddSubFX", "ZynAddSubFX - Synthesizer", "MIDI Synth", None, "zynthian_engine_zynaddsubfx", True)],
+			["FS", ("FluidSynth", "FluidSynth - SF2 Player", "MIDI Synth", None, "zynthian_engine_fluidsynth", True)],
+			["SF", ("Sfizz", "Sfizz - SFZ Player", "MIDI Synth", None, "zynthian_engine_sfizz", True)],
+			["LS", ("LinuxSampler", "LinuxSampler - SFZ/GIG Player", "MIDI Synth", None, "zynthian_engine_linuxsampler", True)],
+			["BF", ("setBfree", "setBfree - Hammond Emulator", "MIDI Synth", None, "zynthian_engine_setbfree", True)],
+			["AE", ("Aeolus", "Aeolus - Pipe Organ Emulator", "MIDI Synth", None, "zynthian_engine_aeolus", True)],
+			['PD', ("PureData", "PureData - Visual Programming", "Special", None, "zynthian_engine_puredata", True)],
+			#['CS', ("CSound", "CSound Audio Language", "Special", None, "zynthian_engine_csound", False)],
+			['MD', ("MOD-UI", "MOD-UI - Plugin Host", "Special", None, "zynthian_engine_modui", True)]
 		])
 
-		if check_pianoteq_binary():
-			pianoteq_title="Pianoteq {}.{} {}{}".format(
-				PIANOTEQ_VERSION[0],
-				PIANOTEQ_VERSION[1],
-				PIANOTEQ_PRODUCT,
-				" (Demo)" if PIANOTEQ_TRIAL else "")
-			cls.engine_info['PT'] = (PIANOTEQ_NAME, pianoteq_title, "MIDI Synth", None, zynthian_engine_pianoteq, True)
-		
-		for plugin_name, plugin_info in get_jalv_plugins().items():
+		# Pianoteq engine module probes the binary when imported => only if it's installed
+		if os.path.isdir(cls.pianoteq_sw_dir):
+			pt = sys.modules[get_engine_class("zynthian_engine_pianoteq").__module__]
+			if pt.check_pianoteq_binary():
+				pianoteq_title="Pianoteq {}.{} {}{}".format(
+					pt.PIANOTEQ_VERSION[0],
+					pt.PIANOTEQ_VERSION[1],
+					pt.PIANOTEQ_PRODUCT,
+					" (Demo)" if pt.PIANOTEQ_TRIAL else "")
+				cls.engine_info['PT'] = (pt.PIANOTEQ_NAME, pianoteq_title, "MIDI Synth", None, "zynthian_engine_pianoteq", True)
+
+		# Plugin list is read from config => jalv engine module is not needed yet
+		for plugin_name, plugin_info in zynthian_lv2.get_plugins().items():
 			eng = 'JV/{}'.format(plugin_name)
-			cls.engine_info[eng] = (plugin_name, plugin_name, plugin_info['TYPE'], plugin_info.get('CLASS', None), zynthian_engine_jalv, plugin_info['ENABLED'])
+			cls.engine_info[eng] = (plugin_name, plugin_name, plugin_info['TYPE'], plugin_info.get('CLASS', None), "zynthian_engine_jalv", plugin_info['ENABLED'])
 
 
 	def __init__(self):
 		self.reset_index = True
 		self.zyngine_counter = 0
 		self.zyngines = OrderedDict()
+		self.supervisor_thread = None
 		self.set_engine_type("MIDI Synth")
 		super().__init__('Engine', True)
 
@@ -138,7 +145,7 @@ class zynthian_gui_engine(zynthian_gui_selector):
 			# Add engines on this category...
 			for eng, info in infos.items():
 				# For some engines, check if needed channels are free ...
-				if eng not in self.check_channels_engines or all(chan in self.zyngui.screens['layer'].get_free_midi_chans() for chan in info[4].get_needed_channels()):
+				if eng not in self.check_channels_engines or all(chan in self.zyngui.screens['layer'].get_free_midi_chans() for chan in get_engine_class(info[4]).get_needed_channels()):
 					self.list_data.append((eng,len(self.list_data),info[1],info[0]))
 
 		# Display help if no engines are enabled ...
@@ -169,43 +176,169 @@ class zynthian_gui_engine(zynthian_gui_selector):
 			self.zyngui.screens['layer'].add_layer_engine(self.list_data[i][0], self.midi_chan)
 
 
+	def create_engine(self, eng):
+		info=self.engine_info[eng]
+		zynthian_engine_class=get_engine_class(info[4])
+		if eng[0:3]=="JV/":
+			return zynthian_engine_class(info[0], info[2], self.zyngui)
+		else:
+			# Engines with fixed jack name & ports can't start until the previous instance is gone
+			if eng!="SF" and not engine_reaper.wait(eng):
+				logging.warning("Previous instance of engine '{}' is still stopping".format(eng))
+			return zynthian_engine_class(self.zyngui)
+
+
 	def start_engine(self, eng):
 		if eng not in self.zyngines:
-			info=self.engine_info[eng]
-			zynthian_engine_class=info[4]
+			zyngine=self.create_engine(eng)
 			if eng[0:3]=="JV/":
 				eng="JV/{}".format(self.zyngine_counter)
-				self.zyngines[eng]=zynthian_engine_class(info[0], info[2], self.zyngui)
-			else:
-				if eng=="SF":
-					eng="SF/{}".format(self.zyngine_counter)
-				self.zyngines[eng]=zynthian_engine_class(self.zyngui)
+			elif eng=="SF":
+				eng="SF/{}".format(self.zyngine_counter)
+			self.zyngines[eng]=zyngine
+			zynthian_engine.jacknames_starting.clear()
 
 		self.zyngine_counter+=1
 		return self.zyngines[eng]
 
 
+	# Start several engines concurrently, waiting for all of them.
+	# Returns the engine instances, in the same order than the nickname list.
+	def start_engines(self, eng_list):
+		eng_keys=[]
+		new_engines=OrderedDict()
+		for eng in eng_list:
+			if eng in self.zyngines or eng in new_engines:
+				eng_key=eng
+			else:
+				if eng[0:3]=="JV/":
+					eng_key="JV/{}".format(self.zyngine_counter)
+				elif eng=="SF":
+					eng_key="SF/{}".format(self.zyngine_counter)
+				else:
+					eng_key=eng
+				new_engines[eng_key]=eng
+			eng_keys.append(eng_key)
+			self.zyngine_counter+=1
+
+		results={}
+		def start_engine_task(eng_key, eng):
+			try:
+				results[eng_key]=self.create_engine(eng)
+			except Exception as e:
+				logging.error("Can't start engine '{}' => {}".format(eng, e))
+				results[eng_key]=e
+
+		threads=[]
+		for eng_key, eng in new_engines.items():
+			thread=Thread(target=start_engine_task, args=(eng_key, eng), daemon=True)
+			thread.start()
+			threads.append(thread)
+		for thread in threads:
+			thread.join()
+		zynthian_engine.jacknames_starting.clear()
+
+		error=None
+		for eng_key in new_engines:
+			if isinstance(results[eng_key], Exception):
+				error=results[eng_key]
+			else:
+				self.zyngines[eng_key]=results[eng_key]
+		if error:
+			raise error
+
+		return [self.zyngines[eng_key] for eng_key in eng_keys]
+
+
 	def stop_engine(self, eng, wait=0):
 		if eng in self.zyngines:
-			self.zyngines[eng].stop()
-			del self.zyngines[eng]
+			zyngine = self.zyngines.pop(eng)
 			if wait>0:
+				zyngine.stop()
 				sleep(wait)
+			else:
+				engine_reaper.reap(zyngine)
 
 
+	# Unused engines are detached and stopped by the reaper, in background
 	def stop_unused_engines(self):
 		for eng in list(self.zyngines.keys()):
 			if len(self.zyngines[eng].layers)==0:
 				logging.debug("Stopping Unused Engine '{}' ...".format(eng))
-				self.zyngines[eng].stop()
-				del self.zyngines[eng]
+				engine_reaper.reap(self.zyngines.pop(eng))
 
 
 	def stop_unused_jalv_engines(self):
 		for eng in list(self.zyngines.keys()):
 			if len(self.zyngines[eng].layers)==0 and eng[0:3]=="JV/":
-				self.zyngines[eng].stop()
-				del self.zyngines[eng]
+				engine_reaper.reap(self.zyngines.pop(eng))
+
+
+	# ---------------------------------------------------------------------------
+	# Engine Supervisor => Restart crashed engines, replaying layers state
+	# ---------------------------------------------------------------------------
+
+	def start_supervisor(self):
+		if zynthian_gui_config.engine_supervisor_interval>0:
+			self.supervisor_thread=Thread(target=self.supervisor_thread_task, args=())
+			self.supervisor_thread.daemon = True # thread dies with the program
+			self.supervisor_thread.start()
+
+
+	def supervisor_thread_task(self):
+		while not self.zyngui.exit_flag:
+			sleep(zynthian_gui_config.engine_supervisor_interval)
+			for eng, zyngine in list(self.zyngines.items()):
+				if zyngine.is_crashed():
+					# Restart from UI thread, serialized with layer & snapshot operations
+					self.zyngui.post_ui_update(lambda eng=eng, zyngine=zyngine: self.restart_engine(eng, zyngine), ("restart", eng))
+
+
+	def restart_engine(self, eng, zyngine):
+		# Engine could be removed, replaced or stopped meanwhile
+		if self.zyngines.get(eng) is not zyngine or not zyngine.is_crashed() or engine_reaper.is_pending(zyngine.jackname):
+			return
+		logging.error("Engine '{}' has crashed!".format(eng))
+		self.zyngui.start_loading()
+		try:
+			self.restart_engine_layers(zyngine)
+			logging.info("Engine '{}' restarted".format(eng))
+		except Exception as e:
+			logging.error("Can't restart engine '{}' => {}".format(eng, e))
+		finally:
+			self.zyngui.stop_loading()
+
+
+	def restart_engine_layers(self, zyngine):
+
+		# Take state from the layer model, before restarting
+		snapshots = [(layer, layer.get_snapshot()) for layer in zyngine.layers]
+
+		zyngine.reset_loading()
+		zyngine.restart()
+		zyngine.restore_layers_setup()
+
+		# Replay bank, preset & controller values
+		for layer, snapshot in snapshots:
+			layer.restore_snapshot_1(snapshot)
+		for layer, snapshot in snapshots:
+			layer.restore_snapshot_2(snapshot)
+
+		# Reconnect the new engine's ports
+		self.zyngui.zynautoconnect(True)
+
+
+	def stop_jalv_pool(self):
+		# Pool only exists if jalv engine module has been loaded
+		jalv_module = sys.modules.get("zyngine.zynthian_engine_jalv")
+		if jalv_module:
+			jalv_module.jalv_pool.stop()
+
+
+	# Wait for engines being stopped in background (i.e. on exit)
+	def wait_stopped_engines(self, timeout=5):
+		if not engine_reaper.wait_all(timeout):
+			logging.warning("Some engines are not stopped after {} seconds".format(timeout))
 
 
 	def get_engine_info(self, eng):
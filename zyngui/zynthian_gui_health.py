@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#******************************************************************************
+# ZYNTHIAN PROJECT: Zynthian GUI
+#
+# Zynthian Health Sampler Class
+#
+# Reads throttling flags, SoC temperature and load average directly from
+# sysfs/procfs, keeping the files open, so no process is forked for polling.
+#
+#******************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+#******************************************************************************
+
+import os
+import logging
+from time import monotonic
+
+#------------------------------------------------------------------------------
+# Zynthian Health Sampler Class
+#------------------------------------------------------------------------------
+
+class zynthian_gui_health():
+
+	# Relative paths from sysfs root
+	throttled_paths = [
+		"sys/devices/platform/soc/soc:firmware/get_throttled",
+		"sys/devices/platform/soc/soc:firmware/raspberrypi-hwmon/hwmon/hwmon0/in0_lcrit_alarm"
+	]
+	temp_path = "sys/class/thermal/thermal_zone0/temp"
+	loadavg_path = "proc/loadavg"
+
+	# get_throttled bits
+	UNDERVOLTAGE = 0x1
+	FREQ_CAPPED = 0x2
+	THROTTLED = 0x4
+
+
+	def __init__(self, root="/", interval=1.0):
+		self.root = root
+		self.interval = interval
+		self.files = {}
+		self.ts = None
+		self.sample = {
+			'undervoltage': False,
+			'overtemp': False,
+			'temp': None,
+			'load_avg': None
+		}
+
+
+	def open_file(self, key, paths):
+		if key not in self.files:
+			self.files[key] = None
+			for path in paths:
+				try:
+					self.files[key] = open(os.path.join(self.root, path), 'rb', buffering=0)
+					break
+				except:
+					pass
+			if self.files[key] is None:
+				logging.info("Health file for '{}' not available at '{}'".format(key, self.root))
+		return self.files[key]
+
+
+	def read_file(self, key, paths):
+		f = self.open_file(key, paths)
+		if f:
+			try:
+				f.seek(0)
+				return f.read(256).decode('utf-8','ignore').strip()
+			except Exception as e:
+				logging.error("Can't read health file for '{}' => {}".format(key, e))
+				self.close_file(key)
+		return None
+
+
+	def close_file(self, key):
+		try:
+			self.files[key].close()
+		except:
+			pass
+		# Let it be reopened on next sample
+		self.files.pop(key, None)
+
+
+	def close(self):
+		for key in list(self.files):
+			self.close_file(key)
+
+
+	def get_throttled(self):
+		res = self.read_file('throttled', self.throttled_paths)
+		if res:
+			try:
+				return int(res, 16)
+			except ValueError:
+				pass
+		return None
+
+
+	def get_temp(self):
+		res = self.read_file('temp', [self.temp_path])
+		if res:
+			try:
+				return int(res)/1000
+			except ValueError:
+				pass
+		return None
+
+
+	def get_load_avg(self):
+		res = self.read_file('loadavg', [self.loadavg_path])
+		if res:
+			try:
+				return float(res.split()[0])
+			except (ValueError, IndexError):
+				pass
+		return None
+
+
+	def update(self):
+		thr = self.get_throttled()
+		self.sample['undervoltage'] = False
+		self.sample['overtemp'] = False
+		if thr is not None:
+			if thr & self.UNDERVOLTAGE:
+				self.sample['undervoltage'] = True
+			elif thr & (self.THROTTLED | self.FREQ_CAPPED):
+				self.sample['overtemp'] = True
+		self.sample['temp'] = self.get_temp()
+		self.sample['load_avg'] = self.get_load_avg()
+		self.ts = monotonic()
+		return self.sample
+
+
+	# Get cached sample, refreshing it if older than interval
+	def get_sample(self):
+		if self.ts is None or monotonic() - self.ts >= self.interval:
+			self.update()
+		return self.sample
+
+
+	# Create a fake sysfs tree, for testing on non-Pi hosts
+	@staticmethod
+	def create_fake_root(root, throttled=0, temp=45.0, load_avg=0.5):
+		files = {
+			zynthian_gui_health.throttled_paths[0]: "{:x}\n".format(throttled),
+			zynthian_gui_health.temp_path: "{}\n".format(int(temp*1000)),
+			zynthian_gui_health.loadavg_path: "{:.2f} {:.2f} {:.2f} 1/100 1000\n".format(load_avg, load_avg, load_avg)
+		}
+		for path, content in files.items():
+			fpath = os.path.join(root, path)
+			os.makedirs(os.path.dirname(fpath), exist_ok=True)
+			with open(fpath, 'w') as f:
+				f.write(content)
+		return root
+
+
+#------------------------------------------------------------------------------
+# UnitTest
+#------------------------------------------------------------------------------
+
+import sys
+import shutil
+import tempfile
+import unittest
+
+class TestHealth(unittest.TestCase):
+
+	def setUp(self):
+		self.root = tempfile.mkdtemp()
+
+
+	def tearDown(self):
+		shutil.rmtree(self.root)
+
+
+	def write_file(self, path, content):
+		with open(os.path.join(self.root, path), 'w') as f:
+			f.write(content)
+
+
+	def test_undervoltage(self):
+		zynthian_gui_health.create_fake_root(self.root, throttled=0x1, temp=52.5, load_avg=1.25)
+		health = zynthian_gui_health(self.root)
+		sample = health.update()
+		self.assertTrue(sample['undervoltage'])
+		self.assertFalse(sample['overtemp'])
+		self.assertEqual(sample['temp'], 52.5)
+		self.assertEqual(sample['load_avg'], 1.25)
+		health.close()
+
+
+	def test_overtemp(self):
+		zynthian_gui_health.create_fake_root(self.root, throttled=0x4, temp=85.0)
+		health = zynthian_gui_health(self.root)
+		sample = health.update()
+		self.assertFalse(sample['undervoltage'])
+		self.assertTrue(sample['overtemp'])
+		self.assertEqual(sample['temp'], 85.0)
+		health.close()
+
+
+	def test_healthy(self):
+		zynthian_gui_health.create_fake_root(self.root, throttled=0x0)
+		health = zynthian_gui_health(self.root)
+		sample = health.update()
+		self.assertFalse(sample['undervoltage'])
+		self.assertFalse(sample['overtemp'])
+		health.close()
+
+
+	def test_missing_file(self):
+		zynthian_gui_health.create_fake_root(self.root)
+		os.remove(os.path.join(self.root, zynthian_gui_health.temp_path))
+		health = zynthian_gui_health(self.root)
+		sample = health.update()
+		self.assertIsNone(sample['temp'])
+		self.assertEqual(sample['load_avg'], 0.5)
+		health.close()
+
+
+	def test_interval_caching(self):
+		zynthian_gui_health.create_fake_root(self.root, temp=45.0)
+		health = zynthian_gui_health(self.root, interval=3600)
+		self.assertEqual(health.get_sample()['temp'], 45.0)
+		self.write_file(zynthian_gui_health.temp_path, "60000\n")
+		# Cached sample is returned until interval expires
+		self.assertEqual(health.get_sample()['temp'], 45.0)
+		health.ts -= 3600
+		self.assertEqual(health.get_sample()['temp'], 60.0)
+		health.close()
+
+
+	def test_persistent_handle(self):
+		zynthian_gui_health.create_fake_root(self.root, throttled=0x0, temp=45.0)
+		health = zynthian_gui_health(self.root)
+		health.update()
+		temp_file = health.files['temp']
+		self.write_file(zynthian_gui_health.temp_path, "70000\n")
+		self.write_file(zynthian_gui_health.throttled_paths[0], "1\n")
+		sample = health.update()
+		# Same file handle, new content
+		self.assertIs(health.files['temp'], temp_file)
+		self.assertEqual(sample['temp'], 70.0)
+		self.assertTrue(sample['undervoltage'])
+		health.close()
+		self.assertEqual(health.files, {})
+
+
+if __name__ == '__main__':
+	# Set root logging level
+	logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+	logging.getLogger().setLevel(level=logging.DEBUG)
+
+	unittest.main()
+
+#------------------------------------------------------------------------------
@@ -30,12 +30,14 @@ import copy
 import base64
 import logging
 import collections
+from threading import Thread, Lock
 from collections import OrderedDict
 from json import JSONEncoder, JSONDecoder
 
 # Zynthian specific modules
 from zyncoder import *
 from zyngine import zynthian_layer
+from zyngine import zynthian_controller
 from zyngui import zynthian_gui_config
 from zyngui.zynthian_gui_selector import zynthian_gui_selector
 
@@ -54,6 +56,12 @@ class zynthian_gui_layer(zynthian_gui_selector):
 		self.layer_chain_parallel = False
 		self.last_snapshot_fpath = None
 		self.last_zs3_index = [0] * 16; # Last selected ZS3 snapshot, per MIDI channel
+		self.midi_cc_layers = {} # (chan, cc) => [layer, ...] MIDI-CC dispatch index
+		self.midi_cc_layers_key = None
+		self.pc_pending = {} # chan => Last requested program, not applied yet
+		self.pc_threads = {} # chan => Program-change worker thread
+		self.pc_lock = Lock()
+		self.audio_recorder_out = ["system"] # Used until audio recorder screen is created
 		super().__init__('Layer', True)
 		self.create_amixer_layer()
 		
@@ -523,24 +531,62 @@ class zynthian_gui_layer(zynthian_gui_selector):
 	# MIDI Control (ZS3 & PC)
 	#----------------------------------------------------------------------------
 
+	# Program changes are applied by a worker thread per MIDI channel, so slow
+	# engines don't block the MIDI path. Only the last requested program is kept.
 	def set_midi_chan_preset(self, midich, preset_index):
-		selected = False
-		for i,layer in enumerate(self.root_layers):
+		with self.pc_lock:
+			self.pc_pending[midich] = preset_index
+			if midich not in self.pc_threads:
+				self.pc_threads[midich] = Thread(target=self.pc_worker_task, args=(midich,), daemon=True)
+				self.pc_threads[midich].start()
+
+
+	def pc_worker_task(self, midich):
+		while True:
+			with self.pc_lock:
+				try:
+					preset_index = self.pc_pending.pop(midich)
+				except KeyError:
+					del self.pc_threads[midich]
+					return
+			try:
+				i = self._set_midi_chan_preset(midich, preset_index)
+				if i is not None:
+					self.zyngui.post_ui_update(lambda i=i: self.refresh_midi_chan_preset(i), ("pc", midich))
+			except Exception as e:
+				logging.error("Can't set program {} on MIDI channel {} => {}".format(preset_index, midich, e))
+
+
+	# Newer program requested for the channel => Current one is stale
+	def is_midi_chan_preset_stale(self, midich):
+		return midich in self.pc_pending
+
+
+	def _set_midi_chan_preset(self, midich, preset_index):
+		selected = None
+		for i,layer in enumerate(list(self.root_layers)):
+			if self.is_midi_chan_preset_stale(midich):
+				logging.debug("Skipping stale program {} on MIDI channel {}".format(preset_index, midich))
+				return None
 			mch=layer.get_midi_chan()
 			if mch is None or mch==midich:
 				# Fluidsynth engine => ignore Program Change on channel 9
 				if layer.engine.nickname=="FS" and mch==9:
 					continue
-				if layer.set_preset(preset_index,True) and not selected:
-					selected = True
-					try:
-						if not self.zyngui.modal_screen:
-							if self.shown:
-								self.show()
-							elif self.zyngui.active_screen in ('bank','preset','control'):
-								self.select_action(i)
-					except Exception as e:
-						logging.error("Can't refresh GUI! => {}".format(e))
+				if layer.set_preset(preset_index,True) and selected is None:
+					selected = i
+		return selected
+
+
+	def refresh_midi_chan_preset(self, i):
+		try:
+			if not self.zyngui.modal_screen:
+				if self.shown:
+					self.show()
+				elif self.zyngui.active_screen in ('bank','preset','control'):
+					self.select_action(i)
+		except Exception as e:
+			logging.error("Can't refresh GUI! => {}".format(e))
 
 
 	def set_midi_chan_zs3(self, midich, zs3_index):
@@ -606,9 +652,26 @@ class zynthian_gui_layer(zynthian_gui_selector):
 				if layer.midi_chan==chan:
 					layer.midi_bank_lsb(ccval)
 		else:
-			for layer in self.layers:
-				layer.midi_control_change(chan, ccnum, ccval)
-			self.amixer_layer.midi_control_change(chan, ccnum, ccval)
+			swap_info = zynthian_controller.get_midi_cc_swap(chan, ccnum)
+			for layer in self.get_midi_cc_layers(chan, ccnum, swap_info):
+				layer.midi_control_change(chan, ccnum, ccval, swap_info)
+			self.amixer_layer.midi_control_change(chan, ccnum, ccval, swap_info)
+
+
+	# Get the layers having some controller bound to the CC. Results are cached
+	# until some MIDI binding or the layer list change.
+	def get_midi_cc_layers(self, chan, ccnum, swap_info):
+		index_key = (zynthian_controller.midi_bind_version, zynthian_gui_config.midi_single_active_channel, len(self.layers))
+		if index_key!=self.midi_cc_layers_key:
+			self.midi_cc_layers = {}
+			self.midi_cc_layers_key = index_key
+
+		try:
+			return self.midi_cc_layers[(chan, ccnum)]
+		except KeyError:
+			layers = [layer for layer in self.layers if layer.is_midi_cc_bound(chan, ccnum, swap_info)]
+			self.midi_cc_layers[(chan, ccnum)] = layers
+			return layers
 
 
 	#----------------------------------------------------------------------------
@@ -1206,13 +1269,15 @@ class zynthian_gui_layer(zynthian_gui_selector):
 				snapshot['note_range'].append(info)
 
 			#Zynseq RIFF data
-			if 'stepseq' in self.zyngui.screens:
+			if self.zyngui.screens.is_created('stepseq'):
 				binary_riff_data = self.zyngui.screens['stepseq'].get_riff_data()
 				b64_data = base64_encoded_data = base64.b64encode(binary_riff_data)
 				snapshot['zynseq_riff_b64'] = b64_data.decode('utf-8')
 
 			#Audio Recorder out
-			snapshot['audio_recorder_out'] = self.zyngui.screens['audio_recorder'].get_audio_out()
+			if self.zyngui.screens.is_created('audio_recorder'):
+				self.audio_recorder_out = self.zyngui.screens['audio_recorder'].get_audio_out()
+			snapshot['audio_recorder_out'] = self.audio_recorder_out
 
 			#JSON Encode
 			json=JSONEncoder().encode(snapshot)
@@ -1302,15 +1367,19 @@ class zynthian_gui_layer(zynthian_gui_selector):
 		# so we stop Jalv engines!
 		self.zyngui.screens['engine'].stop_unused_jalv_engines()
 
-		#Create new layers, starting engines when needed
+		#Create new layers, starting engines when needed. Engines are started concurrently.
+		layer_snapshots = []
 		for i, lss in enumerate(snapshot['layers']):
 			if lss['engine_nick']=="MX":
 				if zynthian_gui_config.snapshot_mixer_settings:
 					snapshot['amixer_layer'] = lss
 				del snapshot['layers'][i]
 			else:
-				engine=self.zyngui.screens['engine'].start_engine(lss['engine_nick'])
-				self.layers.append(zynthian_layer(engine,lss['midi_chan'], self.zyngui))
+				layer_snapshots.append(lss)
+
+		engines = self.zyngui.screens['engine'].start_engines([lss['engine_nick'] for lss in layer_snapshots])
+		for engine, lss in zip(engines, layer_snapshots):
+			self.layers.append(zynthian_layer(engine,lss['midi_chan'], self.zyngui))
 
 		# Finally, stop all unused engines
 		self.zyngui.screens['engine'].stop_unused_engines()
@@ -1387,7 +1456,9 @@ class zynthian_gui_layer(zynthian_gui_selector):
 
 		#Audio Recorder Out
 		if 'audio_recorder_out' in snapshot:
-			self.zyngui.screens['audio_recorder'].audio_out = snapshot['audio_recorder_out'] 
+			self.audio_recorder_out = snapshot['audio_recorder_out']
+			if self.zyngui.screens.is_created('audio_recorder'):
+				self.zyngui.screens['audio_recorder'].audio_out = self.audio_recorder_out
 
 
 	def _load_snapshot_sequences(self, snapshot):
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#******************************************************************************
+# ZYNTHIAN PROJECT: Zynthian GUI
+#
+# Zynthian OSC Remote Control API parsing
+#
+# /CUIA/<ACTION> [args]
+# /LAYER/<n>/CTRL/<symbol> <value>
+# /LAYER/<n>/BANK <index|name>
+# /LAYER/<n>/PRESET <index|name>
+# /BULK <n> <symbol> <value> [<n> <symbol> <value> ...]
+#
+# Layers are numbered from 1, as root layers are shown in the UI.
+#
+#******************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+#******************************************************************************
+
+import sys
+import logging
+
+#------------------------------------------------------------------------------
+# OSC path parsing
+#------------------------------------------------------------------------------
+
+# Parse an OSC API path. Returns:
+#  ("CUIA", action)
+#  ("LAYER", layer_index, command, [params])  => layer_index is 0-based
+# Raises ValueError for bad paths.
+def parse_osc_path(path):
+	parts = path.strip("/").split("/")
+	cmd = parts[0].upper()
+	if cmd=="CUIA":
+		if len(parts)<2 or not parts[1]:
+			raise ValueError("Missing CUIA action")
+		return ("CUIA", parts[1].upper())
+
+	elif cmd=="LAYER":
+		if len(parts)<3 or not parts[2]:
+			raise ValueError("Missing layer command")
+		try:
+			n = int(parts[1])
+		except ValueError:
+			raise ValueError("Bad layer number '{}'".format(parts[1]))
+		if n<1:
+			raise ValueError("Bad layer number '{}'. Layers are numbered from 1".format(n))
+		lcmd = parts[2].upper()
+		params = parts[3:]
+		if lcmd=="CTRL" and len(params)!=1:
+			raise ValueError("CTRL needs a controller symbol")
+		return ("LAYER", n-1, lcmd, params)
+
+	raise ValueError("Not supported OSC call '{}'".format(path))
+
+
+def is_osc_ctrl_path(path):
+	parts = path.strip("/").split("/")
+	return len(parts)==4 and parts[0].upper()=="LAYER" and parts[2].upper()=="CTRL"
+
+
+# Expand /BULK (layer, symbol, value) triplets to controller messages
+def expand_osc_bulk(args):
+	if len(args)%3:
+		raise ValueError("BULK arguments must be (layer, symbol, value) triplets")
+	msgs = []
+	for i in range(0, len(args), 3):
+		msgs.append(("/LAYER/{}/CTRL/{}".format(args[i], args[i+1]), [args[i+2]]))
+	return msgs
+
+#------------------------------------------------------------------------------
+# UnitTest
+#------------------------------------------------------------------------------
+
+import unittest
+
+class TestOscPath(unittest.TestCase):
+
+	def test_cuia(self):
+		self.assertEqual(parse_osc_path("/CUIA/all_notes_off"), ("CUIA", "ALL_NOTES_OFF"))
+		self.assertEqual(parse_osc_path("/cuia/SELECT_UP/"), ("CUIA", "SELECT_UP"))
+		with self.assertRaises(ValueError):
+			parse_osc_path("/CUIA")
+
+
+	def test_layer(self):
+		self.assertEqual(parse_osc_path("/LAYER/1/CTRL/volume"), ("LAYER", 0, "CTRL", ["volume"]))
+		self.assertEqual(parse_osc_path("/layer/3/bank"), ("LAYER", 2, "BANK", []))
+		self.assertEqual(parse_osc_path("/LAYER/2/PRESET"), ("LAYER", 1, "PRESET", []))
+		#Bad paths
+		with self.assertRaises(ValueError):
+			parse_osc_path("/LAYER/0/CTRL/volume")
+		with self.assertRaises(ValueError):
+			parse_osc_path("/LAYER/-1/CTRL/volume")
+		with self.assertRaises(ValueError):
+			parse_osc_path("/LAYER/x/CTRL/volume")
+		with self.assertRaises(ValueError):
+			parse_osc_path("/LAYER/1")
+		with self.assertRaises(ValueError):
+			parse_osc_path("/LAYER/1/CTRL")
+		with self.assertRaises(ValueError):
+			parse_osc_path("/ABSURDE/1")
+
+
+	def test_ctrl_path(self):
+		self.assertTrue(is_osc_ctrl_path("/LAYER/1/CTRL/volume"))
+		self.assertTrue(is_osc_ctrl_path("/layer/1/ctrl/volume"))
+		self.assertFalse(is_osc_ctrl_path("/LAYER/1/BANK"))
+		self.assertFalse(is_osc_ctrl_path("/CUIA/SELECT_UP"))
+
+
+	def test_bulk(self):
+		self.assertEqual(expand_osc_bulk([1, "volume", 100, 2, "pan", 64]), [
+			("/LAYER/1/CTRL/volume", [100]),
+			("/LAYER/2/CTRL/pan", [64])
+		])
+		self.assertEqual(expand_osc_bulk([]), [])
+		with self.assertRaises(ValueError):
+			expand_osc_bulk([1, "volume"])
+
+
+if __name__ == '__main__':
+	# Set root logging level
+	logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+	logging.getLogger().setLevel(level=logging.DEBUG)
+
+	unittest.main()
+
+#------------------------------------------------------------------------------
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#******************************************************************************
+# ZYNTHIAN PROJECT: Zynthian GUI
+#
+# Zynthian GUI Screens Registry Class
+#
+# Dictionary of GUI screens, lazily created on first access from registered
+# factories.
+#
+#******************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+#******************************************************************************
+
+import logging
+from threading import RLock, Event, current_thread
+from collections import OrderedDict
+
+#------------------------------------------------------------------------------
+# Zynthian GUI Screens Registry Class
+#------------------------------------------------------------------------------
+
+class zynthian_gui_screens(dict):
+
+	def __init__(self, ui_runner=None, ui_timeout=5):
+		super().__init__()
+		self.factories = OrderedDict()
+		self.lock = RLock()
+		# Tk widgets must be created by the Tk thread. Screens requested from other
+		# threads are created by posting the factory call with ui_runner.
+		self.ui_thread = current_thread()
+		self.ui_runner = ui_runner
+		self.ui_timeout = ui_timeout
+
+
+	# Register a screen factory. Screen will be created on first access.
+	def register(self, name, factory):
+		self.factories[name] = factory
+
+
+	def __missing__(self, name):
+		if name not in self.factories:
+			raise KeyError(name)
+		if self.ui_runner and current_thread() is not self.ui_thread:
+			return self.create_from_ui_thread(name)
+		with self.lock:
+			# It could be created by other thread while waiting for the lock
+			if dict.__contains__(self, name):
+				return dict.__getitem__(self, name)
+			logging.debug("Creating screen '{}' ...".format(name))
+			screen = self.factories[name]()
+			self[name] = screen
+			return screen
+
+
+	# Create screen from UI thread and wait for it
+	def create_from_ui_thread(self, name):
+		done = Event()
+		def create():
+			try:
+				self[name]
+			finally:
+				done.set()
+		self.ui_runner(create)
+		if not done.wait(self.ui_timeout):
+			logging.error("Screen '{}' not created by UI thread after {} seconds".format(name, self.ui_timeout))
+			raise KeyError(name)
+		return dict.__getitem__(self, name)
+
+
+	def __contains__(self, name):
+		return dict.__contains__(self, name) or name in self.factories
+
+
+	def get(self, name, default=None):
+		if name in self:
+			return self[name]
+		return default
+
+
+	def is_created(self, name):
+		return dict.__contains__(self, name)
+
+
+	def get_pending(self):
+		return [name for name in self.factories if not self.is_created(name)]
+
+
+	# Create next pending screen. Returns False when all screens are created.
+	def create_next(self):
+		pending = self.get_pending()
+		if pending:
+			self[pending[0]]
+			return True
+		return False
+
+
+#------------------------------------------------------------------------------
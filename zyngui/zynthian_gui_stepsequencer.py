@@ -769,14 +769,9 @@ class zynthian_gui_stepsequencer(zynthian_gui_base.zynthian_gui_base):
 
 
 	def get_riff_data(self):
-		fpath = "/tmp/snapshot.zynseq"
 		try:
-			# Save to tmp
-			self.save_fpath(fpath)
-			# Load binary data
-			with open(fpath,"rb") as fh:
-				riff_data=fh.read()
-				logging.info("Loading RIFF data...\n")
+			riff_data = zynseq.save_data()
+			logging.info("Loading RIFF data...\n")
 			return riff_data
 
 		except Exception as e:
@@ -785,14 +780,9 @@ class zynthian_gui_stepsequencer(zynthian_gui_base.zynthian_gui_base):
 
 
 	def restore_riff_data(self, riff_data):
-		fpath = "/tmp/snapshot.zynseq"
 		try:
-			# Save RIFF data to tmp file
-			with open(fpath,"wb") as fh:
-				fh.write(riff_data)
-				logging.info("Restoring RIFF data...\n")
-			# Load from tmp file
-			if self.load_fpath(fpath):
+			logging.info("Restoring RIFF data...\n")
+			if zynseq.load_data(riff_data):
 				self.filename = "snapshot"
 				self.arranger.on_load()
 				return True
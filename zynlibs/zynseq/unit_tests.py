@@ -62,6 +62,13 @@ class TestLibZynSeq(unittest.TestCase):
     def test_aa02_savefile(self):
         libseq.save(bytes("/tmp/test.zynseq", "utf-8"))
         self.assertTrue(filecmp.cmp("/zynthian/zynthian-my-data/zynseq/default.zynseq", "/tmp/test.zynseq"))
+    #
+    def test_aa03_savebuffer(self):
+        data = zynseq.save_data()
+        with open("/zynthian/zynthian-my-data/zynseq/default.zynseq", "rb") as f:
+            self.assertEqual(data, f.read())
+        self.assertTrue(zynseq.load_data(data))
+        self.assertEqual(zynseq.save_data(), data)
     # Check currently selected pattern has defined beat type, steps per beat [1|2|3|4|6|8|12|24] and quantity of beats in pattern
     def check_pattern(self, beat_type, steps_per_beat, beats_in_pattern):
         steps_in_pattern = beats_in_pattern * steps_per_beat
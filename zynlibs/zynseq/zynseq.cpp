@@ -32,6 +32,7 @@
 #include <jack/midiport.h> //provides JACK MIDI interface
 #include "zynseq.h" //exposes library methods as c functions
 #include <set>
+#include <vector>
 #include <string>
 #include <cstring> //provides strcmp
 
@@ -602,26 +603,39 @@ bool isModified()
     return g_bDirty;
 }
 
-int fileWrite8(uint8_t value, FILE *pFile)
+int fileWrite8(uint8_t value, std::vector<uint8_t>& vData)
 {
-    int nResult = fwrite(&value, 1, 1, pFile);
+    vData.push_back(value);
     return 1;
 }
 
-int fileWrite32(uint32_t value, FILE *pFile)
+int fileWrite32(uint32_t value, std::vector<uint8_t>& vData)
 {
     for(int i = 3; i >=0; --i)
-        fileWrite8((value >> i * 8), pFile);
+        fileWrite8((value >> i * 8), vData);
     return 4;
 }
 
-int fileWrite16(uint16_t value, FILE *pFile)
+int fileWrite16(uint16_t value, std::vector<uint8_t>& vData)
 {
     for(int i = 1; i >=0; --i)
-        fileWrite8((value >> i * 8), pFile);
+        fileWrite8((value >> i * 8), vData);
     return 2;
 }
 
+int fileWriteString(const char* sValue, size_t nSize, std::vector<uint8_t>& vData)
+{
+    vData.insert(vData.end(), sValue, sValue + nSize);
+    return nSize;
+}
+
+// Overwrite 32-bit value at position, e.g. IFF block size
+void fileUpdate32(uint32_t value, std::vector<uint8_t>& vData, size_t nPos)
+{
+    for(int i = 3; i >=0; --i)
+        vData[nPos++] = value >> i * 8;
+}
+
 uint8_t fileRead8(FILE* pFile)
 {
     uint8_t nResult = 0;
@@ -664,15 +678,10 @@ bool checkBlock(FILE* pFile, uint32_t nActualSize,  uint32_t nExpectedSize)
     return false;
 }
 
-bool load(const char* filename)
+// Parse RIFF data from stream
+bool loadFile(FILE* pFile)
 {
-    g_pTrack = NULL;
-    g_seqMan.init();
     uint32_t nVersion = 0;
-    FILE *pFile;
-    pFile = fopen(filename, "r");
-    if(pFile == NULL)
-        return false;
     char sHeader[4];
     // Iterate each block within IFF file
     while(fread(sHeader, 4, 1, pFile) == 1)
@@ -682,14 +691,12 @@ bool load(const char* filename)
         {
             if(nBlockSize != 16)
             {
-                fclose(pFile);
                 //printf("Error reading vers block from sequence file\n");
                 return false;
             }
             nVersion = fileRead32(pFile);
             if(nVersion < 4 || nVersion > FILE_VERSION)
             {
-                fclose(pFile);
                 DPRINTF("Unsupported sequence file version %d. Not loading file.\n", nVersion);
                 return false;
             }
@@ -831,37 +838,57 @@ bool load(const char* filename)
             }
         }
     }
-    fclose(pFile);
     //printf("Ver: %d Loaded %lu patterns, %lu sequences, %lu banks from file %s\n", nVersion, m_mPatterns.size(), m_mSequences.size(), m_mBanks.size(), filename);
     g_bDirty = false;
     g_pTrack = g_seqMan.getSequence(0, 0)->getTrack(0);
     return true;
 }
 
-void save(const char* filename)
+bool load(const char* filename)
 {
-    //!@todo Need to save / load ticks per beat (unless we always use 1920)
+    g_pTrack = NULL;
+    g_seqMan.init();
     FILE *pFile;
-    int nPos = 0;
-    pFile = fopen(filename, "w");
+    pFile = fopen(filename, "r");
     if(pFile == NULL)
-    {
-        fprintf(stderr, "ERROR: SequenceManager failed to open file %s\n", filename);
-        return;
-    }
+        return false;
+    bool bResult = loadFile(pFile);
+    fclose(pFile);
+    return bResult;
+}
+
+bool loadBuffer(const uint8_t* pData, uint32_t nSize)
+{
+    g_pTrack = NULL;
+    g_seqMan.init();
+    if(pData == NULL || nSize == 0)
+        return false;
+    FILE *pFile;
+    pFile = fmemopen((void*)pData, nSize, "r");
+    if(pFile == NULL)
+        return false;
+    bool bResult = loadFile(pFile);
+    fclose(pFile);
+    return bResult;
+}
+
+// Serialize to RIFF data
+void saveData(std::vector<uint8_t>& vData)
+{
+    //!@todo Need to save / load ticks per beat (unless we always use 1920)
+    int nPos = 0;
     uint32_t nBlockSize;
-    fwrite("vers", 4, 1, pFile); // IFF block name
-    nPos += 4;
-    nPos += fileWrite32(16, pFile); // IFF block size
-    nPos += fileWrite32(FILE_VERSION, pFile); // IFF block content
-    nPos += fileWrite16(uint16_t(g_dTempo), pFile); //!@todo Write current tempo
-    nPos += fileWrite16(g_nBeatsPerBar, pFile); //!@todo Write current beats per bar
-    nPos += fileWrite8(g_seqMan.getTriggerChannel(), pFile);
-    nPos += fileWrite8('\0', pFile); // JACK input not yet implemented
-    nPos += fileWrite8('\0', pFile); // JACK output not yet implemented
-    nPos += fileWrite8('\0', pFile);
-    nPos += fileWrite16(g_nVerticalZoom, pFile);
-    nPos += fileWrite16(g_nHorizontalZoom, pFile);
+    nPos += fileWriteString("vers", 4, vData); // IFF block name
+    nPos += fileWrite32(16, vData); // IFF block size
+    nPos += fileWrite32(FILE_VERSION, vData); // IFF block content
+    nPos += fileWrite16(uint16_t(g_dTempo), vData); //!@todo Write current tempo
+    nPos += fileWrite16(g_nBeatsPerBar, vData); //!@todo Write current beats per bar
+    nPos += fileWrite8(g_seqMan.getTriggerChannel(), vData);
+    nPos += fileWrite8('\0', vData); // JACK input not yet implemented
+    nPos += fileWrite8('\0', vData); // JACK output not yet implemented
+    nPos += fileWrite8('\0', vData);
+    nPos += fileWrite16(g_nVerticalZoom, vData);
+    nPos += fileWrite16(g_nHorizontalZoom, vData);
 
     // Iterate through patterns
     uint32_t nPattern = 0;
@@ -871,32 +898,29 @@ void save(const char* filename)
         // Only save patterns with content
         if(pPattern->getEventAt(0))
         {
-            fwrite("patnxxxx", 8, 1, pFile);
-            nPos += 8;
+            nPos += fileWriteString("patnxxxx", 8, vData);
             uint32_t nStartOfBlock = nPos;
-            nPos += fileWrite32(nPattern, pFile);
-            nPos += fileWrite32(pPattern->getBeatsInPattern(), pFile);
-            nPos += fileWrite16(pPattern->getStepsPerBeat(), pFile);
-            nPos += fileWrite8(pPattern->getScale(), pFile);
-            nPos += fileWrite8(pPattern->getTonic(), pFile);
-            nPos += fileWrite8(pPattern->getRefNote(), pFile);
-            nPos += fileWrite8('\0', pFile);
+            nPos += fileWrite32(nPattern, vData);
+            nPos += fileWrite32(pPattern->getBeatsInPattern(), vData);
+            nPos += fileWrite16(pPattern->getStepsPerBeat(), vData);
+            nPos += fileWrite8(pPattern->getScale(), vData);
+            nPos += fileWrite8(pPattern->getTonic(), vData);
+            nPos += fileWrite8(pPattern->getRefNote(), vData);
+            nPos += fileWrite8('\0', vData);
             uint32_t nEvent = 0;
             while(StepEvent* pEvent = pPattern->getEventAt(nEvent++))
             {
-                nPos += fileWrite32(pEvent->getPosition(), pFile);
-                nPos += fileWrite32(pEvent->getDuration(), pFile);
-                nPos += fileWrite8(pEvent->getCommand(), pFile);
-                nPos += fileWrite8(pEvent->getValue1start(), pFile);
-                nPos += fileWrite8(pEvent->getValue2start(), pFile);
-                nPos += fileWrite8(pEvent->getValue1end(), pFile);
-                nPos += fileWrite8(pEvent->getValue2end(), pFile);
-                nPos += fileWrite8('\0', pFile); // Pad to even block (could do at end but simplest here)
+                nPos += fileWrite32(pEvent->getPosition(), vData);
+                nPos += fileWrite32(pEvent->getDuration(), vData);
+                nPos += fileWrite8(pEvent->getCommand(), vData);
+                nPos += fileWrite8(pEvent->getValue1start(), vData);
+                nPos += fileWrite8(pEvent->getValue2start(), vData);
+                nPos += fileWrite8(pEvent->getValue1end(), vData);
+                nPos += fileWrite8(pEvent->getValue2end(), vData);
+                nPos += fileWrite8('\0', vData); // Pad to even block (could do at end but simplest here)
             }
             nBlockSize = nPos - nStartOfBlock;
-            fseek(pFile, nStartOfBlock - 4, SEEK_SET);
-            fileWrite32(nBlockSize, pFile);
-            fseek(pFile, 0, SEEK_END);
+            fileUpdate32(nBlockSize, vData, nStartOfBlock - 4);
         }
         nPattern = g_seqMan.getNextPattern(nPattern);
     } while(nPattern != -1);
@@ -907,79 +931,101 @@ void save(const char* filename)
         uint32_t nSequences = g_seqMan.getSequencesInBank(nBank);
         if(nSequences == 0)
             continue;
-        fwrite("bankxxxx", 8, 1, pFile);
-        nPos += 8;
+        nPos += fileWriteString("bankxxxx", 8, vData);
         uint32_t nStartOfBlock = nPos;
-        nPos += fileWrite8(nBank, pFile);
-        nPos += fileWrite8(0, pFile);
-        nPos += fileWrite32(nSequences, pFile);
+        nPos += fileWrite8(nBank, vData);
+        nPos += fileWrite8(0, vData);
+        nPos += fileWrite32(nSequences, vData);
         for(uint32_t nSequence = 0; nSequence < nSequences; ++nSequence)
         {
             Sequence* pSequence = g_seqMan.getSequence(nBank, nSequence);
-            nPos += fileWrite8(pSequence->getPlayMode(), pFile);
-            nPos += fileWrite8(pSequence->getGroup(), pFile);
-            nPos += fileWrite8(g_seqMan.getTriggerNote(nBank, nSequence), pFile);
-            nPos += fileWrite8('\0', pFile);
+            nPos += fileWrite8(pSequence->getPlayMode(), vData);
+            nPos += fileWrite8(pSequence->getGroup(), vData);
+            nPos += fileWrite8(g_seqMan.getTriggerNote(nBank, nSequence), vData);
+            nPos += fileWrite8('\0', vData);
             std::string sName = pSequence->getName();
             for(size_t nIndex = 0; nIndex < sName.size(); ++nIndex)
-                nPos += fileWrite8(sName[nIndex], pFile);
+                nPos += fileWrite8(sName[nIndex], vData);
             for(size_t nIndex = sName.size(); nIndex < 16; ++nIndex)
-                nPos += fileWrite8('\0', pFile);
-            nPos += fileWrite32(pSequence->getTracks(), pFile);
+                nPos += fileWrite8('\0', vData);
+            nPos += fileWrite32(pSequence->getTracks(), vData);
             for(size_t nTrack = 0; nTrack < pSequence->getTracks(); ++nTrack)
             {
                 Track* pTrack = pSequence->getTrack(nTrack);
                 if(pTrack)
                 {
-                    nPos += fileWrite8(pTrack->getChannel(), pFile);
-                    nPos += fileWrite8(pTrack->getOutput(), pFile);
-                    nPos += fileWrite8(pTrack->getMap(), pFile);
-                    nPos += fileWrite8('\0', pFile);
-                    nPos += fileWrite16(pTrack->getPatterns(), pFile);
+                    nPos += fileWrite8(pTrack->getChannel(), vData);
+                    nPos += fileWrite8(pTrack->getOutput(), vData);
+                    nPos += fileWrite8(pTrack->getMap(), vData);
+                    nPos += fileWrite8('\0', vData);
+                    nPos += fileWrite16(pTrack->getPatterns(), vData);
                     for(uint16_t nPattern = 0; nPattern < pTrack->getPatterns(); ++nPattern)
                     {
-                        nPos += fileWrite32(pTrack->getPatternPositionByIndex(nPattern), pFile);
+                        nPos += fileWrite32(pTrack->getPatternPositionByIndex(nPattern), vData);
                         Pattern* pPattern = pTrack->getPatternByIndex(nPattern);
                         uint32_t nPatternId = g_seqMan.getPatternIndex(pPattern);
-                        nPos += fileWrite32(nPatternId, pFile);
+                        nPos += fileWrite32(nPatternId, vData);
                     }
                 }
                 else
                 {
                     // Shouldn't need this but add empty tracks
-                    nPos += fileWrite32(0, pFile);
-                    nPos += fileWrite16(0, pFile);
+                    nPos += fileWrite32(0, vData);
+                    nPos += fileWrite16(0, vData);
                 }
                 
             }
             Timebase* pTimebase = pSequence->getTimebase();
             if(pTimebase)
             {
-                nPos += fileWrite32(pTimebase->getEventQuant(), pFile);
+                nPos += fileWrite32(pTimebase->getEventQuant(), vData);
                 for(uint32_t nIndex = 0; nIndex < pTimebase->getEventQuant(); ++nIndex)
                 {
                     TimebaseEvent* pEvent = pTimebase->getEvent(nIndex);
-                    nPos += fileWrite16(pEvent->bar, pFile);
-                    nPos += fileWrite16(pEvent->clock, pFile);
-                    nPos += fileWrite16(pEvent->type, pFile);
-                    nPos += fileWrite16(pEvent->value, pFile);
+                    nPos += fileWrite16(pEvent->bar, vData);
+                    nPos += fileWrite16(pEvent->clock, vData);
+                    nPos += fileWrite16(pEvent->type, vData);
+                    nPos += fileWrite16(pEvent->value, vData);
                 }
             }
             else
             {
-                nPos += fileWrite32(0, pFile);
+                nPos += fileWrite32(0, vData);
             }            
         }
         nBlockSize = nPos - nStartOfBlock;
-        fseek(pFile, nStartOfBlock - 4, SEEK_SET);
-        fileWrite32(nBlockSize, pFile);
-        fseek(pFile, 0, SEEK_END);
+        fileUpdate32(nBlockSize, vData, nStartOfBlock - 4);
     }
+}
 
+void save(const char* filename)
+{
+    FILE *pFile;
+    pFile = fopen(filename, "w");
+    if(pFile == NULL)
+    {
+        fprintf(stderr, "ERROR: SequenceManager failed to open file %s\n", filename);
+        return;
+    }
+    std::vector<uint8_t> vData;
+    saveData(vData);
+    fwrite(vData.data(), 1, vData.size(), pFile);
     fclose(pFile);
     g_bDirty = false;
 }
 
+uint32_t saveBuffer(uint8_t* pBuffer, uint32_t nSize)
+{
+    std::vector<uint8_t> vData;
+    saveData(vData);
+    if(pBuffer && vData.size() <= nSize)
+    {
+        memcpy(pBuffer, vData.data(), vData.size());
+        g_bDirty = false;
+    }
+    return vData.size();
+}
+
 uint16_t getVerticalZoom()
 {
     return g_nVerticalZoom;
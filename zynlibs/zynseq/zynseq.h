@@ -83,11 +83,25 @@ void enableDebug(bool bEnable);
 */
 bool load(const char* filename);
 
+/** @brief  Load sequences and patterns from RIFF data in memory
+*   @param  pData Pointer to RIFF data, same format than file
+*   @param  nSize Size of data in bytes
+*   @retval bool True on success
+*/
+bool loadBuffer(const uint8_t* pData, uint32_t nSize);
+
 /** @brief  Save sequences and patterns from file
 *   @param  filename Full path and filename
 */
 void save(const char* filename);
 
+/** @brief  Save sequences and patterns to RIFF data in memory
+*   @param  pBuffer Pointer to buffer to populate, same format than file
+*   @param  nSize Size of buffer in bytes
+*   @retval uint32_t Size of RIFF data in bytes. Buffer is not populated if too small.
+*/
+uint32_t saveBuffer(uint8_t* pBuffer, uint32_t nSize);
+
 /** @brief  Get vertical zoom
 *   @retval uint16_t Vertical zoom
 */
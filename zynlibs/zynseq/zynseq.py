@@ -28,6 +28,7 @@ from _ctypes import dlclose
 from os.path import dirname, realpath
 
 libseq = None
+save_buffer_size = 65536 # Initial size of buffer used for saving RIFF data to memory
 
 
 #-------------------------------------------------------------------------------
@@ -49,6 +50,7 @@ def init():
 		libseq=ctypes.cdll.LoadLibrary(dirname(realpath(__file__))+"/build/libzynseq.so")
 		libseq.getSequenceName.restype = ctypes.c_char_p
 		libseq.getTempo.restype = ctypes.c_double
+		libseq.saveBuffer.restype = ctypes.c_uint32
 	except Exception as e:
 		libseq=None
 		print("Can't initialise zynseq library: %s" % str(e))
@@ -80,6 +82,29 @@ def save(filename):
 	return None
 
 
+#	Load zynseq data from memory
+#	data: RIFF data (bytes), same format than zynseq file
+#	Returns: True on success
+def load_data(data):
+	if libseq:
+		return libseq.loadBuffer(data, len(data))
+	return None
+
+
+#	Save zynseq data to memory
+#	Returns: RIFF data (bytes), same format than zynseq file
+def save_data():
+	global save_buffer_size
+	if libseq:
+		while True:
+			buffer = ctypes.create_string_buffer(save_buffer_size)
+			size = libseq.saveBuffer(buffer, save_buffer_size)
+			if size <= save_buffer_size:
+				return buffer.raw[:size]
+			save_buffer_size = size
+	return None
+
+
 #	Set sequence name
 #	name: Sequence name (truncates at 16 characters)
 def set_sequence_name(bank, sequence, name):
@@ -230,6 +230,29 @@ bool getEvent(Smf* pSmf, bool bAdvance)
 	return (g_pEvent != NULL);
 }
 
+uint32_t getMidiEvents(Smf* pSmf, uint32_t* pBuffer, uint32_t nMax)
+{
+	if(!isSmfValid(pSmf) || !pBuffer)
+		return 0;
+	g_pSmf = pSmf;
+	uint32_t nCount = 0;
+	while(nCount < nMax)
+	{
+		Event* pEvent = pSmf->getEvent(true);
+		if(!pEvent)
+			break;
+		if(pEvent->getType() != EVENT_TYPE_MIDI)
+			continue;
+		uint8_t nValue1 = pEvent->getSize() > 0 ? *(pEvent->getData()) : 0xFF;
+		uint8_t nValue2 = pEvent->getSize() > 1 ? *(pEvent->getData() + 1) : 0xFF;
+		*(pBuffer++) = pEvent->getTime();
+		*(pBuffer++) = ((pSmf->getCurrentTrack() & 0xFF) << 24) | (pEvent->getSubtype() << 16) | (nValue1 << 8) | nValue2;
+		++nCount;
+	}
+	g_pEvent = pSmf->getEvent(false);
+	return nCount;
+}
+
 size_t getEventTrack()
 {
 	if(!isSmfValid(g_pSmf))
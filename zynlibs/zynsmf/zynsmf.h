@@ -100,6 +100,15 @@ uint16_t getTicksPerQuarterNote(Smf* pSmf);
 */
 bool getEvent(Smf* pSmf, bool bAdvance=false);
 
+/** @brief  Get MIDI events from the current position in a single call
+*   @param  pSmf Pointer to the SMF
+*   @param  pBuffer Pointer to buffer to populate with pairs of 32-bit words: [time, (track << 24) | (status << 16) | (value1 << 8) | value2]
+*   @param  nMax Maximum quantity of events to populate
+*   @retval uint32_t Quantity of events populated (0 if there are no more events)
+*   @note   Non-MIDI events are skipped. Event cursor is advanced past the returned events.
+*/
+uint32_t getMidiEvents(Smf* pSmf, uint32_t* pBuffer, uint32_t nMax);
+
 /** @brief  Add MIDI note event
 *   @param  pSmf Pointer to the SMF
 *   @param  nTrack Index of track to add event
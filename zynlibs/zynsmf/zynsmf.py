@@ -120,4 +120,22 @@ def save(smf, filename):
 	return None
 
 
+#	Get all MIDI events from current position with bulk library calls
+#	smf: Pointer to smf object
+#	chunk: Quantity of events to fetch on each library call
+#	Returns: List of events as tuples (time, track, status, value1, value2)
+def get_midi_events(smf, chunk=4096):
+	events = []
+	if libsmf:
+		buffer = (ctypes.c_uint32 * (2 * chunk))()
+		while True:
+			count = libsmf.getMidiEvents(smf, buffer, chunk)
+			for i in range(0, 2 * count, 2):
+				data = buffer[i + 1]
+				events.append((buffer[i], data >> 24, (data >> 16) & 0xFF, (data >> 8) & 0xFF, data & 0xFF))
+			if count < chunk:
+				break
+	return events
+
+
 #-------------------------------------------------------------------------------
@@ -31,12 +31,13 @@ import signal
 #import psutil
 #import alsaseq
 import logging
+import queue
 import threading
-from time import sleep
+from time import sleep, monotonic
 from os.path import isfile
 from datetime import datetime
-from threading  import Thread, Lock
-from subprocess import check_output
+from collections import OrderedDict
+from threading  import Thread, Lock, RLock, Event
 from ctypes import c_float, c_double, CDLL
 
 # Zynthian specific modules
@@ -77,6 +78,9 @@ from zyngui.zynthian_gui_zs3_learn import zynthian_gui_zs3_learn
 from zyngui.zynthian_gui_zs3_options import zynthian_gui_zs3_options
 from zyngui.zynthian_gui_confirm import zynthian_gui_confirm
 from zyngui.zynthian_gui_keybinding import zynthian_gui_keybinding
+from zyngui.zynthian_gui_health import zynthian_gui_health
+from zyngui.zynthian_gui_screens import zynthian_gui_screens
+from zyngui.zynthian_gui_osc import parse_osc_path, is_osc_ctrl_path, expand_osc_bulk
 from zyngui.zynthian_gui_main import zynthian_gui_main
 from zyngui.zynthian_gui_audio_recorder import zynthian_gui_audio_recorder
 from zyngui.zynthian_gui_midi_recorder import zynthian_gui_midi_recorder
@@ -158,9 +162,12 @@ class zynthian_gui:
 		"100": "LAYER_CONTROL"
 	}
 
+	# Bank select, data entry & (N)RPN CCs
+	midi_cc_no_coalesce = (0, 32, 6, 38, 96, 97, 98, 99, 100, 101)
+
 	def __init__(self):
 		self.zynmidi = None
-		self.screens = {}
+		self.screens = zynthian_gui_screens(self.post_ui_update)
 		self.active_screen = None
 		self.fav_prev_screen = None
 		self.modal_screen = None
@@ -176,6 +183,20 @@ class zynthian_gui:
 		self.loading_thread = None
 		self.zyncoder_thread = None
 		self.zynread_wait_flag = False
+		self.zynread_wake = Event()
+		self.zyncoder_values = None
+
+		# MIDI-UI event handlers, by status nibble
+		self.zynmidi_handlers = {
+			0xC: self.zynmidi_program_change,
+			0xB: self.zynmidi_control_change,
+			0x9: self.zynmidi_note_on,
+			0xE: self.zynmidi_pitch_bend
+		}
+
+		# Callable UI Actions registry
+		self.init_cuia_registry()
+
 		self.zynswitch_defered_event = None
 		self.exit_flag = False
 		self.exit_code = 0
@@ -186,6 +207,7 @@ class zynthian_gui:
 
 		self.status_info = {}
 		self.status_counter = 0
+		self.health = zynthian_gui_health(zynthian_gui_config.health_sysfs_root, zynthian_gui_config.health_sample_interval)
 
 		self.zynautoconnect_audio_flag = False
 		self.zynautoconnect_midi_flag = False
@@ -193,6 +215,15 @@ class zynthian_gui:
 		# Create Lock object to avoid concurrence problems
 		self.lock = Lock()
 
+		# UI-update queue: widget updates posted from worker threads, run by Tk
+		self.ui_updates = OrderedDict()
+		self.ui_updates_lock = RLock()
+
+		# OSC messages, queued by the OSC server thread
+		self.osc_server = None
+		self.osc_queue = queue.Queue()
+		self.osc_bundle = None
+
 		# Load keyboard binding map
 		zynthian_gui_keybinding.getInstance().load()
 
@@ -241,10 +272,10 @@ class zynthian_gui:
 			lib_zyncoder.set_midi_filter_cc_automode(zynthian_gui_config.midi_cc_automode)
 			#Set MIDI System Messages flag
 			lib_zyncoder.set_midi_filter_system_events(zynthian_gui_config.midi_sys_enabled)
-			#Setup MIDI filter rules
-			if self.midi_filter_script:
-				self.midi_filter_script.clean()
-			self.midi_filter_script = zynthian_midi_filter.MidiFilterScript(zynthian_gui_config.midi_filter_rules)
+			#Setup MIDI filter rules, applying only the changes from the previous script
+			midi_filter_script = zynthian_midi_filter.MidiFilterScript(zynthian_gui_config.midi_filter_rules, False)
+			midi_filter_script.apply(self.midi_filter_script)
+			self.midi_filter_script = midi_filter_script
 
 		except Exception as e:
 			logging.error("ERROR initializing MIDI : %s" % e)
@@ -271,52 +302,163 @@ class zynthian_gui:
 	# ---------------------------------------------------------------------------
 	# OSC Management
 	# ---------------------------------------------------------------------------
+	#
+	# Remote API (UDP port 1370 by default):
+	#
+	#   /CUIA/<ACTION> [params]               => Callable UI Action
+	#   /LAYER/<n>/CTRL/<symbol> <value>      => Set controller value
+	#   /LAYER/<n>/BANK <index|name>          => Select bank
+	#   /LAYER/<n>/PRESET <index|name>        => Select preset
+	#   /BULK <n> <symbol> <value> ...        => Set many controller values at once
+	#
+	# <n> is the layer position (1-based) in the layer list, like in LAYER_CONTROL.
+	# Bank & preset indexes are 0-based. /BULK takes a flat array of
+	# (layer, symbol, value) triplets. Controller values received in an OSC
+	# bundle, and the values in a /BULK message, are applied atomically in one
+	# UI update.
+	#
+	# OSC server runs in its own thread. Received messages are queued and run by
+	# the zyncoder thread, that is woken up immediately.
+	# ---------------------------------------------------------------------------
 
 	def osc_init(self, port=1370, proto=liblo.UDP):
 		try:
-			self.osc_server=liblo.Server(port,proto)
+			self.osc_server=liblo.ServerThread(port,proto)
 			self.osc_server_port=self.osc_server.get_port()
 			self.osc_server_url=liblo.Address('localhost',self.osc_server_port,proto).get_url()
-			logging.info("ZYNTHIAN-UI OSC server running in port {}".format(self.osc_server_port))
+			self.osc_server.add_method("/BULK", None, self.osc_cb_bulk)
 			self.osc_server.add_method(None, None, self.osc_cb_all)
-			#self.osc_server.start()
+			try:
+				self.osc_server.add_bundle_handlers(self.osc_cb_bundle_start, self.osc_cb_bundle_end)
+			except AttributeError:
+				logging.warning("OSC bundles not supported by pyliblo => They won't be applied atomically")
+			self.osc_server.start()
+			logging.info("ZYNTHIAN-UI OSC server running in port {}".format(self.osc_server_port))
 		#except liblo.AddressError as err:
 		except Exception as err:
+			self.osc_server=None
 			logging.error("ZYNTHIAN-UI OSC Server can't be started: {}".format(err))
 
 
 	def osc_end(self):
 		if self.osc_server:
 			try:
-				#self.osc_server.stop()
+				self.osc_server.stop()
+				self.osc_server.free()
+				self.osc_server=None
 				logging.info("ZYNTHIAN-UI OSC server stopped")
 			except Exception as err:
 				logging.error("Can't stop ZYNTHIAN-UI OSC server => %s" % err)
 
 
+	# Run queued OSC messages. Called from zyncoder thread.
 	def osc_receive(self):
-		while self.osc_server.recv(0):
-			pass
+		count = 0
+		while True:
+			try:
+				msgs = self.osc_queue.get_nowait()
+			except queue.Empty:
+				break
+			if len(msgs)>1 and all(self.osc_is_ctrl_path(path) for path, args in msgs):
+				# Hold the UI-update queue, so all the changes are shown in the same frame.
+				# Only for controller values: other commands could wait for Tk => deadlock!
+				with self.ui_updates_lock:
+					for path, args in msgs:
+						self.osc_dispatch(path, args)
+			else:
+				for path, args in msgs:
+					self.osc_dispatch(path, args)
+			count += len(msgs)
+		if count:
+			#Run autoconnect if needed
+			self.zynautoconnect_do()
+		return count
+
+
+	def osc_is_ctrl_path(self, path):
+		return is_osc_ctrl_path(path)
+
+
+	def osc_enqueue(self, msgs):
+		self.osc_queue.put(msgs)
+		self.zynread_wake.set()
 
 
 	#@liblo.make_method("RELOAD_MIDI_CONFIG", None)
 	#@liblo.make_method(None, None)
 	def osc_cb_all(self, path, args, types, src):
 		logging.info("OSC MESSAGE '%s' from '%s'" % (path, src.url))
-
-		parts = path.split("/", 2)
-		if parts[0]=="" and parts[1].upper()=="CUIA":
-			#Execute action
-			self.callable_ui_action(parts[2].upper(), args)
-			#Run autoconnect if needed
-			self.zynautoconnect_do()
+		if self.osc_bundle is not None:
+			self.osc_bundle.append((path, args))
 		else:
-			logging.warning("Not supported OSC call '{}'".format(path))
+			self.osc_enqueue([(path, args)])
 
 		#for a, t in zip(args, types):
 		#	logging.debug("argument of type '%s': %s" % (t, a))
 
 
+	def osc_cb_bulk(self, path, args, types, src):
+		logging.info("OSC BULK MESSAGE with {} values from '{}'".format(len(args)//3, src.url))
+		try:
+			msgs = expand_osc_bulk(args)
+		except ValueError as e:
+			logging.warning("Bad OSC BULK message => {}".format(e))
+			return
+		if self.osc_bundle is not None:
+			self.osc_bundle += msgs
+		else:
+			self.osc_enqueue(msgs)
+
+
+	def osc_cb_bundle_start(self, timestamp, user_data=None):
+		self.osc_bundle = []
+
+
+	def osc_cb_bundle_end(self, user_data=None):
+		msgs = self.osc_bundle
+		self.osc_bundle = None
+		if msgs:
+			self.osc_enqueue(msgs)
+
+
+	def osc_dispatch(self, path, args):
+		try:
+			parsed = parse_osc_path(path)
+		except ValueError as e:
+			logging.warning("Bad OSC call '{}' => {}".format(path, e))
+			return
+		try:
+			if parsed[0]=="CUIA":
+				#Execute action
+				self.callable_ui_action(parsed[1], args)
+			elif parsed[0]=="LAYER":
+				self.osc_layer_cmd(self.screens['layer'].root_layers[parsed[1]], parsed[2], parsed[3], args)
+		except Exception as e:
+			logging.error("Can't run OSC call '{}' => {}".format(path, e))
+
+
+	def osc_layer_cmd(self, layer, cmd, params, args):
+		if cmd=="CTRL":
+			zctrl = layer.controllers_dict[params[0]]
+			zctrl.set_value(args[0], True)
+			zctrl.refresh_gui()
+		elif cmd=="BANK":
+			if isinstance(args[0], str):
+				res = layer.set_bank_by_name(args[0])
+			else:
+				res = layer.set_bank(int(args[0]))
+			if res:
+				layer.set_show_fav_presets(False)
+				layer.load_preset_list()
+		elif cmd=="PRESET":
+			if isinstance(args[0], str):
+				layer.set_preset_by_name(args[0])
+			else:
+				layer.set_preset(int(args[0]))
+		else:
+			raise ValueError("Unknown layer command '{}'".format(cmd))
+
+
 	# ---------------------------------------------------------------------------
 	# GUI Core Management
 	# ---------------------------------------------------------------------------
@@ -328,37 +470,39 @@ class zynthian_gui:
 		# Create Core UI Screens
 		self.screens['info'] = zynthian_gui_info()
 		self.screens['confirm'] = zynthian_gui_confirm()
-		self.screens['keyboard'] = zynthian_gui_keyboard.zynthian_gui_keyboard()
 		self.screens['option'] = zynthian_gui_option()
 		self.screens['engine'] = zynthian_gui_engine()
 		self.screens['layer'] = zynthian_gui_layer()
-		self.screens['layer_options'] = zynthian_gui_layer_options()
 		self.screens['snapshot'] = zynthian_gui_snapshot()
-		self.screens['midi_chan'] = zynthian_gui_midi_chan()
-		self.screens['midi_cc'] = zynthian_gui_midi_cc()
-		self.screens['midi_prog'] = zynthian_gui_midi_prog()
-		self.screens['midi_key_range'] = zynthian_gui_midi_key_range()
-		self.screens['audio_out'] = zynthian_gui_audio_out()
-		self.screens['midi_out'] = zynthian_gui_midi_out()
-		self.screens['audio_in'] = zynthian_gui_audio_in()
 		self.screens['bank'] = zynthian_gui_bank()
 		self.screens['preset'] = zynthian_gui_preset()
 		self.screens['control'] = zynthian_gui_control()
-		self.screens['control_xy'] = zynthian_gui_control_xy()
-		self.screens['midi_profile'] = zynthian_gui_midi_profile()
-		self.screens['zs3_learn'] = zynthian_gui_zs3_learn()
-		self.screens['zs3_options'] = zynthian_gui_zs3_options()
 		self.screens['main'] = zynthian_gui_main()
 		self.screens['admin'] = zynthian_gui_admin()
-		self.screens['touchscreen_calibration'] = zynthian_gui_touchscreen_calibration()
 
-		# Create UI Apps Screens
+		# Register rarely used UI Screens => Created on first access
+		self.screens.register('keyboard', zynthian_gui_keyboard.zynthian_gui_keyboard)
+		self.screens.register('layer_options', zynthian_gui_layer_options)
+		self.screens.register('midi_chan', zynthian_gui_midi_chan)
+		self.screens.register('midi_cc', zynthian_gui_midi_cc)
+		self.screens.register('midi_prog', zynthian_gui_midi_prog)
+		self.screens.register('midi_key_range', zynthian_gui_midi_key_range)
+		self.screens.register('audio_out', zynthian_gui_audio_out)
+		self.screens.register('midi_out', zynthian_gui_midi_out)
+		self.screens.register('audio_in', zynthian_gui_audio_in)
+		self.screens.register('control_xy', zynthian_gui_control_xy)
+		self.screens.register('midi_profile', zynthian_gui_midi_profile)
+		self.screens.register('zs3_learn', zynthian_gui_zs3_learn)
+		self.screens.register('zs3_options', zynthian_gui_zs3_options)
+		self.screens.register('touchscreen_calibration', zynthian_gui_touchscreen_calibration)
+
+		# Register UI Apps Screens
 		self.screens['alsa_mixer'] = self.screens['control']
-		self.screens['audio_recorder'] = zynthian_gui_audio_recorder()
-		self.screens['midi_recorder'] = zynthian_gui_midi_recorder()
-		self.screens['stepseq'] = zynthian_gui_stepsequencer()
+		self.screens.register('audio_recorder', zynthian_gui_audio_recorder)
+		self.screens.register('midi_recorder', zynthian_gui_midi_recorder)
+		self.screens.register('stepseq', zynthian_gui_stepsequencer)
 		if "autoeq" in zynthian_gui_config.experimental_features:
-			self.screens['autoeq'] = zynthian_gui_autoeq()
+			self.screens.register('autoeq', zynthian_gui_autoeq)
 
 		# Init Auto-connector
 		zynautoconnect.start()
@@ -387,10 +531,15 @@ class zynthian_gui:
 		self.start_polling()
 		self.start_loading_thread()
 		self.start_zyncoder_thread()
+		self.screens['engine'].start_supervisor()
 
 		# Run autoconnect if needed
 		self.zynautoconnect_do()
 
+		# Create pending screens in background
+		if zynthian_gui_config.ui_prewarm_screens:
+			zynthian_gui_config.top.after(1000, self.prewarm_screens)
+
 		# Initialize MPE Zones
 		#self.init_mpe_zones(0, 2)
 
@@ -401,10 +550,29 @@ class zynthian_gui:
 		self.osc_end()
 		zynautoconnect.stop()
 		self.screens['layer'].reset()
-		self.screens['midi_recorder'].stop_playing() # Need to stop timing thread
+		self.screens['engine'].stop_jalv_pool()
+		self.screens['engine'].wait_stopped_engines()
+		if self.screens.is_created('midi_recorder'):
+			self.screens['midi_recorder'].stop_playing() # Need to stop timing thread
+		self.health.close()
 		#self.zyntransport.stop()
 
 
+	# Create pending screens one by one from Tk main loop, when not loading
+	def prewarm_screens(self):
+		if self.exit_flag:
+			return
+		if not self.loading:
+			try:
+				if not self.screens.create_next():
+					logging.debug("All screens created")
+					return
+			except Exception as e:
+				logging.error("Can't create screen => {}".format(e))
+				return
+		zynthian_gui_config.top.after(100, self.prewarm_screens)
+
+
 	def hide_screens(self, exclude=None):
 		if not exclude:
 			exclude = self.active_screen
@@ -689,229 +857,137 @@ class zynthian_gui:
 	# Callable UI Actions
 	# -------------------------------------------------------------------
 
-	def callable_ui_action(self, cuia, params=None):
-		logging.debug("CUIA '{}' => {}".format(cuia,params))
-		
-		if cuia == "POWER_OFF":
-			self.screens['admin'].power_off_confirmed()
-
-		elif cuia == "REBOOT":
-			self.screens['admin'].reboot_confirmed()
-
-		elif cuia == "RESTART_UI":
-			self.screens['admin'].restart_gui()
-
-		elif cuia == "EXIT_UI":
-			self.screens['admin'].exit_to_console()
-
-		elif cuia == "RELOAD_MIDI_CONFIG":
-			self.reload_midi_config()
-
-		elif cuia == "RELOAD_KEY_BINDING":
-			zynthian_gui_keybinding.getInstance().load()
-
-		elif cuia == "LAST_STATE_ACTION":
-			self.screens['admin'].last_state_action()
-
-		elif cuia == "ALL_NOTES_OFF":
-			self.all_notes_off()
-			sleep(0.1)
-			self.raw_all_notes_off()
-
-		elif cuia == "ALL_SOUNDS_OFF" or cuia == "ALL_OFF":
-			self.all_notes_off()
-			self.all_sounds_off()
-			sleep(0.1)
-			self.raw_all_notes_off()
-
-		elif cuia == "START_AUDIO_RECORD":
-			self.screens['audio_recorder'].start_recording()
-
-		elif cuia == "STOP_AUDIO_RECORD":
-			self.screens['audio_recorder'].stop_recording()
-
-		elif cuia == "TOGGLE_AUDIO_RECORD":
-			self.screens['audio_recorder'].toggle_recording()
-
-		elif cuia == "START_AUDIO_PLAY":
-			self.screens['audio_recorder'].start_playing()
-
-		elif cuia == "STOP_AUDIO_PLAY":
-			self.screens['audio_recorder'].stop_playing()
-
-		elif cuia == "TOGGLE_AUDIO_PLAY":
-			self.screens['audio_recorder'].toggle_playing()
-
-		elif cuia == "START_MIDI_RECORD":
-			self.screens['midi_recorder'].start_recording()
-
-		elif cuia == "STOP_MIDI_RECORD":
-			self.screens['midi_recorder'].stop_recording()
-
-		elif cuia == "TOGGLE_MIDI_RECORD":
-			self.screens['midi_recorder'].toggle_recording()
-
-		elif cuia == "START_MIDI_PLAY":
-			self.screens['midi_recorder'].start_playing()
-
-		elif cuia == "STOP_MIDI_PLAY":
-			self.screens['midi_recorder'].stop_playing()
-
-		elif cuia == "TOGGLE_MIDI_PLAY":
-			self.screens['midi_recorder'].toggle_playing()
-
-		elif cuia == "START_STEP_SEQ":
-			self.screens['stepseq'].start()
-
-		elif cuia == "PAUSE_STEP_SEQ":
-			self.screens['stepseq'].pause()
-
-		elif cuia == "STOP_STEP_SEQ":
-			self.screens['stepseq'].stop()
-
-		elif cuia == "TOGGLE_STEP_SEQ":
-			self.screens['stepseq'].toggle_transport()
-
-		elif cuia == "SELECT":
+	def init_cuia_registry(self):
+		self.cuia_registry = {}
+		self.cuia_worker_queue = queue.Queue()
+		self.cuia_worker_thread = None
+
+		# Admin actions
+		self.register_cuia("POWER_OFF", lambda p: self.screens['admin'].power_off_confirmed(), blocking=True, ui_thread=True)
+		self.register_cuia("REBOOT", lambda p: self.screens['admin'].reboot_confirmed(), blocking=True, ui_thread=True)
+		self.register_cuia("RESTART_UI", lambda p: self.screens['admin'].restart_gui(), ui_thread=True)
+		self.register_cuia("EXIT_UI", lambda p: self.screens['admin'].exit_to_console(), ui_thread=True)
+		self.register_cuia("RELOAD_MIDI_CONFIG", lambda p: self.reload_midi_config())
+		self.register_cuia("RELOAD_KEY_BINDING", lambda p: zynthian_gui_keybinding.getInstance().load())
+		self.register_cuia("LAST_STATE_ACTION", lambda p: self.screens['admin'].last_state_action(), ui_thread=True)
+
+		# Panic actions => They wait for the notes to release, so run them in the worker
+		self.register_cuia("ALL_NOTES_OFF", self.cuia_all_notes_off, blocking=True)
+		self.register_cuia("ALL_SOUNDS_OFF", self.cuia_all_sounds_off, blocking=True)
+		self.register_cuia("ALL_OFF", self.cuia_all_sounds_off, blocking=True)
+
+		# Audio & MIDI recorder / player
+		for rec in ("audio", "midi"):
+			screen = "{}_recorder".format(rec)
+			for action in ("record", "play"):
+				method = "recording" if action == "record" else "playing"
+				prefix = "{}_{}".format(rec, action).upper()
+				self.register_cuia("START_" + prefix, self.cuia_screen_method(screen, "start_" + method), ui_thread=True)
+				self.register_cuia("STOP_" + prefix, self.cuia_screen_method(screen, "stop_" + method), ui_thread=True)
+				self.register_cuia("TOGGLE_" + prefix, self.cuia_screen_method(screen, "toggle_" + method), ui_thread=True)
+
+		# Step sequencer
+		self.register_cuia("START_STEP_SEQ", self.cuia_screen_method("stepseq", "start"), ui_thread=True)
+		self.register_cuia("PAUSE_STEP_SEQ", self.cuia_screen_method("stepseq", "pause"), ui_thread=True)
+		self.register_cuia("STOP_STEP_SEQ", self.cuia_screen_method("stepseq", "stop"), ui_thread=True)
+		self.register_cuia("TOGGLE_STEP_SEQ", self.cuia_screen_method("stepseq", "toggle_transport"), ui_thread=True)
+
+		# Current screen navigation
+		self.register_cuia("SELECT", self.cuia_current_screen_method("select", True), ui_thread=True)
+		for method in ("next", "prev", "select_up", "select_down", "back_up", "back_down", "layer_up", "layer_down", "snapshot_up", "snapshot_down"):
+			self.register_cuia(method.upper(), self.cuia_current_screen_method(method), ui_thread=True)
+
+		# Switch emulation
+		for i, sw in enumerate(("LAYER", "BACK", "SNAPSHOT", "SELECT")):
+			self.register_cuia("SWITCH_{}_SHORT".format(sw), lambda p, i=i: self.zynswitch_short(i), ui_thread=True)
+			self.register_cuia("SWITCH_{}_BOLD".format(sw), lambda p, i=i: self.zynswitch_bold(i), ui_thread=True)
+			self.register_cuia("SWITCH_{}_LONG".format(sw), lambda p, i=i: self.zynswitch_long(i), ui_thread=True)
+
+		# Screens
+		for screen in ("main", "layer", "bank", "preset", "control"):
+			self.register_cuia("SCREEN_" + screen.upper(), lambda p, s=screen: self.show_screen(s), ui_thread=True)
+
+		for screen in ("snapshot", "admin", "audio_recorder", "midi_recorder", "alsa_mixer", "stepseq"):
+			self.register_cuia("MODAL_" + screen.upper(), lambda p, s=screen: self.toggle_modal(s), ui_thread=True)
+
+		self.register_cuia("LAYER_CONTROL", self.cuia_layer_control, ui_thread=True)
+
+
+	# blocking => the action may take a while (sleeps, waits for I/O, etc.)
+	# ui_thread => the action touches the UI, so it can't be run from the worker
+	def register_cuia(self, cuia, handler, blocking=False, ui_thread=False):
+		self.cuia_registry[cuia] = {
+			'handler': handler,
+			'blocking': blocking,
+			'ui_thread': ui_thread
+		}
+
+
+	def cuia_screen_method(self, screen, method):
+		return lambda p: getattr(self.screens[screen], method)()
+
+
+	def cuia_current_screen_method(self, method, use_param=False):
+		def handler(params):
 			try:
-				self.get_current_screen().select(params[0])
-			except:
-				pass
-
-		elif cuia == "NEXT":
-			try:
-				self.get_current_screen().next()
-			except:
-				pass
-
-		elif cuia == "PREV":
-			try:
-				self.get_current_screen().prev()
-			except:
-				pass
-
-		elif cuia == "SELECT_UP":
-			try:
-				self.get_current_screen().select_up()
-			except:
-				pass
-
-		elif cuia == "SELECT_DOWN":
-			try:
-				self.get_current_screen().select_down()
-			except:
-				pass
-
-		elif cuia == "BACK_UP":
-			try:
-				self.get_current_screen().back_up()
-			except:
-				pass
-
-		elif cuia == "BACK_DOWN":
-			try:
-				self.get_current_screen().back_down()
-			except:
-				pass
-
-		elif cuia == "LAYER_UP":
-			try:
-				self.get_current_screen().layer_up()
-			except:
-				pass
-
-		elif cuia == "LAYER_DOWN":
-			try:
-				self.get_current_screen().layer_down()
-			except:
-				pass
-
-		elif cuia == "SNAPSHOT_UP":
-			try:
-				self.get_current_screen().snapshot_up()
-			except:
-				pass
-
-		elif cuia == "SNAPSHOT_DOWN":
-			try:
-				self.get_current_screen().snapshot_down()
+				if use_param:
+					getattr(self.get_current_screen(), method)(params[0])
+				else:
+					getattr(self.get_current_screen(), method)()
 			except:
 				pass
+		return handler
 
-		elif cuia == "SWITCH_LAYER_SHORT":
-			self.zynswitch_short(0)
-
-		elif cuia == "SWITCH_LAYER_BOLD":
-			self.zynswitch_bold(0)
-
-		elif cuia == "SWITCH_LAYER_LONG":
-			self.zynswitch_long(0)
-
-		elif cuia == "SWITCH_BACK_SHORT":
-			self.zynswitch_short(1)
-
-		elif cuia == "SWITCH_BACK_BOLD":
-			self.zynswitch_bold(1)
-
-		elif cuia == "SWITCH_BACK_LONG":
-			self.zynswitch_long(1)
-
-		elif cuia == "SWITCH_SNAPSHOT_SHORT":
-			self.zynswitch_short(2)
 
-		elif cuia == "SWITCH_SNAPSHOT_BOLD":
-			self.zynswitch_bold(2)
+	def cuia_all_notes_off(self, params=None):
+		self.all_notes_off()
+		sleep(0.1)
+		self.raw_all_notes_off()
 
-		elif cuia == "SWITCH_SNAPSHOT_LONG":
-			self.zynswitch_long(2)
 
-		elif cuia == "SWITCH_SELECT_SHORT":
-			self.zynswitch_short(3)
+	def cuia_all_sounds_off(self, params=None):
+		self.all_notes_off()
+		self.all_sounds_off()
+		sleep(0.1)
+		self.raw_all_notes_off()
 
-		elif cuia == "SWITCH_SELECT_BOLD":
-			self.zynswitch_bold(3)
 
-		elif cuia == "SWITCH_SELECT_LONG":
-			self.zynswitch_long(3)
-
-		elif cuia == "SCREEN_MAIN":
-			self.show_screen("main")
-
-		elif cuia == "SCREEN_LAYER":
-			self.show_screen("layer")
-
-		elif cuia == "SCREEN_BANK":
-			self.show_screen("bank")
-
-		elif cuia == "SCREEN_PRESET":
-			self.show_screen("preset")
-
-		elif cuia == "SCREEN_CONTROL":
-			self.show_screen("control")
-
-		elif cuia == "MODAL_SNAPSHOT":
-			self.toggle_modal("snapshot")
+	def cuia_layer_control(self, params):
+		try:
+			self.layer_control(self.screens['layer'].root_layers[params[0]-1])
+		except:
+			logging.warning("Can't change to layer {}!".format(params[0]))
 
-		elif cuia == "MODAL_ADMIN":
-			self.toggle_modal("admin")
 
-		elif cuia == "MODAL_AUDIO_RECORDER":
-			self.toggle_modal("audio_recorder")
+	def callable_ui_action(self, cuia, params=None):
+		logging.debug("CUIA '{}' => {}".format(cuia,params))
 
-		elif cuia == "MODAL_MIDI_RECORDER":
-			self.toggle_modal("midi_recorder")
+		try:
+			action = self.cuia_registry[cuia]
+		except KeyError:
+			logging.warning("Unknown CUIA '{}'".format(cuia))
+			return
 
-		elif cuia == "MODAL_ALSA_MIXER":
-			self.toggle_modal("alsa_mixer")
+		if action['blocking'] and not action['ui_thread']:
+			self.cuia_worker_queue.put((cuia, action['handler'], params))
+			if not self.cuia_worker_thread or not self.cuia_worker_thread.is_alive():
+				self.cuia_worker_thread = Thread(target=self.cuia_worker_task, args=())
+				self.cuia_worker_thread.daemon = True # thread dies with the program
+				self.cuia_worker_thread.start()
+		else:
+			action['handler'](params)
 
-		elif cuia == "MODAL_STEPSEQ":
-			self.toggle_modal("stepseq")
 
-		elif cuia == "LAYER_CONTROL":
+	def cuia_worker_task(self):
+		while not self.exit_flag:
 			try:
-				self.layer_control(self.screens['layer'].root_layers[params[0]-1])
-			except:
-				logging.warning("Can't change to layer {}!".format(params[0]))
+				cuia, handler, params = self.cuia_worker_queue.get(timeout=1)
+			except queue.Empty:
+				continue
+			try:
+				handler(params)
+			except Exception as e:
+				logging.error("CUIA '{}' failed => {}".format(cuia, e))
 
 
 	def custom_switch_ui_action(self, i, t):
@@ -1008,22 +1084,25 @@ class zynthian_gui:
 
 
 	def zynswitches(self):
+		activity = False
 		if lib_zyncoder:
 			for i in range(len(zynthian_gui_config.zynswitch_pin)):
 				if i<4 or zynthian_gui_config.custom_switch_ui_actions[i-4]:
 					dtus=lib_zyncoder.get_zynswitch_dtus(i, zynthian_gui_config.zynswitch_long_us)
 					if dtus>zynthian_gui_config.zynswitch_long_us:
 						self.zynswitch_long(i)
-						return
+						return True
 					if dtus>zynthian_gui_config.zynswitch_bold_us:
 						# Double switches must be bold!!! => by now ...
 						if self.zynswitch_double(i):
-							return
+							return True
 						self.zynswitch_bold(i)
-						return
+						return True
 					if dtus>0:
 						#print("Switch "+str(i)+" dtus="+str(dtus))
 						self.zynswitch_short(i)
+						activity = True
+		return activity
 
 
 	def zynswitch_long(self,i):
@@ -1287,21 +1366,50 @@ class zynthian_gui:
 
 
 	def zyncoder_thread_task(self):
+		interval = zynthian_gui_config.ui_poll_interval
+		last_activity = monotonic()
 		while not self.exit_flag:
-			self.zyncoder_read()
-			self.zynmidi_read()
-			self.osc_receive()
-			self.plot_zctrls()
-			sleep(0.04)
+			activity = self.zyncoder_read()
+			activity += self.zynmidi_read()
+			activity += self.osc_receive()
+			self.post_ui_update(self.plot_zctrls)
+
+			# Adaptive polling: back-off when idle, fast polling again on first activity
+			now = monotonic()
+			if activity or self.loading:
+				last_activity = now
+				interval = zynthian_gui_config.ui_poll_interval
+			elif now - last_activity > zynthian_gui_config.ui_poll_idle_timeout:
+				interval = min(2 * interval, zynthian_gui_config.ui_poll_idle_interval)
+
+			self.zynread_wait(interval)
 			if self.zynread_wait_flag:
 				sleep(0.3)
 				self.zynread_wait_flag=False
 
 
+	# Wait for next polling cycle. Incoming OSC messages wake up immediately.
+	def zynread_wait(self, timeout):
+		self.zynread_wake.wait(timeout)
+		self.zynread_wake.clear()
+
+
+	# Detect encoder movement since last call
+	def zyncoders_activity(self):
+		if lib_zyncoder:
+			values = tuple(lib_zyncoder.get_value_zyncoder(i) for i in range(len(zynthian_gui_config.zyncoder_pin_a)))
+			if values!=self.zyncoder_values:
+				self.zyncoder_values = values
+				return True
+		return False
+
+
 	def zyncoder_read(self):
+		activity = False
 		if not self.loading: #TODO Es necesario???
 			try:
 				#Read Zyncoders
+				activity = self.zyncoders_activity()
 				self.lock.acquire()
 				if self.modal_screen:
 					free_zyncoders = self.screens[self.modal_screen].zyncoder_read()
@@ -1315,7 +1423,8 @@ class zynthian_gui:
 				
 				#Zynswitches
 				self.zynswitch_defered_exec()
-				self.zynswitches()
+				if self.zynswitches():
+					activity = True
 
 			except Exception as err:
 				self.reset_loading()
@@ -1324,155 +1433,192 @@ class zynthian_gui:
 			#Run autoconnect if needed
 			self.zynautoconnect_do()
 
+		return activity
+
 
 	def zynmidi_read(self):
+		# Drain the MIDI-UI queue in a single batch
+		events = []
 		try:
-			while lib_zyncoder:
-				ev=lib_zyncoder.read_zynmidi()
-				if ev==0: break
+			if lib_zyncoder:
+				read_zynmidi = lib_zyncoder.read_zynmidi
+				while True:
+					ev = read_zynmidi()
+					if ev==0: break
+					events.append(ev)
+		except Exception as err:
+			logging.exception(err)
 
-				#logging.info("MIDI_UI MESSAGE: {}".format(hex(ev)))
+		if not events:
+			return 0
+
+		# Coalesce CC & Pitch Bending: from a run of the same CC (or pitch bending) with
+		# no other event for the channel in between, only the last value is dispatched.
+		# Bank select, data entry & (N)RPN are never coalesced: they are sequences.
+		skip = set()
+		next_key = {}
+		for i in range(len(events)-1, -1, -1):
+			ev = events[i]
+			evtype = (ev & 0xF00000) >> 20
+			if evtype==0xF:
+				continue
+			if evtype==0xB and ((ev & 0x7F00) >> 8) not in self.midi_cc_no_coalesce:
+				key = ev & 0xFFFF00
+			elif evtype==0xE:
+				key = ev & 0xFF0000
+			else:
+				key = None
+			chan = (ev & 0x0F0000) >> 16
+			if key is not None and next_key.get(chan)==key:
+				skip.add(i)
+			next_key[chan] = key
 
-				if (ev & 0xFF0000)==0xF80000:
-					self.status_info['midi_clock'] = True
-				else:
-					self.status_info['midi'] = True
+		for i, ev in enumerate(events):
+			#logging.info("MIDI_UI MESSAGE: {}".format(hex(ev)))
 
-				evtype = (ev & 0xF00000) >> 20
-				chan = (ev & 0x0F0000) >> 16
+			if (ev & 0xFF0000)==0xF80000:
+				self.status_info['midi_clock'] = True
+			else:
+				self.status_info['midi'] = True
 
-				#logging.info("MIDI_UI MESSAGE DETAILS: {}, {}".format(chan,evtype))
+			evtype = (ev & 0xF00000) >> 20
+			chan = (ev & 0x0F0000) >> 16
 
+			#logging.info("MIDI_UI MESSAGE DETAILS: {}, {}".format(chan,evtype))
+
+			try:
 				# System Messages
 				if zynthian_gui_config.midi_sys_enabled and evtype==0xF:
-					# Song Position Pointer...
-					if chan==0x1:
-						timecode = (ev & 0xFF) >> 8;
-					elif chan==0x2:
-						pos = ev & 0xFFFF;
-					# Song Select...
-					elif chan==0x3:
-						song_number = (ev & 0xFF) >> 8;
-					# Timeclock
-					elif chan==0x8:
-						pass
-					# MIDI tick
-					elif chan==0x9:
-						pass
-					# Start
-					elif chan==0xA:
-						pass
-					# Continue
-					elif chan==0xB:
-						pass
-					# Stop
-					elif chan==0xC:
-						pass
-					# Active Sensing
-					elif chan==0xE:
-						pass
-					# Reset
-					elif chan==0xF:
-						pass
+					self.zynmidi_system(ev, chan)
 
 				# Master MIDI Channel ...
 				elif chan==zynthian_gui_config.master_midi_channel:
-					logging.info("MASTER MIDI MESSAGE: %s" % hex(ev))
-					self.start_loading()
-					# Webconf configured messages for Snapshot Control ...
-					if ev==zynthian_gui_config.master_midi_program_change_up:
-						logging.debug("PROGRAM CHANGE UP!")
-						self.screens['snapshot'].midi_program_change_up()
-					elif ev==zynthian_gui_config.master_midi_program_change_down:
-						logging.debug("PROGRAM CHANGE DOWN!")
-						self.screens['snapshot'].midi_program_change_down()
-					elif ev==zynthian_gui_config.master_midi_bank_change_up:
-						logging.debug("BANK CHANGE UP!")
-						self.screens['snapshot'].midi_bank_change_up()
-					elif ev==zynthian_gui_config.master_midi_bank_change_down:
-						logging.debug("BANK CHANGE DOWN!")
-						self.screens['snapshot'].midi_bank_change_down()
-					# Program Change => Snapshot Load
-					elif evtype==0xC:
-						pgm = ((ev & 0x7F00)>>8)
-						logging.debug("PROGRAM CHANGE %d" % pgm)
-						self.screens['snapshot'].midi_program_change(pgm)
-					# Control Change ...
-					elif evtype==0xB:
-						ccnum=(ev & 0x7F00)>>8
-						if ccnum==zynthian_gui_config.master_midi_bank_change_ccnum:
-							bnk = (ev & 0x7F)
-							logging.debug("BANK CHANGE %d" % bnk)
-							self.screens['snapshot'].midi_bank_change(bnk)
-						elif ccnum==120:
-							self.all_sounds_off()
-						elif ccnum==123:
-							self.all_notes_off()
-					# Note-on => CUIA
-					elif evtype==0x9:
-						note = str((ev & 0x7F00)>>8)
-						vel = (ev & 0x007F)
-						if vel != 0 and note in self.note2cuia:
-							self.callable_ui_action(self.note2cuia[note], [vel])
-
-					#Run autoconnect (if needed) and stop logo animation
-					self.zynautoconnect_do()
-					self.stop_loading()
-
-				# Program Change ...
-				elif evtype==0xC:
-					pgm = (ev & 0x7F00)>>8
-					logging.info("MIDI PROGRAM CHANGE: CH{} => {}".format(chan,pgm))
-	
-					# SubSnapShot (ZS3) MIDI learn ...
-					if self.midi_learn_mode and self.modal_screen=='zs3_learn':
-						if self.screens['layer'].save_midi_chan_zs3(chan, pgm):
-							logging.info("ZS3 Saved: CH{} => {}".format(chan,pgm))
-							self.exit_midi_learn_mode()
+					self.zynmidi_master(ev, evtype, chan)
 
-					# Set Preset or ZS3 (sub-snapshot), depending of config option
-					else:
-						if zynthian_gui_config.midi_prog_change_zs3:
-							self.screens['layer'].set_midi_chan_zs3(chan, pgm)
-						else:
-							self.screens['layer'].set_midi_chan_preset(chan, pgm)
-
-						#if not self.modal_screen and self.curlayer and chan==self.curlayer.get_midi_chan():
-						#	self.show_screen('control')
-
-				# Control Change ...
-				elif evtype==0xB:
-					self.screens['midi_chan'].midi_chan_activity(chan)
-					ccnum=(ev & 0x7F00)>>8
-					ccval=(ev & 0x007F)
-					#logging.debug("MIDI CONTROL CHANGE: CH{}, CC{} => {}".format(chan,ccnum,ccval))
-					# If MIDI learn pending ...
-					if self.midi_learn_zctrl:
-						self.midi_learn_zctrl.cb_midi_learn(chan, ccnum)
-					# Try layer's zctrls
-					else:
-						self.screens['layer'].midi_control_change(chan,ccnum,ccval)
-
-				# Note-On ...
-				elif evtype==0x9:
-					self.screens['midi_chan'].midi_chan_activity(chan)
-					#Preload preset (note-on)
-					if zynthian_gui_config.preset_preload_noteon and self.active_screen=='preset' and chan==self.curlayer.get_midi_chan():
-						self.start_loading()
-						self.screens['preset'].preselect_action()
-						self.stop_loading()
-					#Note Range Learn
-					if self.modal_screen=='midi_key_range':
-						note = (ev & 0x7F00)>>8
-						self.screens['midi_key_range'].learn_note_range(note)
-
-				# Pitch Bending ...
-				elif evtype==0xE:
-					pass
+				else:
+					if i in skip:
+						continue
+					try:
+						handler = self.zynmidi_handlers[evtype]
+					except KeyError:
+						continue
+					handler(ev, chan)
 
-		except Exception as err:
-			self.reset_loading()
-			logging.exception(err)
+			except Exception as err:
+				self.reset_loading()
+				logging.exception(err)
+
+		return len(events)
+
+
+	def zynmidi_system(self, ev, chan):
+		# Song Position Pointer...
+		if chan==0x1:
+			timecode = (ev & 0xFF) >> 8;
+		elif chan==0x2:
+			pos = ev & 0xFFFF;
+		# Song Select...
+		elif chan==0x3:
+			song_number = (ev & 0xFF) >> 8;
+		# Timeclock, MIDI tick, Start, Continue, Stop, Active Sensing & Reset
+		# are not handled by UI
+
+
+	def zynmidi_master(self, ev, evtype, chan):
+		logging.info("MASTER MIDI MESSAGE: %s" % hex(ev))
+		self.start_loading()
+		# Webconf configured messages for Snapshot Control ...
+		if ev==zynthian_gui_config.master_midi_program_change_up:
+			logging.debug("PROGRAM CHANGE UP!")
+			self.screens['snapshot'].midi_program_change_up()
+		elif ev==zynthian_gui_config.master_midi_program_change_down:
+			logging.debug("PROGRAM CHANGE DOWN!")
+			self.screens['snapshot'].midi_program_change_down()
+		elif ev==zynthian_gui_config.master_midi_bank_change_up:
+			logging.debug("BANK CHANGE UP!")
+			self.screens['snapshot'].midi_bank_change_up()
+		elif ev==zynthian_gui_config.master_midi_bank_change_down:
+			logging.debug("BANK CHANGE DOWN!")
+			self.screens['snapshot'].midi_bank_change_down()
+		# Program Change => Snapshot Load
+		elif evtype==0xC:
+			pgm = ((ev & 0x7F00)>>8)
+			logging.debug("PROGRAM CHANGE %d" % pgm)
+			self.screens['snapshot'].midi_program_change(pgm)
+		# Control Change ...
+		elif evtype==0xB:
+			ccnum=(ev & 0x7F00)>>8
+			if ccnum==zynthian_gui_config.master_midi_bank_change_ccnum:
+				bnk = (ev & 0x7F)
+				logging.debug("BANK CHANGE %d" % bnk)
+				self.screens['snapshot'].midi_bank_change(bnk)
+			elif ccnum==120:
+				self.all_sounds_off()
+			elif ccnum==123:
+				self.all_notes_off()
+		# Note-on => CUIA
+		elif evtype==0x9:
+			note = str((ev & 0x7F00)>>8)
+			vel = (ev & 0x007F)
+			if vel != 0 and note in self.note2cuia:
+				self.callable_ui_action(self.note2cuia[note], [vel])
+
+		#Run autoconnect (if needed) and stop logo animation
+		self.zynautoconnect_do()
+		self.stop_loading()
+
+
+	def zynmidi_program_change(self, ev, chan):
+		pgm = (ev & 0x7F00)>>8
+		logging.info("MIDI PROGRAM CHANGE: CH{} => {}".format(chan,pgm))
+
+		# SubSnapShot (ZS3) MIDI learn ...
+		if self.midi_learn_mode and self.modal_screen=='zs3_learn':
+			if self.screens['layer'].save_midi_chan_zs3(chan, pgm):
+				logging.info("ZS3 Saved: CH{} => {}".format(chan,pgm))
+				self.exit_midi_learn_mode()
+
+		# Set Preset or ZS3 (sub-snapshot), depending of config option
+		else:
+			if zynthian_gui_config.midi_prog_change_zs3:
+				self.screens['layer'].set_midi_chan_zs3(chan, pgm)
+			else:
+				self.screens['layer'].set_midi_chan_preset(chan, pgm)
+
+			#if not self.modal_screen and self.curlayer and chan==self.curlayer.get_midi_chan():
+			#	self.show_screen('control')
+
+
+	def zynmidi_control_change(self, ev, chan):
+		if self.screens.is_created('midi_chan'):
+			self.screens['midi_chan'].midi_chan_activity(chan)
+		ccnum=(ev & 0x7F00)>>8
+		ccval=(ev & 0x007F)
+		#logging.debug("MIDI CONTROL CHANGE: CH{}, CC{} => {}".format(chan,ccnum,ccval))
+		# If MIDI learn pending ...
+		if self.midi_learn_zctrl:
+			self.midi_learn_zctrl.cb_midi_learn(chan, ccnum)
+		# Try layer's zctrls
+		else:
+			self.screens['layer'].midi_control_change(chan,ccnum,ccval)
+
+
+	def zynmidi_note_on(self, ev, chan):
+		if self.screens.is_created('midi_chan'):
+			self.screens['midi_chan'].midi_chan_activity(chan)
+		#Preload preset (note-on)
+		if zynthian_gui_config.preset_preload_noteon and self.active_screen=='preset' and chan==self.curlayer.get_midi_chan():
+			self.start_loading()
+			self.screens['preset'].preselect_action()
+			self.stop_loading()
+		#Note Range Learn
+		if self.modal_screen=='midi_key_range':
+			note = (ev & 0x7F00)>>8
+			self.screens['midi_key_range'].learn_note_range(note)
+
+
+	def zynmidi_pitch_bend(self, ev, chan):
+		pass
 
 
 	def plot_zctrls(self):
@@ -1551,6 +1697,7 @@ class zynthian_gui:
 		self.polling=True
 		self.zyngine_refresh()
 		self.refresh_status()
+		self.refresh_ui_updates()
 
 
 	def stop_polling(self):
@@ -1561,6 +1708,33 @@ class zynthian_gui:
 		zynthian_gui_config.top.after(msec, func)
 
 
+	# Post a widget update from any thread. It will be run by the Tk main loop
+	# on next frame. Updates with the same key are merged: only the last one runs.
+	def post_ui_update(self, func, key=None):
+		if key is None:
+			key = func
+		with self.ui_updates_lock:
+			self.ui_updates.pop(key, None)
+			self.ui_updates[key] = func
+
+
+	def refresh_ui_updates(self):
+		if self.exit_flag:
+			return
+
+		with self.ui_updates_lock:
+			updates = self.ui_updates
+			self.ui_updates = OrderedDict()
+
+		for func in updates.values():
+			try:
+				func()
+			except Exception as e:
+				logging.error("UI update failed => {}".format(e))
+
+		zynthian_gui_config.top.after(int(1000*zynthian_gui_config.ui_update_interval), self.refresh_ui_updates)
+
+
 	def zyngine_refresh(self):
 		try:
 			# Capture exit event and finish
@@ -1603,24 +1777,19 @@ class zynthian_gui:
 			if self.status_counter>5:
 				self.status_counter = 0
 
-				self.status_info['undervoltage'] = False
-				self.status_info['overtemp'] = False
 				try:
-					# Get ARM flags
-					res = check_output(("vcgencmd", "get_throttled")).decode('utf-8','ignore')
-					thr = int(res[12:],16)
-					if thr & 0x1:
-						self.status_info['undervoltage'] = True
-					elif thr & (0x4 | 0x2):
-						self.status_info['overtemp'] = True
+					# Get ARM flags, temperature & load from cached health sample
+					self.status_info.update(self.health.get_sample())
 
 				except Exception as e:
 					logging.error(e)
 
 				try:
 					# Get Recorder Status
-					self.status_info['audio_recorder'] = self.screens['audio_recorder'].get_status()
-					self.status_info['midi_recorder'] = self.screens['midi_recorder'].get_status()
+					# Recorders not created yet => nothing to show
+					for name in ('audio_recorder', 'midi_recorder'):
+						if self.screens.is_created(name):
+							self.status_info[name] = self.screens[name].get_status()
 
 				except Exception as e:
 					logging.error(e)